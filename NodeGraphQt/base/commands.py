@@ -1,9 +1,97 @@
 #!/usr/bin/python
+from array import array
+
 from ..vendor.Qt.QtWidgets import QUndoCommand
 
 from NodeGraphQt.constants import IN_PORT, OUT_PORT
 
 
+def _journal(graph):
+    """
+    Returns the open autosave journal of the node graph.
+
+    Args:
+        graph (NodeGraphQt.NodeGraph): node graph.
+
+    Returns:
+        NodeGraphQt.base.journal.SessionJournal: journal or None.
+    """
+    if graph is None:
+        return
+    return graph.journal()
+
+
+def _port_pair(src_port, trg_port):
+    """
+    Returns the ports as an (output port, input port) pair.
+    """
+    if src_port.type_() == OUT_PORT:
+        return src_port, trg_port
+    return trg_port, src_port
+
+
+def _connect_ports(src_port, trg_port, register=True):
+    """
+    Connect the port models and views and register the connection on the
+    graph model.
+
+    Args:
+        src_port (NodeGraphQt.Port): source port.
+        trg_port (NodeGraphQt.Port): target port.
+        register (bool): false if the connection is registered on the
+            graph model by the caller.
+    """
+    src_id = src_port.node().id
+    trg_id = trg_port.node().id
+
+    src_port.model.connected_ports[trg_id].append(trg_port.name())
+    trg_port.model.connected_ports[src_id].append(src_port.name())
+
+    if register:
+        graph_model = src_port.node().graph.model
+        if src_port.type_() == OUT_PORT:
+            graph_model.add_connection(src_port, trg_port)
+        else:
+            graph_model.add_connection(trg_port, src_port)
+
+    if src_port.node().graph.viewer():
+        src_port.view.connect_to(trg_port.view)
+
+
+def _disconnect_ports(src_port, trg_port):
+    """
+    Disconnect the port models and views and unregister the connection
+    from the graph model.
+
+    Args:
+        src_port (NodeGraphQt.Port): source port.
+        trg_port (NodeGraphQt.Port): target port.
+    """
+    src_id = src_port.node().id
+    trg_id = trg_port.node().id
+
+    port_names = src_port.model.connected_ports.get(trg_id)
+    if port_names and trg_port.name() in port_names:
+        port_names.remove(trg_port.name())
+    if not port_names:
+        src_port.model.connected_ports.pop(trg_id, None)
+
+    port_names = trg_port.model.connected_ports.get(src_id)
+    if port_names and src_port.name() in port_names:
+        port_names.remove(src_port.name())
+    if not port_names:
+        trg_port.model.connected_ports.pop(src_id, None)
+
+    graph_model = src_port.node().graph.model
+    if src_port.type_() == OUT_PORT:
+        graph_model.remove_connection(src_port, trg_port)
+    else:
+        graph_model.remove_connection(trg_port, src_port)
+
+    if src_port.node().graph.viewer():
+        src_port.view.disconnect_from(trg_port.view)
+
+
 class PropertyChangedCmd(QUndoCommand):
     """
     Node property changed command.
@@ -20,11 +108,16 @@ class PropertyChangedCmd(QUndoCommand):
         self.node = node
         self.name = name
         self.old_val = node.get_property(name)
+        if name == 'name' and node.graph and value != self.old_val:
+            # node names are unique in the graph name index.
+            value = node.graph.model.unique_name(value)
         self.new_val = value
 
     def set_node_prop(self, name, value):
         # set model data.
         model = self.node.model
+        if name == 'name' and self.node.graph:
+            self.node.graph.model.rename_node(model.id, model.name, value)
         if name in model.properties.keys():
             setattr(model, name, value)
         elif name in model.custom_properties.keys():
@@ -32,7 +125,13 @@ class PropertyChangedCmd(QUndoCommand):
         else:
             raise KeyError('No property "{}"'.format(name))
 
-        # set view data.
+        journal = _journal(self.node.graph)
+        if journal:
+            journal.property_changed(self.node, name, value)
+
+        # set view data (headless graphs have no node views).
+        if not self.node.graph.viewer():
+            return
         view = self.node.view
 
         # view widgets.
@@ -55,31 +154,63 @@ class PropertyChangedCmd(QUndoCommand):
             self.set_node_prop(self.name, self.new_val)
 
 
-class NodeMovedCmd(QUndoCommand):
+class NodesMovedCmd(QUndoCommand):
     """
-    Node moved command.
+    Bulk nodes moved command, the positions are stored as flat x, y
+    arrays and consecutive moves of the same nodes are merged into one
+    undo step.
 
     Args:
-        node (NodeGraphQt.NodeObject): node.
-        pos (tuple(float, float)): new node position.
-        prev_pos (tuple(float, float)): previous node position.
+        graph (NodeGraphQt.NodeGraph): node graph.
+        node_ids (list[str]): moved node ids.
+        pos (list[float]): new x, y positions.
+        prev_pos (list[float]): previous x, y positions.
     """
 
-    def __init__(self, node, pos, prev_pos):
+    cmd_id = 1
+
+    def __init__(self, graph, node_ids, pos, prev_pos):
         QUndoCommand.__init__(self)
-        self.node = node
-        self.pos = pos
-        self.prev_pos = prev_pos
+        self.setText('moved nodes')
+        self.graph = graph
+        self.node_ids = tuple(node_ids)
+        self.pos = array('d', pos)
+        self.prev_pos = array('d', prev_pos)
+
+    def id(self):
+        return self.cmd_id
+
+    def mergeWith(self, other):
+        if other.id() != self.id() or other.node_ids != self.node_ids:
+            return False
+        self.pos = other.pos
+        return True
+
+    def set_positions(self, positions):
+        nodes = self.graph.model.nodes
+        viewer = self.graph.viewer()
+        for i, node_id in enumerate(self.node_ids):
+            node = nodes.get(node_id)
+            if node is None:
+                continue
+            pos = [positions[i * 2], positions[i * 2 + 1]]
+            node.model.pos = pos
+            if viewer:
+                node.view.xy_pos = pos
+        if viewer:
+            viewer.update_dirty_pipes()
+
+        journal = _journal(self.graph)
+        if journal:
+            journal.nodes_moved(self.node_ids, positions)
 
     def undo(self):
-        self.node.view.xy_pos = self.prev_pos
-        self.node.model.pos = self.prev_pos
+        self.set_positions(self.prev_pos)
 
     def redo(self):
         if self.pos == self.prev_pos:
             return
-        self.node.view.xy_pos = self.pos
-        self.node.model.pos = self.pos
+        self.set_positions(self.pos)
 
 
 class NodeAddedCmd(QUndoCommand):
@@ -101,52 +232,204 @@ class NodeAddedCmd(QUndoCommand):
 
     def undo(self):
         self.pos = self.pos or self.node.pos()
-        self.graph.model.nodes.pop(self.node.id)
-        self.node.view.delete()
+        self.graph.model.remove_node(self.node)
+        if self.graph.viewer():
+            self.node.view.delete()
+        self.graph.selection().sync_nodes([self.node])
+
+        journal = _journal(self.graph)
+        if journal:
+            journal.nodes_removed([self.node])
 
     def redo(self):
-        self.graph.model.nodes[self.node.id] = self.node
-        self.graph.viewer().add_node(self.node.view, self.pos)
+        self.graph.model.add_node(self.node)
+        viewer = self.graph.viewer()
+        if viewer:
+            viewer.add_node(self.node.view, self.pos)
+        elif self.pos:
+            self.node.model.pos = self.pos
+        self.graph.selection().sync_nodes([self.node])
+
+        journal = _journal(self.graph)
+        if journal:
+            journal.nodes_added([self.node])
 
 
-class NodeRemovedCmd(QUndoCommand):
+class NodesAddedCmd(QUndoCommand):
     """
-    Node deleted command.
+    Bulk nodes added command, used to build a batch of nodes and the
+    connections between them as a single undo step.
 
     Args:
         graph (NodeGraphQt.NodeGraph): node graph.
-        node (NodeGraphQt.NodeObject): node.
+        nodes (list[NodeGraphQt.NodeObject]): nodes.
+        connections (list[tuple(NodeGraphQt.Port, NodeGraphQt.Port)]):
+            (input port, output port) pairs to connect between the nodes.
     """
 
-    def __init__(self, graph, node):
+    def __init__(self, graph, nodes, connections=None):
         QUndoCommand.__init__(self)
-        self.setText('deleted node')
+        self.setText('added nodes')
         self.graph = graph
-        self.node = node
-        self.inputs = []
-        self.outputs = []
-        if hasattr(self.node, 'inputs'):
-            input_ports = self.node.inputs().values()
-            self.inputs = [(p, p.connected_ports()) for p in input_ports]
-        if hasattr(self.node, 'outputs'):
-            output_ports = self.node.outputs().values()
-            self.outputs = [(p, p.connected_ports()) for p in output_ports]
+        self.nodes = nodes
+        self.connections = connections or []
+
+    def undo(self):
+        for in_port, out_port in self.connections:
+            _disconnect_ports(in_port, out_port)
+
+        graph_model = self.graph.model
+        viewer = self.graph.viewer()
+        for node in self.nodes:
+            node.model.pos = node.pos()
+            graph_model.remove_node(node)
+            if viewer:
+                node.view.delete()
+        self.graph.selection().sync_nodes(self.nodes)
+
+        journal = _journal(self.graph)
+        if journal:
+            journal.nodes_removed(self.nodes)
+
+    def redo(self):
+        graph_model = self.graph.model
+        for node in self.nodes:
+            graph_model.add_node(node)
+        viewer = self.graph.viewer()
+        if viewer:
+            viewer.add_nodes([(n.view, n.model.pos) for n in self.nodes])
+        self.graph.selection().sync_nodes(self.nodes)
+
+        edges = [(o, i) for i, o in self.connections]
+        graph_model.add_connections(edges)
+        for in_port, out_port in self.connections:
+            _connect_ports(in_port, out_port, register=False)
+
+        journal = _journal(self.graph)
+        if journal:
+            journal.nodes_added(self.nodes, edges)
+
+
+class NodesRemovedCmd(QUndoCommand):
+    """
+    Bulk nodes deleted command, the connections leaving the deleted nodes
+    are disconnected once and the connections between the deleted nodes
+    are dropped with the nodes.
+
+    Args:
+        graph (NodeGraphQt.NodeGraph): node graph.
+        nodes (list[NodeGraphQt.NodeObject]): nodes.
+    """
+
+    def __init__(self, graph, nodes):
+        QUndoCommand.__init__(self)
+        self.setText('deleted nodes')
+        self.graph = graph
+        self.nodes = nodes
+        # (output port, input port) pairs.
+        self.edges = []
+        self.internal_edges = []
+
+        node_ids = set(n.id for n in nodes)
+        graph_model = graph.model
+        visited = set()
+        for node in nodes:
+            if not hasattr(node, 'inputs'):
+                continue
+            ports = list(node.inputs().values()) + list(node.outputs().values())
+            for port in ports:
+                is_input = port.type_() == IN_PORT
+                for connected_port in graph_model.connected_ports(port):
+                    if is_input:
+                        out_port, in_port = connected_port, port
+                    else:
+                        out_port, in_port = port, connected_port
+                    out_id = out_port.node().id
+                    in_id = in_port.node().id
+                    key = (out_id, out_port.name(), in_id, in_port.name())
+                    if key in visited:
+                        continue
+                    visited.add(key)
+                    if out_id in node_ids and in_id in node_ids:
+                        self.internal_edges.append((out_port, in_port))
+                    else:
+                        self.edges.append((out_port, in_port))
 
     def undo(self):
-        self.graph.model.nodes[self.node.id] = self.node
-        self.graph.scene().addItem(self.node.view)
-        for port, connected_ports in self.inputs:
-            [port.connect_to(p) for p in connected_ports]
-        for port, connected_ports in self.outputs:
-            [port.connect_to(p) for p in connected_ports]
+        graph_model = self.graph.model
+        viewer = self.graph.viewer()
+        if viewer:
+            viewer.begin_update()
+        for node in self.nodes:
+            graph_model.add_node(node)
+        if viewer:
+            viewer.add_nodes([(n.view, n.model.pos) for n in self.nodes])
+
+        # the port models of the deleted nodes still hold the connections
+        # between them, only the graph index and the pipes are restored.
+        graph_model.add_connections(self.internal_edges + self.edges)
+        if viewer:
+            for out_port, in_port in self.internal_edges:
+                out_port.view.connect_to(in_port.view)
+        for out_port, in_port in self.edges:
+            _connect_ports(out_port, in_port, register=False)
+
+        if viewer:
+            viewer.end_update()
+        self.graph.selection().sync_nodes(self.nodes)
+
+        journal = _journal(self.graph)
+        if journal:
+            journal.nodes_added(self.nodes, self.internal_edges + self.edges)
 
     def redo(self):
-        for port, connected_ports in self.inputs:
-            [port.disconnect_from(p) for p in connected_ports]
-        for port, connected_ports in self.outputs:
-            [port.disconnect_from(p) for p in connected_ports]
-        self.graph.model.nodes.pop(self.node.id)
-        self.node.view.delete()
+        graph_model = self.graph.model
+        viewer = self.graph.viewer()
+        if viewer:
+            viewer.begin_update()
+        for out_port, in_port in self.edges:
+            _disconnect_ports(out_port, in_port)
+
+        # removing the nodes drops the connections between them from the
+        # graph index and the node views delete the remaining pipes.
+        for node in self.nodes:
+            node.model.pos = node.pos()
+            graph_model.remove_node(node)
+            if viewer:
+                node.view.delete()
+
+        if viewer:
+            viewer.end_update()
+        self.graph.selection().sync_nodes(self.nodes)
+
+        journal = _journal(self.graph)
+        if journal:
+            journal.nodes_removed(self.nodes)
+
+
+class NodesSelectedCmd(QUndoCommand):
+    """
+    Node selection changed command.
+
+    Args:
+        selection (NodeGraphQt.base.selection.SelectionModel):
+            node graph selection.
+        selected (set[str]): selected node ids.
+        deselected (set[str]): deselected node ids.
+    """
+
+    def __init__(self, selection, selected, deselected):
+        QUndoCommand.__init__(self)
+        self.setText('selected nodes')
+        self.selection = selection
+        self.selected = selected
+        self.deselected = deselected
+
+    def undo(self):
+        self.selection.apply_changes(self.deselected, self.selected)
+
+    def redo(self):
+        self.selection.apply_changes(self.selected, self.deselected)
 
 
 class PortConnectedCmd(QUndoCommand):
@@ -164,35 +447,18 @@ class PortConnectedCmd(QUndoCommand):
         self.target = trg_port
 
     def undo(self):
-        src_model = self.source.model
-        trg_model = self.target.model
-        src_id = self.source.node().id
-        trg_id = self.target.node().id
-
-        port_names = src_model.connected_ports.get(trg_id)
-        if port_names is []:
-            del src_model.connected_ports[trg_id]
-        if port_names and self.target.name() in port_names:
-            port_names.remove(self.target.name())
-
-        port_names = trg_model.connected_ports.get(src_id)
-        if port_names is []:
-            del trg_model.connected_ports[src_id]
-        if port_names and self.source.name() in port_names:
-            port_names.remove(self.source.name())
-
-        self.source.view.disconnect_from(self.target.view)
+        _disconnect_ports(self.source, self.target)
+        journal = _journal(self.source.node().graph)
+        if journal:
+            journal.ports_changed(
+                [(False,) + _port_pair(self.source, self.target)])
 
     def redo(self):
-        src_model = self.source.model
-        trg_model = self.target.model
-        src_id = self.source.node().id
-        trg_id = self.target.node().id
-
-        src_model.connected_ports[trg_id].append(self.target.name())
-        trg_model.connected_ports[src_id].append(self.source.name())
-
-        self.source.view.connect_to(self.target.view)
+        _connect_ports(self.source, self.target)
+        journal = _journal(self.source.node().graph)
+        if journal:
+            journal.ports_changed(
+                [(True,) + _port_pair(self.source, self.target)])
 
 
 class PortDisconnectedCmd(QUndoCommand):
@@ -210,35 +476,113 @@ class PortDisconnectedCmd(QUndoCommand):
         self.target = trg_port
 
     def undo(self):
-        src_model = self.source.model
-        trg_model = self.target.model
-        src_id = self.source.node().id
-        trg_id = self.target.node().id
+        _connect_ports(self.source, self.target)
+        journal = _journal(self.source.node().graph)
+        if journal:
+            journal.ports_changed(
+                [(True,) + _port_pair(self.source, self.target)])
 
-        src_model.connected_ports[trg_id].append(self.target.name())
-        trg_model.connected_ports[src_id].append(self.source.name())
+    def redo(self):
+        _disconnect_ports(self.source, self.target)
+        journal = _journal(self.source.node().graph)
+        if journal:
+            journal.ports_changed(
+                [(False,) + _port_pair(self.source, self.target)])
 
-        self.source.view.connect_to(self.target.view)
 
-    def redo(self):
-        src_model = self.source.model
-        trg_model = self.target.model
-        src_id = self.source.node().id
-        trg_id = self.target.node().id
+class PortConnectionsCmd(QUndoCommand):
+    """
+    Bulk port connections command, the pairs are validated and applied in
+    order on the first redo and the resulting changes are replayed on
+    undo/redo.
 
-        port_names = src_model.connected_ports.get(trg_id)
-        if port_names is []:
-            del src_model.connected_ports[trg_id]
-        if port_names and self.target.name() in port_names:
-            port_names.remove(self.target.name())
+    Args:
+        graph (NodeGraphQt.NodeGraph): node graph.
+        connect (list[tuple(NodeGraphQt.Port, NodeGraphQt.Port)]):
+            (output port, input port) pairs to connect.
+        disconnect (list[tuple(NodeGraphQt.Port, NodeGraphQt.Port)]):
+            (output port, input port) pairs to disconnect.
+    """
 
-        port_names = trg_model.connected_ports.get(src_id)
-        if port_names is []:
-            del trg_model.connected_ports[src_id]
-        if port_names and self.source.name() in port_names:
-            port_names.remove(self.source.name())
+    def __init__(self, graph, connect=None, disconnect=None):
+        QUndoCommand.__init__(self)
+        self.setText('connected ports' if connect else 'disconnected ports')
+        self.graph = graph
+        self.connect = connect or []
+        self.disconnect = disconnect or []
+        # applied changes [(<connected>, <output port>, <input port>)]
+        self.changes = None
+
+    def _validate(self):
+        """
+        Apply the pairs in order skipping the invalid connections and
+        disconnecting the ports replaced on single connection ports.
+
+        Returns:
+            list[tuple(bool, NodeGraphQt.Port, NodeGraphQt.Port)]: changes.
+        """
+        model = self.graph.model
+        changes = []
+
+        for out_port, in_port in self.disconnect:
+            if model.has_connection(out_port, in_port):
+                _disconnect_ports(out_port, in_port)
+                changes.append((False, out_port, in_port))
+
+        for out_port, in_port in self.connect:
+            if model.has_connection(out_port, in_port):
+                continue
+            out_id = out_port.node().id
+            in_id = in_port.node().id
+            if model.acyclic and not model.acyclic_check(out_id, in_id):
+                continue
+            if not in_port.multi_connection():
+                for port in model.connected_ports(in_port):
+                    _disconnect_ports(port, in_port)
+                    changes.append((False, port, in_port))
+            if not out_port.multi_connection():
+                for port in model.connected_ports(out_port):
+                    _disconnect_ports(out_port, port)
+                    changes.append((False, out_port, port))
+            _connect_ports(out_port, in_port)
+            changes.append((True, out_port, in_port))
+        return changes
+
+    def undo(self):
+        viewer = self.graph.viewer()
+        if viewer:
+            viewer.begin_update()
+        for connected, out_port, in_port in reversed(self.changes):
+            if connected:
+                _disconnect_ports(out_port, in_port)
+            else:
+                _connect_ports(out_port, in_port)
+        if viewer:
+            viewer.end_update()
+
+        journal = _journal(self.graph)
+        if journal:
+            journal.ports_changed(
+                [(not c, o, i) for c, o, i in reversed(self.changes)])
+
+    def redo(self):
+        viewer = self.graph.viewer()
+        if viewer:
+            viewer.begin_update()
+        if self.changes is None:
+            self.changes = self._validate()
+        else:
+            for connected, out_port, in_port in self.changes:
+                if connected:
+                    _connect_ports(out_port, in_port)
+                else:
+                    _disconnect_ports(out_port, in_port)
+        if viewer:
+            viewer.end_update()
 
-        self.source.view.disconnect_from(self.target.view)
+        journal = _journal(self.graph)
+        if journal:
+            journal.ports_changed(self.changes)
 
 
 class PortVisibleCmd(QUndoCommand):
@@ -256,6 +600,8 @@ class PortVisibleCmd(QUndoCommand):
 
     def set_visible(self, visible):
         self.port.model.visible = visible
+        if not self.port.node().graph.viewer():
+            return
         self.port.view.setVisible(visible)
         node_view = self.port.node().view
         text_item = None
@@ -272,3 +618,26 @@ class PortVisibleCmd(QUndoCommand):
 
     def redo(self):
         self.set_visible(not self.visible)
+
+
+class UndoStackCmd(QUndoCommand):
+    """
+    Undo command applying the commands recorded on a separate undo stack
+    as one step, used for transactions opened inside another undo macro.
+
+    Args:
+        undo_stack (QUndoStack): undo stack with the applied commands.
+        name (str): undo command label.
+    """
+
+    def __init__(self, undo_stack, name):
+        QUndoCommand.__init__(self)
+        self.setText(name)
+        self.undo_stack = undo_stack
+
+    def undo(self):
+        self.undo_stack.setIndex(0)
+
+    def redo(self):
+        # the commands are already applied when the command is pushed.
+        self.undo_stack.setIndex(self.undo_stack.count())
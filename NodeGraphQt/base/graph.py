@@ -1,60 +1,187 @@
 #!/usr/bin/python
+import functools
 import json
 import os
-import re
+import struct
+from contextlib import contextmanager
 
 from ..vendor.Qt import QtCore
-from ..vendor.Qt.QtWidgets import QUndoStack, QAction, QApplication
+from ..vendor.Qt.QtWidgets import (QUndoStack, QUndoCommand, QAction,
+                                   QApplication)
 
 from NodeGraphQt.base.commands import (NodeAddedCmd,
-                                       NodeRemovedCmd,
-                                       NodeMovedCmd,
-                                       PortConnectedCmd)
+                                       NodesAddedCmd,
+                                       NodesRemovedCmd,
+                                       NodesMovedCmd,
+                                       PortConnectionsCmd,
+                                       PropertyChangedCmd,
+                                       UndoStackCmd)
+from NodeGraphQt.base.journal import (JOURNAL_COMPACT_SIZE,
+                                      SessionJournal,
+                                      journal_path,
+                                      read_journal,
+                                      recovery_point)
 from NodeGraphQt.base.menu import Menu
 from NodeGraphQt.base.model import NodeGraphModel
 from NodeGraphQt.base.node import NodeObject
 from NodeGraphQt.base.port import Port
+from NodeGraphQt.base.selection import SelectionModel
+from NodeGraphQt.base.session import (BINARY_MAGIC,
+                                      BinarySessionReader,
+                                      JsonSessionReader,
+                                      compression_errors,
+                                      open_session_stream,
+                                      session_format,
+                                      is_binary,
+                                      snapshot_records,
+                                      write_session_file)
 from NodeGraphQt.base.vendor import NodeVendor
 from NodeGraphQt.widgets.viewer import NodeViewer
+from NodeGraphQt.constants import IN_PORT, OUT_PORT
+
+
+class _SessionSaveThread(QtCore.QThread):
+    """
+    Worker thread writing a session snapshot for
+    :meth:`NodeGraph.save_session_async`.
+
+    Args:
+        file_path (str): session file path.
+        records (list): (kind, key, value) session records.
+        format (str): "json" or "binary" (default: from the extension).
+        compression_level (int): compression level of compressed files.
+    """
+
+    #: signal emitted with the (file path, error message) when the file
+    #: has been written, the error message is empty on success.
+    saved = QtCore.Signal(str, str)
+
+    def __init__(self, file_path, records, format=None,
+                 compression_level=None):
+        super(_SessionSaveThread, self).__init__()
+        self._file_path = file_path
+        self._records = records
+        self._format = format
+        self._compression_level = compression_level
+
+    def run(self):
+        error = ''
+        try:
+            write_session_file(self._file_path, self._records, self._format,
+                               self._compression_level)
+        except Exception as e:
+            error = str(e) or e.__class__.__name__
+        self._records = None
+        self.saved.emit(self._file_path, error)
 
 
 class NodeGraph(QtCore.QObject):
     """
     base node graph controller.
 
+    A headless node graph has no viewer widget or graphic items, the node
+    models, vendor, undo stack and serialization work without them and a
+    viewer can be attached later with :meth:`NodeGraph.attach_viewer`.
+
     Args:
         tab_search_key(str): hotkey for the tab search widget (default: "tab").
+        headless (bool): create the node graph without a viewer widget.
     """
 
     #: signal for when a node has been created in the node graph.
     node_created = QtCore.Signal(NodeObject)
+    #: signal for when a batch of nodes has been created in the node graph.
+    nodes_created = QtCore.Signal(list)
     #: signal for when a node is selected.
     node_selected = QtCore.Signal(NodeObject)
     #: signal for when a node has been connected.
     port_connected = QtCore.Signal(Port, Port)
+    #: signal for when a batch of connections has been made with
+    #: :meth:`NodeGraph.connect_ports` (list of (output, input) port pairs).
+    ports_connected = QtCore.Signal(list)
+    #: signal for when a batch of connections has been removed with
+    #: :meth:`NodeGraph.connect_ports` or :meth:`NodeGraph.disconnect_ports`
+    #: (list of (output, input) port pairs).
+    ports_disconnected = QtCore.Signal(list)
     #: signal for when drop data has been added to the graph.
     data_dropped = QtCore.Signal(QtCore.QMimeData, QtCore.QPoint)
-
-    def __init__(self, parent=None, tab_search_key='tab'):
+    #: signal emitted while a session is loaded with the
+    #: (bytes read, file size).
+    session_load_progress = QtCore.Signal(int, int)
+    #: signal emitted with the file path when a session has been saved
+    #: with :meth:`NodeGraph.save_session_async`.
+    session_saved = QtCore.Signal(str)
+    #: signal emitted with the (file path, error message) when a session
+    #: saved with :meth:`NodeGraph.save_session_async` couldn't be written.
+    session_save_failed = QtCore.Signal(str, str)
+    #: signal emitted with the (journal file path, error message) when the
+    #: autosave journal of a session loaded with
+    #: :meth:`NodeGraph.load_session` couldn't be recovered.
+    session_recovery_failed = QtCore.Signal(str, str)
+
+    def __init__(self, parent=None, tab_search_key='tab', headless=False):
         super(NodeGraph, self).__init__(parent)
         self.setObjectName('NodeGraphQt')
         self._model = NodeGraphModel()
-        self._viewer = NodeViewer(parent)
+        self._viewer = None
         self._vendor = NodeVendor()
         self._undo_stack = QUndoStack(self)
+        self._selection = SelectionModel(self)
+        self._transaction_depth = 0
+        self._queued_signals = []
+        self._load_cancelled = False
+        self._save_queue = []
+        self._save_thread = None
+        self._journal = None
+        self._journal_enabled = False
+        self._journal_compact_size = JOURNAL_COMPACT_SIZE
+        self._journal_compacting = False
+        self._tab_search_key = tab_search_key
+
+        if not headless:
+            self.attach_viewer(NodeViewer(parent))
+
+    def attach_viewer(self, viewer=None):
+        """
+        Attach a viewer widget to a headless node graph, the graphic items
+        for the existing nodes and connections are built in one batch.
+
+        Args:
+            viewer (NodeGraphQt.widgets.viewer.NodeViewer): viewer widget
+                (a new viewer is created if not specified).
+
+        Returns:
+            NodeGraphQt.widgets.viewer.NodeViewer: the attached viewer.
+        """
+        if self._viewer is not None:
+            raise AssertionError('node graph already has a viewer.')
+        self._viewer = viewer or NodeViewer(self.parent())
+        self._viewer.acyclic = self._model.acyclic
+        self._viewer.graph_model = self._model
 
         tab = QAction('Search Nodes', self)
-        tab.setShortcut(tab_search_key)
+        tab.setShortcut(self._tab_search_key)
         tab.triggered.connect(self._toggle_tab_search)
         self._viewer.addAction(tab)
 
         self._wire_signals()
 
+        nodes = self.all_nodes()
+        if nodes:
+            self._viewer.add_nodes([(n.view, n.model.pos) for n in nodes])
+            for n in nodes:
+                n.view.setSelected(n.model.selected)
+            for out_port, in_port in self._model.edges():
+                out_port.view.connect_to(in_port.view)
+        return self._viewer
+
     def _wire_signals(self):
         # internal signals.
         self._viewer.search_triggered.connect(self._on_search_triggered)
         self._viewer.connection_changed.connect(self._on_connection_changed)
         self._viewer.moved_nodes.connect(self._on_nodes_moved)
+        self._viewer.selection_changed.connect(self._on_selection_changed)
+        self._viewer.backdrop_resized.connect(self._on_backdrop_resized)
 
         # pass through signals.
         self._viewer.node_selected.connect(self._on_node_selected)
@@ -78,6 +205,16 @@ class NodeGraph(QtCore.QObject):
         node = self.get_node_by_id(node_id)
         self.node_selected.emit(node)
 
+    def _on_selection_changed(self, selected, deselected):
+        """
+        called when the node selection in the viewer has changed.
+
+        Args:
+            selected (list[str]): selected node ids.
+            deselected (list[str]): deselected node ids.
+        """
+        self._selection.change(selected, deselected)
+
     def _on_node_data_dropped(self, data, pos):
         """
         called when data has been dropped on the viewer.
@@ -95,11 +232,33 @@ class NodeGraph(QtCore.QObject):
         Args:
             node_data (dict): {<node_view>: <previous_pos>}
         """
-        self._undo_stack.beginMacro('moved nodes')
-        for node_view, prev_pos in node_data.items():
-            node = self._model.nodes[node_view.id]
-            self._undo_stack.push(NodeMovedCmd(node, node.pos(), prev_pos))
-        self._undo_stack.endMacro()
+        node_ids = []
+        pos = []
+        prev_pos = []
+        for node_view, node_prev_pos in node_data.items():
+            node_ids.append(node_view.id)
+            pos.extend(node_view.xy_pos)
+            prev_pos.extend(node_prev_pos)
+        self._undo_stack.push(
+            NodesMovedCmd(self, node_ids, pos, prev_pos))
+
+    def _on_backdrop_resized(self, node_id):
+        """
+        called when a backdrop node has been resized in the viewer, the
+        resize isn't an undo command so it's recorded in the autosave
+        journal directly.
+
+        Args:
+            node_id (str): backdrop node id.
+        """
+        journal = self.journal()
+        node = self._model.nodes.get(node_id)
+        if journal is None or node is None:
+            return
+        width, height = node.size()
+        journal.nodes_moved([node.id], node.pos())
+        journal.property_changed(node, 'width', width)
+        journal.property_changed(node, 'height', height)
 
     def _on_search_triggered(self, node_type, pos):
         """
@@ -157,21 +316,24 @@ class NodeGraph(QtCore.QObject):
         Show node graph viewer widget this is just a convenience
         function to :meth:`NodeGraph.viewer().show()`.
         """
-        self._viewer.show()
+        if self._viewer is not None:
+            self._viewer.show()
 
     def close(self):
         """
         Close node graph NodeViewer widget this is just a convenience
         function to :meth:`NodeGraph.viewer().close()`.
         """
-        self._viewer.close()
+        if self._viewer is not None:
+            self._viewer.close()
 
     def viewer(self):
         """
         Return the node graph viewer widget.
 
         Returns:
-            NodeGraphQt.widgets.viewer.NodeViewer: viewer widget.
+            NodeGraphQt.widgets.viewer.NodeViewer: viewer widget
+                (None if the node graph is headless).
         """
         return self._viewer
 
@@ -180,8 +342,11 @@ class NodeGraph(QtCore.QObject):
         Return the scene object.
 
         Returns:
-            NodeGraphQt.widgets.scene.NodeScene: node scene.
+            NodeGraphQt.widgets.scene.NodeScene: node scene
+                (None if the node graph is headless).
         """
+        if self._viewer is None:
+            return
         return self._viewer.scene()
 
     def undo_stack(self):
@@ -217,6 +382,123 @@ class NodeGraph(QtCore.QObject):
         """
         self._undo_stack.endMacro()
 
+    @contextmanager
+    def transaction(self, name='transaction'):
+        """
+        Context manager that records the changes made in the block as a
+        single undo step.
+
+        The viewer repaints and scene indexing are suspended and the graph
+        signals are queued until the block exits, if an exception escapes
+        the block the changes are rolled back and the queued signals are
+        discarded.
+
+        .. code-block:: python
+            :linenos:
+
+            with graph.transaction('build nodes'):
+                node_a = graph.create_node('nodes.MyNode')
+                node_b = graph.create_node('nodes.MyNode')
+                node_a.set_output(0, node_b.input(0))
+
+        Args:
+            name (str): name for the undo step.
+        """
+        if self._transaction_depth:
+            # nested transactions are part of the outer transaction.
+            self._transaction_depth += 1
+            try:
+                yield
+            finally:
+                self._transaction_depth -= 1
+            return
+
+        self._transaction_depth = 1
+        self._queued_signals = []
+        if self._viewer:
+            self._viewer.begin_update()
+        if self._undo_macro_open():
+            # commands pushed inside an open macro can't be undone until
+            # the macro is closed, the transaction is recorded on its own
+            # undo stack and added to the macro as one command, the stack
+            # has no parent so it's released with the command.
+            undo_stack = self._undo_stack
+            self._undo_stack = QUndoStack()
+            try:
+                yield
+            except BaseException:
+                self._undo_stack.setIndex(0)
+                self._queued_signals = []
+                raise
+            else:
+                if self._undo_stack.count():
+                    undo_stack.push(UndoStackCmd(self._undo_stack, name))
+            finally:
+                self._undo_stack = undo_stack
+                self._transaction_depth = 0
+                if self._viewer:
+                    self._viewer.end_update()
+        else:
+            self._undo_stack.beginMacro(name)
+            try:
+                yield
+            except BaseException:
+                self._undo_stack.endMacro()
+                self._undo_stack.undo()
+                # pushing an obsolete command drops the undone transaction
+                # from the redo side of the stack.
+                undo_cmd = QUndoCommand()
+                undo_cmd.setObsolete(True)
+                self._undo_stack.push(undo_cmd)
+                self._queued_signals = []
+                raise
+            else:
+                self._undo_stack.endMacro()
+            finally:
+                self._transaction_depth = 0
+                if self._viewer:
+                    self._viewer.end_update()
+
+        signals, self._queued_signals = self._queued_signals, []
+        for signal, args in signals:
+            signal.emit(*args)
+
+    def _undo_macro_open(self):
+        """
+        Returns True if an undo macro is being recorded on the undo stack.
+        (used internally by the node graph)
+
+        Returns:
+            bool: True if a macro is open.
+        """
+        # the undo stack can't undo or redo while a macro is open and an
+        # open macro is already on the stack.
+        stack = self._undo_stack
+        return not (stack.canUndo() or stack.canRedo()) and stack.count() > 0
+
+    def in_transaction(self):
+        """
+        Returns True if called within a :meth:`NodeGraph.transaction` block.
+
+        Returns:
+            bool: True if a transaction is open.
+        """
+        return bool(self._transaction_depth)
+
+    def _emit_signal(self, signal, *args):
+        """
+        Emit a node graph signal or queue it until the end of the current
+        transaction.
+
+        Args:
+            signal (QtCore.Signal): bound node graph signal.
+            args: signal arguments.
+        """
+        if self._transaction_depth:
+            self._queued_signals.append((signal, args))
+        else:
+            signal.emit(*args)
+
     def context_menu(self):
         """
         Returns the node graph root context menu object.
@@ -243,7 +525,21 @@ class NodeGraph(QtCore.QObject):
             mode (bool): false to disable acyclic.
         """
         self._model.acyclic = mode
-        self._viewer.acyclic = mode
+        if self._viewer is not None:
+            self._viewer.acyclic = mode
+
+    def topological_order(self):
+        """
+        Returns all the nodes sorted in topological order so every node
+        comes after the nodes connected to its inputs.
+
+        The order is maintained incrementally as connections are made.
+
+        Returns:
+            list[NodeGraphQt.Node]: list of nodes.
+        """
+        nodes = self._model.nodes
+        return [nodes[n_id] for n_id in self._model.topological_order()]
 
     def set_pipe_layout(self, layout='curved'):
         """
@@ -253,7 +549,22 @@ class NodeGraph(QtCore.QObject):
         Args:
             layout (str): 'straight' or 'curved'
         """
-        self._viewer.set_pipe_layout(layout)
+        if self._viewer is not None:
+            self._viewer.set_pipe_layout(layout)
+
+    def set_performance_profile(self, profile='default'):
+        """
+        Set the viewer performance profile (viewport update mode,
+        antialiasing, batched pipes and item cache modes).
+        (convenience function to
+        :meth:`NodeGraph.viewer().set_performance_profile`)
+
+        Args:
+            profile (str or dict): "default", "large_graph", "huge_graph"
+                or a profile dict.
+        """
+        if self._viewer is not None:
+            self._viewer.set_performance_profile(profile)
 
     def fit_to_selection(self):
         """
@@ -261,7 +572,7 @@ class NodeGraph(QtCore.QObject):
         If no nodes are selected then all nodes in the graph will be framed.
         """
         nodes = self.selected_nodes() or self.all_nodes()
-        if not nodes:
+        if not nodes or self._viewer is None:
             return
         self._viewer.zoom_to_nodes([n.view for n in nodes])
 
@@ -269,7 +580,8 @@ class NodeGraph(QtCore.QObject):
         """
         Reset the zoom level
         """
-        self._viewer.reset_zoom()
+        if self._viewer is not None:
+            self._viewer.reset_zoom()
 
     def set_zoom(self, zoom=0):
         """
@@ -278,7 +590,8 @@ class NodeGraph(QtCore.QObject):
         Args:
             zoom (float): zoom factor (max zoom out -0.9 / max zoom in 2.0)
         """
-        self._viewer.set_zoom(zoom)
+        if self._viewer is not None:
+            self._viewer.set_zoom(zoom)
 
     def get_zoom(self):
         """
@@ -287,6 +600,8 @@ class NodeGraph(QtCore.QObject):
         Returns:
             float: the current zoom level.
         """
+        if self._viewer is None:
+            return 0.0
         return self._viewer.get_zoom()
 
     def center_on(self, nodes=None):
@@ -296,12 +611,15 @@ class NodeGraph(QtCore.QObject):
         Args:
             nodes (list[NodeGraphQt.Node]): a list of nodes.
         """
-        self._viewer.center_selection(nodes)
+        if self._viewer is not None:
+            self._viewer.center_selection(nodes)
 
     def center_selection(self):
         """
         Centers on the current selected nodes.
         """
+        if self._viewer is None:
+            return
         nodes = self._viewer.selected_nodes()
         self._viewer.center_selection(nodes)
 
@@ -326,6 +644,28 @@ class NodeGraph(QtCore.QObject):
         """
         self._vendor.register_node(node, alias)
 
+    def _register_node_attrs(self, node):
+        """
+        register the node property attributes to the graph model and bind
+        the node model to the graph model.
+        (used internally by the node graph)
+
+        Args:
+            node (NodeGraphQt.NodeObject): node object.
+        """
+        wid_types = node.model.__dict__.pop('_TEMP_property_widget_types')
+        prop_attrs = node.model.__dict__.pop('_TEMP_property_attrs')
+
+        graph_attrs = self.model.node_property_attrs
+        if node.type_ not in graph_attrs.keys():
+            graph_attrs[node.type_] = {
+                n: {'widget_type': wt} for n, wt in wid_types.items()
+            }
+            for pname, pattrs in prop_attrs.items():
+                graph_attrs[node.type_][pname].update(pattrs)
+
+        node.model._graph_model = self.model
+
     def create_node(self, node_type, name=None, selected=True, color=None, pos=None):
         """
         Create a new node in the node graph.
@@ -347,18 +687,7 @@ class NodeGraph(QtCore.QObject):
             node = NodeCls()
 
             node._graph = self
-            node.model._graph_model = self.model
-
-            wid_types = node.model.__dict__.pop('_TEMP_property_widget_types')
-            prop_attrs = node.model.__dict__.pop('_TEMP_property_attrs')
-
-            graph_attrs = self.model.node_property_attrs
-            if node.type_ not in graph_attrs.keys():
-                graph_attrs[node.type_] = {
-                    n: {'widget_type': wt} for n, wt in wid_types.items()
-                }
-                for pname, pattrs in prop_attrs.items():
-                    graph_attrs[node.type_][pname].update(pattrs)
+            self._register_node_attrs(node)
 
             node.NODE_NAME = self.get_unique_name(name or node.NODE_NAME)
             node.model.name = node.NODE_NAME
@@ -376,10 +705,104 @@ class NodeGraph(QtCore.QObject):
             undo_cmd = NodeAddedCmd(self, node, node.model.pos)
             undo_cmd.setText('created node')
             self._undo_stack.push(undo_cmd)
-            self.node_created.emit(node)
+            self._emit_signal(self.node_created, node)
             return node
         raise Exception('\n\n>> Cannot find node:\t"{}"\n'.format(node_type))
 
+    def create_nodes(self, node_type, count, positions=None, names=None,
+                     properties=None, selected=False):
+        """
+        Create a batch of nodes of the same type in the node graph as a
+        single undo step.
+
+        The :attr:`NodeGraph.nodes_created` signal is emitted once with the
+        created nodes (:attr:`NodeGraph.node_created` isn't emitted).
+
+        .. code-block:: python
+            :linenos:
+
+            import numpy
+
+            positions = numpy.random.uniform(0, 5000, (1000, 2))
+            nodes = graph.create_nodes('nodes.MyNode', 1000, positions)
+
+        Args:
+            node_type (str): node instance type.
+            count (int): number of nodes to create.
+            positions (list[list[float, float]]): x, y position per node
+                (accepts a "count x 2" numpy array).
+            names (str or list[str]): base name for all the nodes or a
+                name per node (default: node type name).
+            properties (dict or list[dict]): property values set on all
+                the nodes or a property dict per node.
+            selected (bool): set created nodes to be selected.
+
+        Returns:
+            list[NodeGraphQt.Node]: the created node instances.
+        """
+        NodeCls = self._vendor.create_node_instance(node_type)
+        if not NodeCls:
+            raise Exception('\n\n>> Cannot find node:\t"{}"\n'.format(node_type))
+
+        # numpy arrays (or any array like object) are converted in one go.
+        if hasattr(positions, 'tolist'):
+            positions = positions.tolist()
+        if hasattr(properties, 'tolist'):
+            properties = properties.tolist()
+        if positions is not None:
+            assert len(positions) == count, \
+                'expected {} positions got {}.'.format(count, len(positions))
+        if isinstance(properties, (list, tuple)):
+            assert len(properties) == count, \
+                'expected {} property dicts.'.format(count)
+        if isinstance(names, (list, tuple)):
+            assert len(names) == count, 'expected {} names.'.format(count)
+
+        if count <= 0:
+            return []
+
+        nodes = [NodeCls() for _ in range(count)]
+        for node in nodes:
+            node._graph = self
+            self._register_node_attrs(node)
+
+        if isinstance(names, (list, tuple)):
+            reserved = set()
+            node_names = []
+            for name in names:
+                name = self._model.unique_name(name, reserved)
+                reserved.add(name)
+                node_names.append(name)
+        else:
+            node_names = self._model.unique_names(
+                names or nodes[0].NODE_NAME, count)
+
+        for i, node in enumerate(nodes):
+            model = node.model
+            node.NODE_NAME = model.name = node_names[i]
+            model.selected = selected
+            if positions is not None:
+                x, y = positions[i]
+                model.pos = [float(x), float(y)]
+            if properties:
+                props = properties
+                if isinstance(properties, (list, tuple)):
+                    props = properties[i]
+                for name, value in props.items():
+                    if name in model.properties:
+                        setattr(model, name, value)
+                    elif name in model.custom_properties:
+                        model.custom_properties[name] = value
+                    else:
+                        raise KeyError('No property "{}"'.format(name))
+            node.update()
+
+        undo_cmd = NodesAddedCmd(self, nodes)
+        undo_cmd.setText('created nodes')
+        self._undo_stack.push(undo_cmd)
+        self._emit_signal(self.nodes_created, nodes)
+        return nodes
+
     def add_node(self, node):
         """
         Add a node into the node graph.
@@ -389,20 +812,9 @@ class NodeGraph(QtCore.QObject):
         """
         assert isinstance(node, NodeObject), 'node must be a Node instance.'
 
-        wid_types = node.model.__dict__.pop('_TEMP_property_widget_types')
-        prop_attrs = node.model.__dict__.pop('_TEMP_property_attrs')
-
-        graph_attrs = self.model.node_property_attrs
-        if node.type_ not in graph_attrs.keys():
-            graph_attrs[node.type_] = {
-                n: {'widget_type': wt} for n, wt in wid_types.items()
-            }
-            for pname, pattrs in prop_attrs.items():
-                graph_attrs[node.type_][pname].update(pattrs)
-
         node._graph = self
+        self._register_node_attrs(node)
         node.NODE_NAME = self.get_unique_name(node.NODE_NAME)
-        node.model._graph_model = self.model
         node.model.name = node.NODE_NAME
         node.update()
         self._undo_stack.push(NodeAddedCmd(self, node))
@@ -416,18 +828,44 @@ class NodeGraph(QtCore.QObject):
         """
         assert isinstance(node, NodeObject), \
             'node must be a instance of a NodeObject.'
-        self._undo_stack.push(NodeRemovedCmd(self, node))
+        undo_cmd = NodesRemovedCmd(self, [node])
+        undo_cmd.setText('deleted node')
+        self._undo_stack.push(undo_cmd)
 
     def delete_nodes(self, nodes):
         """
-        Remove a list of specified nodes from the node graph.
+        Remove a list of specified nodes from the node graph as a single
+        undo step.
 
         Args:
             nodes (list[NodeGraphQt.Node]): list of node instances.
         """
-        self._undo_stack.beginMacro('deleted nodes')
-        [self.delete_node(n) for n in nodes]
-        self._undo_stack.endMacro()
+        if not nodes:
+            return
+        self._undo_stack.push(NodesRemovedCmd(self, list(nodes)))
+
+    def move_nodes(self, nodes, x_offset=0.0, y_offset=0.0):
+        """
+        Move the nodes by an offset in one undo step, consecutive moves
+        of the same nodes are merged into a single undo step.
+
+        Args:
+            nodes (list[NodeGraphQt.Node]): nodes to move.
+            x_offset (float): X offset.
+            y_offset (float): Y offset.
+        """
+        if not nodes:
+            return
+        node_ids = []
+        pos = []
+        prev_pos = []
+        for node in nodes:
+            x, y = node.pos()
+            node_ids.append(node.id)
+            pos.extend((x + x_offset, y + y_offset))
+            prev_pos.extend((x, y))
+        self._undo_stack.push(
+            NodesMovedCmd(self, node_ids, pos, prev_pos))
 
     def all_nodes(self):
         """
@@ -445,29 +883,162 @@ class NodeGraph(QtCore.QObject):
         Returns:
             list[NodeGraphQt.Node]: list of nodes.
         """
-        nodes = []
-        for item in self._viewer.selected_nodes():
-            node = self._model.nodes[item.id]
-            nodes.append(node)
-        return nodes
+        return self._selection.nodes()
+
+    def selection(self):
+        """
+        Returns the selection model of the node graph.
+
+        Returns:
+            NodeGraphQt.base.selection.SelectionModel: node selection.
+        """
+        return self._selection
 
     def select_all(self):
         """
         Select all nodes in the node graph.
         """
-        self._undo_stack.beginMacro('select all')
-        for node in self.all_nodes():
-            node.set_selected(True)
-        self._undo_stack.endMacro()
+        self._selection.select_all()
 
     def clear_selection(self):
         """
         Clears the selection in the node graph.
         """
-        self._undo_stack.beginMacro('deselected nodes')
-        for node in self.all_nodes():
-            node.set_selected(False)
-        self._undo_stack.endMacro()
+        self._selection.clear()
+
+    def _port_pairs(self, pairs):
+        """
+        Validate port pairs and sort them to (output port, input port).
+
+        Args:
+            pairs (list[tuple(NodeGraphQt.Port, NodeGraphQt.Port)]):
+                port pairs in any order.
+
+        Returns:
+            list[tuple(NodeGraphQt.Port, NodeGraphQt.Port)]: port pairs.
+        """
+        port_pairs = []
+        for port_a, port_b in pairs:
+            assert isinstance(port_a, Port) and isinstance(port_b, Port), \
+                'port pairs must be Port instances.'
+            assert port_a.node().graph is self and \
+                port_b.node().graph is self, \
+                'ports must belong to nodes in this node graph.'
+            if port_a.type_() == OUT_PORT and port_b.type_() == IN_PORT:
+                port_pairs.append((port_a, port_b))
+            elif port_a.type_() == IN_PORT and port_b.type_() == OUT_PORT:
+                port_pairs.append((port_b, port_a))
+            else:
+                raise AssertionError(
+                    'can\'t connect "{}" to "{}" ports of the same type.'
+                    .format(port_a.name(), port_b.name()))
+        return port_pairs
+
+    def _push_connections(self, undo_cmd):
+        """
+        Push a bulk connections command and emit the net connection
+        changes.
+
+        Args:
+            undo_cmd (NodeGraphQt.base.commands.PortConnectionsCmd): command.
+
+        Returns:
+            list[tuple(NodeGraphQt.Port, NodeGraphQt.Port)]: connected pairs.
+        """
+        self._undo_stack.push(undo_cmd)
+        # net changes, a connection replaced later in the batch cancels out.
+        changes = {}
+        for is_connected, out_port, in_port in undo_cmd.changes:
+            key = (out_port.node().id, out_port.name(),
+                   in_port.node().id, in_port.name())
+            change = changes.get(key)
+            if change and change[0] is not is_connected:
+                del changes[key]
+            else:
+                changes[key] = (is_connected, (out_port, in_port))
+        connected = [p for c, p in changes.values() if c]
+        disconnected = [p for c, p in changes.values() if not c]
+        if disconnected:
+            self._emit_signal(self.ports_disconnected, disconnected)
+        if connected:
+            self._emit_signal(self.ports_connected, connected)
+        return connected
+
+    def connect_ports(self, pairs):
+        """
+        Connect a batch of port pairs as a single undo step.
+
+        The pairs are applied in order with the same rules as
+        :meth:`NodeGraphQt.Port.connect_to`: connections that would create
+        a cycle in an acyclic graph are skipped and the existing connection
+        on a single connection port is replaced.
+
+        The :attr:`NodeGraph.ports_connected` and
+        :attr:`NodeGraph.ports_disconnected` signals are emitted once with
+        all the changes (:attr:`NodeGraph.port_connected` isn't emitted).
+
+        Args:
+            pairs (list[tuple(NodeGraphQt.Port, NodeGraphQt.Port)]):
+                port pairs to connect (input and output in any order).
+
+        Returns:
+            list[tuple(NodeGraphQt.Port, NodeGraphQt.Port)]:
+                (output port, input port) pairs that are now connected.
+        """
+        port_pairs = self._port_pairs(pairs)
+        if not port_pairs:
+            return []
+        return self._push_connections(
+            PortConnectionsCmd(self, connect=port_pairs))
+
+    def disconnect_ports(self, pairs):
+        """
+        Disconnect a batch of port pairs as a single undo step and emit
+        the :attr:`NodeGraph.ports_disconnected` signal once.
+
+        Args:
+            pairs (list[tuple(NodeGraphQt.Port, NodeGraphQt.Port)]):
+                port pairs to disconnect (input and output in any order).
+        """
+        port_pairs = self._port_pairs(pairs)
+        if port_pairs:
+            self._push_connections(
+                PortConnectionsCmd(self, disconnect=port_pairs))
+
+    def upstream_nodes(self, node):
+        """
+        Returns the nodes connected to the inputs of the node.
+
+        Args:
+            node (NodeGraphQt.Node): node object.
+
+        Returns:
+            iterator: upstream node objects.
+        """
+        nodes = self._model.nodes
+        return (nodes[n_id] for n_id in self._model.upstream_ids(node.id))
+
+    def downstream_nodes(self, node):
+        """
+        Returns the nodes connected to the outputs of the node.
+
+        Args:
+            node (NodeGraphQt.Node): node object.
+
+        Returns:
+            iterator: downstream node objects.
+        """
+        nodes = self._model.nodes
+        return (nodes[n_id] for n_id in self._model.downstream_ids(node.id))
+
+    def edges(self):
+        """
+        Returns all the connections in the node graph.
+
+        Returns:
+            iterator: (output port, input port) pairs.
+        """
+        return self._model.edges()
 
     def get_node_by_id(self, node_id=None):
         """
@@ -490,9 +1061,9 @@ class NodeGraph(QtCore.QObject):
         Returns:
             NodeGraphQt.NodeObject: node object.
         """
-        for node_id, node in self._model.nodes.items():
-            if node.name() == name:
-                return node
+        node_id = self._model.node_names.get(name)
+        if node_id:
+            return self._model.nodes.get(node_id)
 
     def get_unique_name(self, name):
         """
@@ -504,25 +1075,7 @@ class NodeGraph(QtCore.QObject):
         Returns:
             str: unique node name.
         """
-        name = ' '.join(name.split())
-        node_names = [n.name() for n in self.all_nodes()]
-        if name not in node_names:
-            return name
-
-        regex = re.compile('[\w ]+(?: )*(\d+)')
-        search = regex.search(name)
-        if not search:
-            for x in range(1, len(node_names) + 1):
-                new_name = '{} {}'.format(name, x)
-                if new_name not in node_names:
-                    return new_name
-
-        version = search.group(1)
-        name = name[:len(version) * -1].strip()
-        for x in range(1, len(node_names) + 1):
-            new_name = '{} {}'.format(name, x)
-            if new_name not in node_names:
-                return new_name
+        return self._model.unique_name(name)
 
     def current_session(self):
         """
@@ -536,10 +1089,18 @@ class NodeGraph(QtCore.QObject):
     def clear_session(self):
         """
         Clears the current node graph session.
+
+        The nodes are removed without recording undo commands and the undo
+        stack is cleared.
         """
-        for n in self.all_nodes():
-            self.delete_node(n)
+        if self._journal:
+            self._journal.close()
+            self._journal = None
         self._undo_stack.clear()
+        if self._viewer:
+            self._viewer.clear_nodes()
+        self._model.clear()
+        self._selection.reset()
         self._model.session = None
 
     def _serialize(self, nodes):
@@ -554,102 +1115,172 @@ class NodeGraph(QtCore.QObject):
             dict: serialized data.
         """
         serial_data = {'nodes': {}, 'connections': []}
-        nodes_data = {}
+        connections = serial_data['connections']
+
+        # canonical edge table keyed by
+        # (out_node_id, out_port, in_node_id, in_port) so each connection
+        # is emitted once even though it's stored on both of its ports.
+        edges = set()
+
         for n in nodes:
 
             # update the node model.
             n.update_model()
 
-            nodes_data.update(n.model.to_dict)
+            for n_id, n_data in n.model.to_dict.items():
+                serial_data['nodes'][n_id] = n_data
+
+                inputs = n_data.pop('inputs') if n_data.get('inputs') else {}
+                outputs = n_data.pop('outputs') if n_data.get('outputs') else {}
+
+                for pname, conn_data in inputs.items():
+                    for conn_id, prt_names in conn_data.items():
+                        for conn_prt in prt_names:
+                            edge = (conn_id, conn_prt, n_id, pname)
+                            if edge in edges:
+                                continue
+                            edges.add(edge)
+                            connections.append({'in': [n_id, pname],
+                                                'out': [conn_id, conn_prt]})
+
+                for pname, conn_data in outputs.items():
+                    for conn_id, prt_names in conn_data.items():
+                        for conn_prt in prt_names:
+                            edge = (n_id, pname, conn_id, conn_prt)
+                            if edge in edges:
+                                continue
+                            edges.add(edge)
+                            connections.append({'out': [n_id, pname],
+                                                'in': [conn_id, conn_prt]})
+
+        if not serial_data['connections']:
+            serial_data.pop('connections')
+
+        return serial_data
+
+    def _build_node(self, n_data, node_names):
+        """
+        Build a node from the serialized node data without adding it to
+        the node graph.
+        (used internally by the node graph)
 
-        for n_id, n_data in nodes_data.items():
-            serial_data['nodes'][n_id] = n_data
+        Args:
+            n_data (dict): serialized node data.
+            node_names (set[str]): names reserved by the nodes already
+                built in the batch.
 
-            inputs = n_data.pop('inputs') if n_data.get('inputs') else {}
-            outputs = n_data.pop('outputs') if n_data.get('outputs') else {}
+        Returns:
+            NodeGraphQt.NodeObject: node instance or None if the node type
+                isn't registered.
+        """
+        identifier = n_data['type_']
+        NodeCls = self._vendor.create_node_instance(identifier)
+        if not NodeCls:
+            return
+        node = NodeCls()
+        node._graph = self
+        self._register_node_attrs(node)
 
-            for pname, conn_data in inputs.items():
-                for conn_id, prt_names in conn_data.items():
-                    for conn_prt in prt_names:
-                        pipe = {'in': [n_id, pname], 'out': [conn_id, conn_prt]}
-                        if pipe not in serial_data['connections']:
-                            serial_data['connections'].append(pipe)
+        name = self._model.unique_name(
+            n_data.get('name', node.NODE_NAME), node_names)
+        node_names.add(name)
+        n_data['name'] = name
+        node.NODE_NAME = name
 
-            for pname, conn_data in outputs.items():
-                for conn_id, prt_names in conn_data.items():
-                    for conn_prt in prt_names:
-                        pipe = {'out': [n_id, pname], 'in': [conn_id, conn_prt]}
-                        if pipe not in serial_data['connections']:
-                            serial_data['connections'].append(pipe)
+        # set properties.
+        for prop in node.model.properties.keys():
+            if prop in n_data.keys():
+                setattr(node.model, prop, n_data[prop])
 
-        if not serial_data['connections']:
-            serial_data.pop('connections')
+        # set custom properties.
+        for prop, val in n_data.get('custom', {}).items():
+            if prop in node.model.custom_properties.keys():
+                node.model.custom_properties[prop] = val
 
-        return serial_data
+        node.update()
+        return node
+
+    @staticmethod
+    def _connection_ports(connection, nodes, ports):
+        """
+        Returns the ports of the serialized connection.
+        (used internally by the node graph)
+
+        Args:
+            connection (dict): serialized connection data.
+            nodes (dict): built nodes {serialized node id: node}.
+            ports (dict): port lookup cache {node id: (inputs, outputs)}.
+
+        Returns:
+            tuple(NodeGraphQt.Port, NodeGraphQt.Port): (input port, output
+                port) or None if the connection can't be resolved.
+        """
+        in_nid, in_pname = connection.get('in', ('', ''))
+        out_nid, out_pname = connection.get('out', ('', ''))
+        in_node = nodes.get(in_nid)
+        out_node = nodes.get(out_nid)
+        if not (in_node and out_node):
+            return
+        if in_nid not in ports:
+            ports[in_nid] = (in_node.inputs(), in_node.outputs())
+        if out_nid not in ports:
+            ports[out_nid] = (out_node.inputs(), out_node.outputs())
+        in_port = ports[in_nid][0].get(in_pname)
+        out_port = ports[out_nid][1].get(out_pname)
+        if in_port and out_port:
+            return in_port, out_port
 
-    def _deserialize(self, data, relative_pos=False, pos=None):
+    def _deserialize(self, data, relative_pos=False, pos=None, push_undo=True):
         """
         deserialize node data.
         (used internally by the node graph)
 
+        All the nodes and their connections are built in one pass and added
+        to the graph as a single undo command.
+
         Args:
             data (dict): node data.
             relative_pos (bool): position node relative to the cursor.
+            pos (tuple): x, y position to move the nodes to.
+            push_undo (bool): false to build the nodes without
+                recording an undo command (eg. loading a session).
 
         Returns:
             list[NodeGraphQt.Nodes]: list of node instances.
         """
+        node_names = set()
         nodes = {}
 
         # build the nodes.
         for n_id, n_data in data.get('nodes', {}).items():
-            identifier = n_data['type_']
-            NodeCls = self._vendor.create_node_instance(identifier)
-            if NodeCls:
-                node = NodeCls()
-                node._graph = self
-
-                name = self.get_unique_name(n_data.get('name', node.NODE_NAME))
-                n_data['name'] = name
-
-                # set properties.
-                for prop, val in node.model.properties.items():
-                    if prop in n_data.keys():
-                        setattr(node.model, prop, n_data[prop])
-
-                # set custom properties.
-                for prop, val in n_data.get('custom', {}).items():
-                    if prop in node.model.custom_properties.keys():
-                        node.model.custom_properties[prop] = val
-
-                node.update()
-
-                self._undo_stack.push(
-                    NodeAddedCmd(self, node, n_data.get('pos'))
-                )
+            node = self._build_node(n_data, node_names)
+            if node is not None:
                 nodes[n_id] = node
 
         # build the connections.
+        ports = {}
+        connections = []
         for connection in data.get('connections', []):
-            nid, pname = connection.get('in', ('', ''))
-            in_node = nodes.get(nid)
-            if not in_node:
-                continue
-            in_port = in_node.inputs().get(pname) if in_node else None
+            conn_ports = self._connection_ports(connection, nodes, ports)
+            if conn_ports:
+                connections.append(conn_ports)
+
+        node_objs = list(nodes.values())
+        if not node_objs:
+            return node_objs
 
-            nid, pname = connection.get('out', ('', ''))
-            out_node = nodes.get(nid)
-            if not out_node:
-                continue
-            out_port = out_node.outputs().get(pname) if out_node else None
+        undo_cmd = NodesAddedCmd(self, node_objs, connections)
+        if push_undo:
+            self._undo_stack.push(undo_cmd)
+        else:
+            undo_cmd.redo()
 
-            if in_port and out_port:
-                self._undo_stack.push(PortConnectedCmd(in_port, out_port))
+        if self._viewer is None:
+            return node_objs
 
-        node_objs = list(nodes.values())
         if relative_pos:
             self._viewer.move_nodes([n.view for n in node_objs])
-            [setattr(n.model, 'pos', n.view.pos) for n in node_objs]
+            [setattr(n.model, 'pos', n.view.xy_pos) for n in node_objs]
         elif pos:
             self._viewer.move_nodes([n.view for n in node_objs], pos=pos)
 
@@ -664,44 +1295,500 @@ class NodeGraph(QtCore.QObject):
         """
         return self._serialize(self.all_nodes())
 
-    def save_session(self, file_path):
+    def save_session(self, file_path, format=None, compression_level=None):
         """
-        Saves the current node graph session layout to a `JSON` formatted file.
+        Saves the current node graph session layout to a file.
+
+        The session is saved as `JSON` unless the file extension is ".ngb"
+        or the format is "binary" (compact binary format see
+        :mod:`NodeGraphQt.base.session`), the nodes and connections are
+        written one at a time to a temporary file that replaces the file
+        once it's complete.
+
+        The session is compressed while it's written if the file name ends
+        with ".gz", ".xz" or ".bz2" (e.g. "session.json.gz").
 
         Args:
             file_path (str): path to the saved node layout.
+            format (str): "json" or "binary" (default: from the extension).
+            compression_level (int): gzip and bz2 level 1-9 or xz preset
+                0-9 (default: 6 for gzip and xz, 9 for bz2).
         """
-        serliazed_data = self._serialize(self.all_nodes())
         file_path = file_path.strip()
-        with open(file_path, 'w') as file_out:
-            json.dump(serliazed_data, file_out, indent=2, separators=(',', ':'))
+        self.wait_for_saves()
+        journal = self.journal()
+        if journal and os.path.abspath(file_path) != journal.session_path:
+            journal = None
+        if journal:
+            journal.checkpoint(file_path)
+        write_session_file(file_path, self._session_records(), format,
+                           compression_level)
+        if journal:
+            journal.checkpoint_saved(file_path)
+
+    def save_session_async(self, file_path, format=None,
+                           compression_level=None):
+        """
+        Save the current node graph session layout to a file on a worker
+        thread.
+
+        A snapshot of the session is taken before returning so changes
+        made while the file is written aren't saved. The
+        :attr:`NodeGraph.session_saved` or
+        :attr:`NodeGraph.session_save_failed` signal is emitted when the
+        file has been written, saves are written in the order they're
+        requested.
 
-    def load_session(self, file_path):
+        Args:
+            file_path (str): path to the saved node layout.
+            format (str): "json" or "binary" (default: from the extension).
+            compression_level (int): compression level of compressed files
+                (see :meth:`NodeGraph.save_session`).
+        """
+        file_path = file_path.strip()
+        session_format(file_path, format)
+        journal = self.journal()
+        if journal and os.path.abspath(file_path) != journal.session_path:
+            journal = None
+        self._queue_save(file_path, format, journal,
+                         compression_level=compression_level)
+
+    def _queue_save(self, file_path, format, journal=None, emit=True,
+                    compression_level=None):
+        """
+        Take a snapshot of the session and queue it to be written on a
+        worker thread.
+        (used internally by the node graph)
+
+        Args:
+            file_path (str): session file path.
+            format (str): "json" or "binary" (default: from the extension).
+            journal (NodeGraphQt.base.journal.SessionJournal): journal to
+                rebase on the saved file.
+            emit (bool): emit the saved or save failed signals.
+            compression_level (int): compression level of compressed files.
+        """
+        records = list(snapshot_records(self._session_records()))
+        if journal:
+            journal.checkpoint(file_path)
+        self._save_queue.append(
+            (file_path, records, format, compression_level, journal, emit))
+        if self._save_thread is None:
+            self._start_next_save()
+
+    def _start_next_save(self):
+        """
+        Start the next queued asynchronous save.
+        (used internally by the node graph)
+        """
+        if self._save_thread is not None:
+            # the finished signal is emitted just before the thread exits,
+            # keep the reference until it's no longer running.
+            self._save_thread.wait()
+        if not self._save_queue:
+            self._save_thread = None
+            return
+        file_path, records, format, level, journal, emit = \
+            self._save_queue.pop(0)
+        self._save_thread = _SessionSaveThread(
+            file_path, records, format, level)
+        self._save_thread.saved.connect(
+            functools.partial(self._on_session_save_done,
+                              journal=journal, emit=emit),
+            QtCore.Qt.QueuedConnection)
+        self._save_thread.finished.connect(
+            self._start_next_save, QtCore.Qt.QueuedConnection)
+        self._save_thread.start()
+
+    def _on_session_save_done(self, file_path, error, journal=None,
+                              emit=True):
+        """
+        called when an asynchronous save has been written.
+
+        Args:
+            file_path (str): session file path.
+            error (str): error message or empty if the file was saved.
+            journal (NodeGraphQt.base.journal.SessionJournal): journal to
+                rebase on the saved file.
+            emit (bool): emit the saved or save failed signals.
+        """
+        if journal and journal is self._journal:
+            if journal.autosave_path == os.path.abspath(file_path):
+                self._journal_compacting = False
+            if not error:
+                journal.checkpoint_saved(file_path)
+        if not emit:
+            return
+        if error:
+            self.session_save_failed.emit(file_path, error)
+        else:
+            self.session_saved.emit(file_path)
+
+    def wait_for_saves(self):
+        """
+        Block until all the asynchronous saves started with
+        :meth:`NodeGraph.save_session_async` have been written.
+        """
+        while self._save_thread is not None:
+            self._save_thread.wait()
+            QtCore.QCoreApplication.sendPostedEvents()
+
+    def _session_records(self):
+        """
+        Yields the session records of the nodes and connections.
+        (used internally by the node graph)
+
+        Returns:
+            generator: (kind, key, value) session records.
+        """
+        for node in self.all_nodes():
+            node.update_model()
+            yield 'node', node.id, node.model.session_data
+        for out_id, out_port, in_id, in_port in self._model.edge_keys():
+            yield 'connection', None, {'out': [out_id, out_port],
+                                       'in': [in_id, in_port]}
+
+    def load_session(self, file_path, format=None, batch_size=1000,
+                     recover=True):
         """
         Load node graph session layout file.
 
+        The file is read incrementally and the nodes are added to the node
+        graph in batches, the :attr:`NodeGraph.session_load_progress`
+        signal is emitted after each batch and the load can be stopped
+        from a connected slot with :meth:`NodeGraph.cancel_session_load`.
+        Binary and compressed session files are detected from their
+        signature.
+
+        If the session has an autosave journal with changes that weren't
+        saved (see :meth:`NodeGraph.set_journal_enabled`) the changes are
+        replayed after the session is loaded, the
+        :attr:`NodeGraph.session_recovery_failed` signal is emitted if the
+        journal doesn't apply to the session file anymore.
+
         Args:
             file_path (str): path to the serialized layout file.
+            format (str): "json" or "binary" (default: detected).
+            batch_size (int): nodes and connections added per batch.
+            recover (bool): False to ignore the autosave journal.
+
+        Returns:
+            bool: False if the session couldn't be read or the load was
+                cancelled (the node graph is left empty).
         """
         file_path = file_path.strip()
         if not os.path.isfile(file_path):
             raise IOError('file does not exist.')
 
         self.clear_session()
+        self._load_cancelled = False
+
+        base_path = file_path
+        records = []
+        journal_file = journal_path(os.path.abspath(file_path))
+        if recover and os.path.isfile(journal_file):
+            records = read_journal(journal_file)
+            base_path, start = recovery_point(journal_file, records)
+            if base_path is None:
+                self.session_recovery_failed.emit(
+                    journal_file, 'the session file has changed.')
+                base_path, records = file_path, []
+            else:
+                records = records[start:]
+                if base_path != os.path.abspath(file_path):
+                    format = None
+
+        nodes = self._read_session_file(base_path, format, batch_size)
+        if nodes is None:
+            self.clear_session()
+            return False
 
+        if records:
+            self._replay_journal(records, nodes)
+
+        self._undo_stack.clear()
+        self._model.session = file_path
+
+        if self._journal_enabled:
+            self._journal = SessionJournal(
+                file_path, self._schedule_journal_compaction,
+                self._journal_compact_size)
+            ids = {n.id: jid for jid, n in nodes.items()}
+            if records:
+                count = sum(1 for r in records if r[0] not in ('save', 'saved'))
+                self._journal.resume(base_path, count, ids)
+            else:
+                self._journal.start(file_path, ids)
+        return True
+
+    def _read_session_file(self, file_path, format, batch_size):
+        """
+        Load the nodes and connections from a session file.
+        (used internally by the node graph)
+
+        Args:
+            file_path (str): session file path.
+            format (str): "json" or "binary" (default: detected).
+            batch_size (int): nodes and connections added per batch.
+
+        Returns:
+            dict: {serialized node id: node} or None if the session
+                couldn't be read or the load was cancelled.
+        """
         try:
-            with open(file_path) as data_file:
-                layout_data = json.load(data_file)
-        except Exception as e:
-            layout_data = None
+            with open(file_path, 'rb') as raw_file:
+                data_file, compression = open_session_stream(raw_file)
+                if format is None:
+                    binary = is_binary(data_file.peek(len(BINARY_MAGIC)))
+                else:
+                    binary = session_format(file_path, format) == 'binary'
+                size = os.path.getsize(file_path)
+                if binary and compression:
+                    reader = BinarySessionReader(data_file, raw_file=raw_file)
+                elif binary:
+                    reader = BinarySessionReader(data_file)
+                elif compression:
+                    reader = JsonSessionReader(data_file, raw_file=raw_file)
+                else:
+                    reader = JsonSessionReader(data_file)
+                return self._load_records(reader, size, batch_size)
+        except ((IOError, ValueError, struct.error) +
+                compression_errors()) as e:
             print('Cannot read data from file.\n{}'.format(e))
 
-        if not layout_data:
+    def _replay_journal(self, records, nodes):
+        """
+        Apply the autosave journal records without recording undo
+        commands.
+        (used internally by the node graph)
+
+        Args:
+            records (list[list]): journal records.
+            nodes (dict): {journal node id: node} updated with the nodes
+                added and removed by the records.
+        """
+        ports = {}
+
+        def edge_ports(edge):
+            conn_ports = self._connection_ports(
+                {'out': edge[0:2], 'in': edge[2:4]}, nodes, ports)
+            if conn_ports:
+                return conn_ports[1], conn_ports[0]
+
+        if self._viewer:
+            self._viewer.begin_update()
+        try:
+            for record in records:
+                op = record[0]
+                if op == 'add':
+                    added = []
+                    node_names = set()
+                    for jid, n_data in record[1].items():
+                        node = self._build_node(n_data, node_names)
+                        if node is not None:
+                            nodes[jid] = node
+                            added.append(node)
+                    connections = []
+                    for edge in record[2]:
+                        edge = edge_ports(edge)
+                        if edge:
+                            connections.append((edge[1], edge[0]))
+                    NodesAddedCmd(self, added, connections).redo()
+                elif op == 'remove':
+                    removed = [nodes.pop(j) for j in record[1] if j in nodes]
+                    for node in removed:
+                        ports.pop(node.id, None)
+                    NodesRemovedCmd(self, removed).redo()
+                elif op == 'edges':
+                    undo_cmd = PortConnectionsCmd(self)
+                    undo_cmd.changes = []
+                    for change in record[1]:
+                        edge = edge_ports(change[1:])
+                        if edge:
+                            undo_cmd.changes.append((bool(change[0]),) + edge)
+                    undo_cmd.redo()
+                elif op == 'set':
+                    node = nodes.get(record[1])
+                    if node is not None:
+                        PropertyChangedCmd(node, record[2], record[3]).redo()
+                elif op == 'move':
+                    node_ids = []
+                    pos = []
+                    for i, jid in enumerate(record[1]):
+                        if jid in nodes:
+                            node_ids.append(nodes[jid].id)
+                            pos += record[2][i * 2:i * 2 + 2]
+                    NodesMovedCmd(self, node_ids, pos, []).redo()
+                elif op == 'select':
+                    self._selection.apply_changes(
+                        set(nodes[j].id for j in record[1] if j in nodes),
+                        set(nodes[j].id for j in record[2] if j in nodes))
+                elif op == 'save':
+                    renamed = {live: nodes.pop(jid)
+                               for jid, live in record[2].items()
+                               if jid in nodes}
+                    nodes.update(renamed)
+        finally:
+            if self._viewer:
+                self._viewer.end_update()
+
+    def journal_enabled(self):
+        """
+        Returns True if the session changes are written to an autosave
+        journal.
+
+        Returns:
+            bool: autosave journal enabled.
+        """
+        return self._journal_enabled
+
+    def set_journal_enabled(self, mode=True, compact_size=None):
+        """
+        Write the changes made with undo commands to an autosave journal
+        next to the current session file ("<session>.journal").
+
+        Each change appends a record to the journal and the journal is
+        folded into an autosave copy of the session every
+        ``compact_size`` records. Saving the session to its file resets
+        the journal, :meth:`NodeGraph.load_session` replays the journal
+        to recover the changes that weren't saved.
+
+        The journal is started for the current session when it's loaded
+        with :meth:`NodeGraph.load_session`.
+
+        Args:
+            mode (bool): False to stop and remove the journal.
+            compact_size (int): number of records before the journal is
+                compacted (default: 10000).
+        """
+        self._journal_enabled = mode
+        if compact_size:
+            self._journal_compact_size = compact_size
+            if self._journal:
+                self._journal.compact_size = compact_size
+        if not mode:
+            if self._journal:
+                self._journal.discard()
+            self._journal = None
+            return
+        session = self._model.session
+        if self._journal or not session:
             return
+        # the session may have changed since it was loaded so the journal
+        # starts from a copy of the current session.
+        self._journal = SessionJournal(
+            session, self._schedule_journal_compaction,
+            self._journal_compact_size)
+        write_session_file(self._journal.autosave_path,
+                           self._session_records(), session_format(session))
+        self._journal.start(self._journal.autosave_path)
 
-        self._deserialize(layout_data)
-        self._undo_stack.clear()
-        self._model.session = file_path
+    def journal(self):
+        """
+        Returns the autosave journal of the current session.
+
+        Returns:
+            NodeGraphQt.base.journal.SessionJournal: journal or None if
+                the journal isn't enabled or there's no current session.
+        """
+        if self._journal and self._journal.is_open():
+            return self._journal
+
+    def _schedule_journal_compaction(self):
+        """
+        Compact the autosave journal once the current changes are done.
+        (used internally by the node graph)
+        """
+        if not self._journal_compacting:
+            self._journal_compacting = True
+            QtCore.QTimer.singleShot(0, self.compact_journal)
+
+    def compact_journal(self):
+        """
+        Fold the autosave journal into an autosave copy of the session,
+        the copy is written on a worker thread.
+        """
+        journal = self.journal()
+        if journal is None:
+            self._journal_compacting = False
+            return
+        self._journal_compacting = True
+        session = journal.session_path
+        self._queue_save(journal.autosave_path, session_format(session),
+                         journal, emit=False)
+
+    def cancel_session_load(self):
+        """
+        Stop the session that's being loaded with
+        :meth:`NodeGraph.load_session` after the current batch.
+        """
+        self._load_cancelled = True
+
+    def _load_records(self, reader, size, batch_size):
+        """
+        Build the nodes and connections from the session records in
+        batches without recording undo commands.
+        (used internally by the node graph)
+
+        Args:
+            reader (JsonSessionReader or BinarySessionReader): session
+                reader.
+            size (int): session file size.
+            batch_size (int): nodes and connections added per batch.
+
+        Returns:
+            dict: {serialized node id: node} or None if there's nothing to
+                load or the load was cancelled.
+        """
+        node_names = set()
+        nodes = {}
+        ports = {}
+        batch_nodes = []
+        batch_connections = []
+        # connections read before their nodes.
+        pending = []
+        loaded = False
+
+        def add_batch():
+            connections = []
+            for connection in batch_connections:
+                conn_ports = self._connection_ports(connection, nodes, ports)
+                if conn_ports:
+                    connections.append(conn_ports)
+                elif not (connection.get('in', ('',))[0] in nodes and
+                          connection.get('out', ('',))[0] in nodes):
+                    pending.append(connection)
+            NodesAddedCmd(self, batch_nodes, connections).redo()
+            del batch_nodes[:]
+            del batch_connections[:]
+
+        if self._viewer:
+            self._viewer.begin_update()
+        try:
+            for kind, key, value in reader:
+                loaded = True
+                if kind == 'node':
+                    node = self._build_node(value, node_names)
+                    if node is not None:
+                        nodes[key] = node
+                        batch_nodes.append(node)
+                elif kind == 'connection':
+                    batch_connections.append(value)
+                if len(batch_nodes) + len(batch_connections) < batch_size:
+                    continue
+                add_batch()
+                self.session_load_progress.emit(reader.position, size)
+                if self._load_cancelled:
+                    return
+            batch_connections.extend(pending)
+            del pending[:]
+            add_batch()
+        finally:
+            if self._viewer:
+                self._viewer.end_update()
+        self.session_load_progress.emit(size, size)
+        if loaded:
+            return nodes
 
     def copy_nodes(self, nodes=None):
         """
@@ -732,9 +1819,8 @@ class NodeGraph(QtCore.QObject):
 
         self._undo_stack.beginMacro('pasted nodes')
         serial_data = json.loads(cb_string)
-        self.clear_selection()
         nodes = self._deserialize(serial_data, True)
-        [n.set_selected(True) for n in nodes]
+        self._selection.set_selection(nodes)
         self._undo_stack.endMacro()
 
     def duplicate_nodes(self, nodes):
@@ -751,14 +1837,11 @@ class NodeGraph(QtCore.QObject):
 
         self._undo_stack.beginMacro('duplicated nodes')
 
-        self.clear_selection()
         serial = self._serialize(nodes)
         new_nodes = self._deserialize(serial)
         offset = 50
-        for n in new_nodes:
-            x, y = n.pos()
-            n.set_pos(x + offset, y + offset)
-            n.set_property('selected', True)
+        self.move_nodes(new_nodes, offset, offset)
+        self._selection.set_selection(new_nodes)
 
         self._undo_stack.endMacro()
         return new_nodes
@@ -0,0 +1,427 @@
+#!/usr/bin/python
+"""
+Append-only autosave journal.
+
+The undo commands append a delta record to the journal next to the
+session file for every change they apply, the journal is replayed on top
+of its base session to recover the changes that weren't saved.
+
+The journal is a JSON lines file of ``[op, ...]`` records::
+
+    ["base", file, size, mtime]         base session file (first record)
+    ["add", {id: node data}, [edge]]    nodes and connections added
+    ["remove", [id]]                    nodes (and their connections)
+                                        removed
+    ["edges", [[connected, edge]]]      ports connected (1) or
+                                        disconnected (0) in order
+    ["set", id, name, value]            node property changed
+    ["move", [id], [x, y, ...]]         nodes moved
+    ["select", [id], [id]]              nodes selected and deselected
+    ["save", file, {id: new id}]        session snapshot taken for a save
+    ["saved", file, size, mtime]        session snapshot has been written
+
+Edges are ``out node id, out port, in node id, in port``. Node ids are
+the ids in the base session, nodes created afterwards keep their own id
+unless it's already taken.
+"""
+import json
+import os
+
+#: journal file extension added to the session file path.
+JOURNAL_EXT = '.journal'
+#: autosave base session extension added to the session file path.
+AUTOSAVE_EXT = '.autosave'
+#: number of journal records before the journal is compacted.
+JOURNAL_COMPACT_SIZE = 10000
+
+
+def journal_path(session_path):
+    """
+    Returns the journal file path for the session file.
+
+    Args:
+        session_path (str): session file path.
+
+    Returns:
+        str: journal file path.
+    """
+    return session_path + JOURNAL_EXT
+
+
+def file_stamp(file_path):
+    """
+    Returns the (size, modified time) used to check the base session file
+    hasn't changed since it was written.
+
+    Args:
+        file_path (str): file path.
+
+    Returns:
+        tuple(int, int): file size and modified time in nanoseconds.
+    """
+    stat = os.stat(file_path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def read_journal(file_path):
+    """
+    Read the journal records, an incomplete last record (written when the
+    application was stopped) is ignored.
+
+    Args:
+        file_path (str): journal file path.
+
+    Returns:
+        list[list]: journal records.
+    """
+    records = []
+    with open(file_path, 'rb') as file_in:
+        for line in file_in:
+            try:
+                records.append(json.loads(line.decode('utf-8')))
+            except ValueError:
+                break
+    return records
+
+
+def recovery_point(file_path, records):
+    """
+    Returns the base session file the journal records apply to and the
+    index of the first record to replay.
+
+    The base is the last session snapshot written for the journal
+    ("saved" record) or the journal base if the snapshot files have
+    changed since.
+
+    Args:
+        file_path (str): journal file path.
+        records (list[list]): journal records.
+
+    Returns:
+        tuple(str, int): base session file path and record index or
+            (None, None) if the base session file has changed.
+    """
+    dir_path = os.path.dirname(os.path.abspath(file_path))
+
+    def stamp_matches(record):
+        path = os.path.join(dir_path, record[1])
+        if not os.path.isfile(path):
+            return False
+        return list(file_stamp(path)) == list(record[2:4])
+
+    markers = {}
+    point = (None, None)
+    for i, record in enumerate(records):
+        op = record[0]
+        if op == 'base' and i == 0 and stamp_matches(record):
+            point = (os.path.join(dir_path, record[1]), 1)
+        elif op == 'save':
+            markers[record[1]] = i
+        elif op == 'saved' and record[1] in markers and stamp_matches(record):
+            point = (os.path.join(dir_path, record[1]),
+                     markers[record[1]] + 1)
+    return point
+
+
+class SessionJournal(object):
+    """
+    Autosave journal of a session file, the undo commands report their
+    changes with the record functions and each change is appended to the
+    journal file as one record.
+
+    Args:
+        session_path (str): session file path.
+        compact (function): called when the journal has more than
+            ``compact_size`` records since its base session.
+        compact_size (int): number of records before compacting.
+    """
+
+    def __init__(self, session_path, compact=None,
+                 compact_size=JOURNAL_COMPACT_SIZE):
+        self.session_path = os.path.abspath(session_path)
+        self.path = journal_path(self.session_path)
+        self.autosave_path = self.session_path + AUTOSAVE_EXT
+        self.compact_size = compact_size
+        self._compact = compact
+        self._file = None
+        self._base = None
+        self._records = 0
+        # {live node id: journal node id} for nodes with a different id
+        # in the journal.
+        self._ids = {}
+        self._used = set()
+        # [(session file path, journal offset after the save record)]
+        self._checkpoints = []
+
+    def __repr__(self):
+        return '{}.{}(\'{}\')'.format(
+            self.__module__, self.__class__.__name__, self.path)
+
+    def is_open(self):
+        """
+        Returns True if changes are written to the journal.
+
+        Returns:
+            bool: journal open.
+        """
+        return self._file is not None
+
+    def base(self):
+        """
+        Returns the base session file of the journal.
+
+        Returns:
+            str: session file path.
+        """
+        return self._base
+
+    def record_count(self):
+        """
+        Returns the number of records since the base session.
+
+        Returns:
+            int: journal records.
+        """
+        return self._records
+
+    def start(self, base_path, ids=None):
+        """
+        Start a new journal on the base session file, any previous
+        journal file is replaced.
+
+        Args:
+            base_path (str): base session file path.
+            ids (dict): {live node id: base session node id} for the
+                nodes loaded from the base session.
+        """
+        self.close()
+        self._base = os.path.abspath(base_path)
+        self._set_ids(ids)
+        self._checkpoints = []
+        self._records = 0
+        header = self._encode(['base', os.path.basename(self._base)] +
+                              list(file_stamp(self._base)))
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'wb') as file_out:
+            file_out.write(header)
+        os.replace(temp_path, self.path)
+        self._file = open(self.path, 'ab')
+
+    def resume(self, base_path, records, ids=None):
+        """
+        Continue writing to the existing journal file after it's been
+        replayed.
+
+        Args:
+            base_path (str): base session file path.
+            records (int): number of records since the base session.
+            ids (dict): {live node id: journal node id} for the nodes
+                built from the journal and base session.
+        """
+        self.close()
+        self._base = os.path.abspath(base_path)
+        self._set_ids(ids)
+        self._checkpoints = []
+        self._records = records
+        self._file = open(self.path, 'ab')
+
+    def close(self):
+        """
+        Stop writing to the journal, the journal file is kept.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def discard(self):
+        """
+        Close the journal and remove the journal and autosave files.
+        """
+        self.close()
+        for path in (self.path, self.autosave_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _set_ids(self, ids):
+        self._ids = {k: v for k, v in (ids or {}).items() if k != v}
+        self._used = set(self._ids.values())
+
+    @staticmethod
+    def _encode(record):
+        return (json.dumps(record, separators=(',', ':')) + '\n').encode(
+            'utf-8')
+
+    def _write(self, record, count=True):
+        if self._file is None:
+            return
+        self._file.write(self._encode(record))
+        self._file.flush()
+        if not count:
+            return
+        self._records += 1
+        if self._compact and self._records >= self.compact_size:
+            self._compact()
+
+    def _id(self, node_id):
+        """
+        Returns the journal id of the node.
+        """
+        jid = self._ids.get(node_id)
+        if jid is not None:
+            return jid
+        if node_id not in self._used:
+            return node_id
+        # the id is used by a node from the base session.
+        jid = node_id
+        while jid in self._used:
+            jid += '_'
+        self._ids[node_id] = jid
+        self._used.add(jid)
+        return jid
+
+    def _edge(self, out_port, in_port):
+        return [self._id(out_port.node().id), out_port.name(),
+                self._id(in_port.node().id), in_port.name()]
+
+    def nodes_added(self, nodes, edges=None):
+        """
+        Record nodes added to the node graph.
+
+        Args:
+            nodes (list[NodeGraphQt.NodeObject]): nodes.
+            edges (list[tuple(NodeGraphQt.Port, NodeGraphQt.Port)]):
+                (output port, input port) connections of the nodes.
+        """
+        if self._file is None:
+            return
+        n_data = {}
+        for node in nodes:
+            node.update_model()
+            n_data[self._id(node.id)] = node.model.session_data
+        self._write(['add', n_data,
+                     [self._edge(o, i) for o, i in edges or []]])
+
+    def nodes_removed(self, nodes):
+        """
+        Record nodes removed from the node graph.
+
+        Args:
+            nodes (list[NodeGraphQt.NodeObject]): nodes.
+        """
+        self._write(['remove', [self._id(n.id) for n in nodes]])
+
+    def ports_changed(self, changes):
+        """
+        Record port connections.
+
+        Args:
+            changes (list[tuple(bool, NodeGraphQt.Port, NodeGraphQt.Port)]):
+                (connected, output port, input port) changes in order.
+        """
+        if self._file is None or not changes:
+            return
+        self._write(['edges', [[int(c)] + self._edge(o, i)
+                               for c, o, i in changes]])
+
+    def property_changed(self, node, name, value):
+        """
+        Record a node property change.
+
+        Args:
+            node (NodeGraphQt.NodeObject): node.
+            name (str): property name.
+            value (object): property value.
+        """
+        self._write(['set', self._id(node.id), name, value])
+
+    def nodes_moved(self, node_ids, pos):
+        """
+        Record node positions.
+
+        Args:
+            node_ids (list[str]): node ids.
+            pos (list[float]): x, y positions.
+        """
+        if self._file is None:
+            return
+        self._write(['move', [self._id(i) for i in node_ids], list(pos)])
+
+    def selection_changed(self, selected, deselected):
+        """
+        Record a selection change.
+
+        Args:
+            selected (list[str]): selected node ids.
+            deselected (list[str]): deselected node ids.
+        """
+        if self._file is None:
+            return
+        self._write(['select', [self._id(i) for i in selected],
+                     [self._id(i) for i in deselected]])
+
+    def checkpoint(self, file_path):
+        """
+        Record a session snapshot taken to be saved to the file, the
+        records that follow use the node ids of the snapshot.
+
+        Args:
+            file_path (str): session file the snapshot is saved to.
+        """
+        if self._file is None:
+            return
+        renames = {jid: live for live, jid in self._ids.items()}
+        self._write(['save', os.path.basename(file_path), renames],
+                    count=False)
+        self._ids = {}
+        self._used = set()
+        self._checkpoints.append(
+            (os.path.abspath(file_path), self._file.tell()))
+
+    def checkpoint_saved(self, file_path):
+        """
+        Make the saved snapshot file the base of the journal, the journal
+        file is rewritten with the records after the snapshot.
+
+        Args:
+            file_path (str): session file the snapshot was saved to.
+        """
+        if self._file is None:
+            return
+        file_path = os.path.abspath(file_path)
+        for idx, (path, offset) in enumerate(self._checkpoints):
+            if path == file_path:
+                break
+        else:
+            return
+        # earlier snapshots are older than the new base.
+        later = self._checkpoints[idx + 1:]
+        self._checkpoints = []
+        # the saved record recovers the snapshot if the journal isn't
+        # rewritten.
+        stamp = file_stamp(file_path)
+        end = self._file.tell()
+        self._write(['saved', os.path.basename(file_path)] + list(stamp),
+                    count=False)
+        self._file.close()
+        self._file = None
+
+        with open(self.path, 'rb') as file_in:
+            file_in.seek(offset)
+            tail = file_in.read(end - offset)
+        header = self._encode(
+            ['base', os.path.basename(file_path)] + list(stamp))
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'wb') as file_out:
+            file_out.write(header)
+            file_out.write(tail)
+        os.replace(temp_path, self.path)
+        self._file = open(self.path, 'ab')
+
+        prev_base, self._base = self._base, file_path
+        if prev_base == self.autosave_path != file_path and \
+                os.path.exists(prev_base):
+            os.remove(prev_base)
+        self._records = sum(1 for line in tail.splitlines()
+                            if not line.startswith(b'["save"'))
+        self._checkpoints = [(p, o - offset + len(header))
+                             for p, o in later]
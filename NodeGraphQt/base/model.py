@@ -1,8 +1,10 @@
 #!/usr/bin/python
 import json
-from collections import defaultdict
+import re
+from collections import defaultdict, deque
 
-from NodeGraphQt.constants import (NODE_PROP,
+from NodeGraphQt.constants import (IN_PORT,
+                                   NODE_PROP,
                                    NODE_PROP_QLINEEDIT,
                                    NODE_PROP_QCHECKBOX,
                                    NODE_PROP_COLORPICKER)
@@ -216,6 +218,24 @@ class NodeModel(object):
 
         return {node_id: node_dict}
 
+    @property
+    def session_data(self):
+        """
+        Node properties as they're saved to a session file, the same as
+        :attr:`NodeModel.to_dict` without the node id and port connections
+        (connections are saved from the node graph edges).
+
+        Returns:
+            dict: node properties.
+        """
+        exclude = ('id', 'inputs', 'outputs', '_custom_prop', '_graph_model',
+                   '_TEMP_property_attrs', '_TEMP_property_widget_types')
+        node_dict = {k: v for k, v in self.__dict__.items()
+                     if k not in exclude}
+        if self._custom_prop:
+            node_dict['custom'] = self._custom_prop
+        return node_dict
+
     @property
     def serial(self):
         """
@@ -235,6 +255,26 @@ class NodeGraphModel(object):
         self.session = ''
         self.acyclic = True
 
+        # node name index {<node_name>: <node_id>}
+        self.node_names = {}
+        # next suffix number to try for each base node name.
+        self._name_counters = {}
+
+        # port level connection index from output ports to input ports and
+        # the reverse.
+        # {(<node_id>, <port_name>): {(<node_id>, <port_name>): <Port>}}
+        self._out_edges = {}
+        self._in_edges = {}
+        # node level adjacency {<node_id>: {<node_id>: <connection count>}}
+        self._successors = {}
+        self._predecessors = {}
+        # topological order maintained incrementally as connections are
+        # added (Pearce-Kelly) {<node_id>: <order index>}
+        self._topo_ord = {}
+        self._topo_next = 0
+        # false when a connection created a cycle (acyclic disabled).
+        self._topo_valid = True
+
         # store common node property attrs.
         # eg.
         # {'nodeGraphQt.nodes.FooNode': {
@@ -248,6 +288,394 @@ class NodeGraphModel(object):
         self.node_property_attrs = {}
 
 
+    def clear(self):
+        """
+        Remove all the nodes and connections from the graph model.
+        """
+        self.nodes = {}
+        self.node_names = {}
+        self._name_counters = {}
+        self._out_edges = {}
+        self._in_edges = {}
+        self._successors = {}
+        self._predecessors = {}
+        self._topo_ord = {}
+        self._topo_next = 0
+        self._topo_valid = True
+
+    def add_node(self, node):
+        """
+        Add a node to the graph model and the name index.
+
+        Args:
+            node (NodeGraphQt.NodeObject): node object.
+        """
+        self.nodes[node.id] = node
+        self.node_names[node.model.name] = node.id
+        self._successors.setdefault(node.id, {})
+        self._predecessors.setdefault(node.id, {})
+        if node.id not in self._topo_ord:
+            # a node with no connections can go anywhere in the order.
+            self._topo_ord[node.id] = self._topo_next
+            self._topo_next += 1
+
+    def remove_node(self, node):
+        """
+        Remove a node from the graph model and the name index.
+
+        Args:
+            node (NodeGraphQt.NodeObject): node object.
+        """
+        self.nodes.pop(node.id, None)
+        if self.node_names.get(node.model.name) == node.id:
+            del self.node_names[node.model.name]
+        for port_name in node.model.outputs:
+            key = (node.id, port_name)
+            for in_key in self._out_edges.pop(key, {}):
+                self._in_edges.get(in_key, {}).pop(key, None)
+        for port_name in node.model.inputs:
+            key = (node.id, port_name)
+            for out_key in self._in_edges.pop(key, {}):
+                self._out_edges.get(out_key, {}).pop(key, None)
+        for succ_id in self._successors.pop(node.id, {}):
+            self._predecessors[succ_id].pop(node.id, None)
+        for pred_id in self._predecessors.pop(node.id, {}):
+            self._successors[pred_id].pop(node.id, None)
+        self._topo_ord.pop(node.id, None)
+
+    def rename_node(self, node_id, old_name, new_name):
+        """
+        Update the name index when a node in the graph model is renamed.
+
+        Args:
+            node_id (str): node id.
+            old_name (str): previous node name.
+            new_name (str): new node name.
+        """
+        if self.node_names.get(old_name) != node_id:
+            return
+        del self.node_names[old_name]
+        self.node_names[new_name] = node_id
+
+    def unique_name(self, name, reserved=None):
+        """
+        Returns a node name that isn't already taken, a numbered suffix is
+        appended to the base name if the name exists.
+
+        Args:
+            name (str): node name.
+            reserved (set[str]): extra names to treat as taken.
+
+        Returns:
+            str: unique node name.
+        """
+        name = ' '.join(name.split())
+        reserved = reserved or ()
+        if name not in self.node_names and name not in reserved:
+            return name
+
+        search = re.search(r'^(.*?) *(\d+)$', name)
+        if search:
+            name = search.group(1)
+
+        count = self._name_counters.get(name, 1)
+        new_name = '{} {}'.format(name, count)
+        while new_name in self.node_names or new_name in reserved:
+            count += 1
+            new_name = '{} {}'.format(name, count)
+        self._name_counters[name] = count + 1
+        return new_name
+
+    def unique_names(self, name, count, reserved=None):
+        """
+        Returns a batch of node names that aren't already taken.
+
+        Args:
+            name (str): base node name.
+            count (int): number of names.
+            reserved (set[str]): extra names to treat as taken.
+
+        Returns:
+            list[str]: unique node names.
+        """
+        reserved = set(reserved or ())
+        names = []
+        for _ in range(count):
+            new_name = self.unique_name(name, reserved)
+            reserved.add(new_name)
+            names.append(new_name)
+        return names
+
+    def add_connection(self, out_port, in_port):
+        """
+        Register a connection from an output port to an input port in the
+        connection index and update the topological order, registering a
+        connection that's already in the index does nothing.
+
+        Args:
+            out_port (NodeGraphQt.Port): output port.
+            in_port (NodeGraphQt.Port): input port.
+        """
+        out_id = out_port.node().id
+        in_id = in_port.node().id
+        out_key = (out_id, out_port.name())
+        in_key = (in_id, in_port.name())
+        in_ports = self._out_edges.setdefault(out_key, {})
+        if in_key in in_ports:
+            return
+        in_ports[in_key] = in_port
+        self._in_edges.setdefault(in_key, {})[out_key] = out_port
+
+        succs = self._successors.setdefault(out_id, {})
+        preds = self._predecessors.setdefault(in_id, {})
+        count = succs.get(in_id, 0)
+        succs[in_id] = count + 1
+        preds[out_id] = count + 1
+        if count or not self._topo_valid:
+            return
+        self._topo_insert(out_id, in_id)
+
+    def add_connections(self, connections):
+        """
+        Register a batch of connections, large batches skip the incremental
+        topological order update and the order is rebuilt once on the next
+        query.
+
+        Args:
+            connections (list[tuple(NodeGraphQt.Port, NodeGraphQt.Port)]):
+                (output port, input port) pairs.
+        """
+        if len(connections) <= 64:
+            for out_port, in_port in connections:
+                self.add_connection(out_port, in_port)
+            return
+        topo_valid = self._topo_valid
+        self._topo_valid = False
+        for out_port, in_port in connections:
+            self.add_connection(out_port, in_port)
+        if topo_valid:
+            self._topo_rebuild()
+
+    def remove_connection(self, out_port, in_port):
+        """
+        Unregister a connection added with
+        :meth:`NodeGraphModel.add_connection`.
+
+        Args:
+            out_port (NodeGraphQt.Port): output port.
+            in_port (NodeGraphQt.Port): input port.
+        """
+        out_id = out_port.node().id
+        in_id = in_port.node().id
+        out_key = (out_id, out_port.name())
+        in_key = (in_id, in_port.name())
+        in_ports = self._out_edges.get(out_key, {})
+        if in_key not in in_ports:
+            return
+        del in_ports[in_key]
+        if not in_ports:
+            del self._out_edges[out_key]
+        out_ports = self._in_edges[in_key]
+        del out_ports[out_key]
+        if not out_ports:
+            del self._in_edges[in_key]
+
+        succs = self._successors[out_id]
+        count = succs[in_id] - 1
+        if count > 0:
+            succs[in_id] = count
+            self._predecessors[in_id][out_id] = count
+            return
+        del succs[in_id]
+        del self._predecessors[in_id][out_id]
+
+    def has_connection(self, out_port, in_port):
+        """
+        Returns True if the output port is connected to the input port.
+
+        Args:
+            out_port (NodeGraphQt.Port): output port.
+            in_port (NodeGraphQt.Port): input port.
+
+        Returns:
+            bool: True if connected.
+        """
+        out_key = (out_port.node().id, out_port.name())
+        in_key = (in_port.node().id, in_port.name())
+        return in_key in self._out_edges.get(out_key, ())
+
+    def connected_ports(self, port):
+        """
+        Returns the ports connected to the port.
+
+        Args:
+            port (NodeGraphQt.Port): port object.
+
+        Returns:
+            list[NodeGraphQt.Port]: connected ports.
+        """
+        key = (port.node().id, port.name())
+        if port.type_() == IN_PORT:
+            return list(self._in_edges.get(key, {}).values())
+        return list(self._out_edges.get(key, {}).values())
+
+    def upstream_ids(self, node_id):
+        """
+        Returns the ids of the nodes connected to the node inputs.
+
+        Args:
+            node_id (str): node id.
+
+        Returns:
+            iterator: node ids.
+        """
+        return iter(self._predecessors.get(node_id, ()))
+
+    def downstream_ids(self, node_id):
+        """
+        Returns the ids of the nodes connected to the node outputs.
+
+        Args:
+            node_id (str): node id.
+
+        Returns:
+            iterator: node ids.
+        """
+        return iter(self._successors.get(node_id, ()))
+
+    def edges(self):
+        """
+        Yields every connection in the graph once.
+
+        Returns:
+            generator: (output port, input port) pairs.
+        """
+        for out_key, in_ports in self._out_edges.items():
+            for in_key, in_port in in_ports.items():
+                yield self._in_edges[in_key][out_key], in_port
+
+    def edge_keys(self):
+        """
+        Yields every connection in the graph once as node ids and port
+        names.
+
+        Returns:
+            generator: (output node id, output port name, input node id,
+                input port name) tuples.
+        """
+        for out_key, in_ports in self._out_edges.items():
+            for in_key in in_ports:
+                yield out_key + in_key
+
+    def acyclic_check(self, out_node_id, in_node_id):
+        """
+        Validate that a new connection wouldn't loop the graph, only nodes
+        between the two nodes in the topological order are visited.
+
+        Args:
+            out_node_id (str): id of the node with the output port.
+            in_node_id (str): id of the node with the input port.
+
+        Returns:
+            bool: True if the connection is valid.
+        """
+        if out_node_id == in_node_id:
+            return False
+        if not self._topo_valid and not self._topo_rebuild():
+            return out_node_id not in self._reachable(in_node_id)
+        upper = self._topo_ord[out_node_id]
+        if self._topo_ord[in_node_id] > upper:
+            return True
+        return out_node_id not in self._reachable(in_node_id, upper)
+
+    def topological_order(self):
+        """
+        Returns the node ids sorted so every node comes after the nodes
+        connected to its inputs.
+
+        Returns:
+            list[str]: node ids.
+        """
+        if not self._topo_valid and not self._topo_rebuild():
+            raise AssertionError('node graph contains a cycle.')
+        return sorted(self.nodes.keys(), key=self._topo_ord.__getitem__)
+
+    def _reachable(self, node_id, upper=None, reverse=False, lower=None):
+        """
+        Returns the node ids reachable from the node, optionally bounded
+        by the topological order index.
+
+        Args:
+            node_id (str): start node id.
+            upper (int): skip downstream nodes ordered after this index.
+            reverse (bool): walk upstream instead of downstream.
+            lower (int): skip upstream nodes ordered before this index.
+
+        Returns:
+            set[str]: visited node ids.
+        """
+        adjacency = self._predecessors if reverse else self._successors
+        order = self._topo_ord
+        visited = {node_id}
+        stack = [node_id]
+        while stack:
+            for next_id in adjacency.get(stack.pop(), ()):
+                if next_id in visited:
+                    continue
+                if upper is not None and order[next_id] > upper:
+                    continue
+                if lower is not None and order[next_id] < lower:
+                    continue
+                visited.add(next_id)
+                stack.append(next_id)
+        return visited
+
+    def _topo_insert(self, out_node_id, in_node_id):
+        """
+        Pearce-Kelly reorder after adding the edge, only the nodes ordered
+        between the two nodes are visited and re-indexed.
+        """
+        order = self._topo_ord
+        lower = order[in_node_id]
+        upper = order[out_node_id]
+        if lower > upper:
+            return
+        forward = self._reachable(in_node_id, upper=upper)
+        if out_node_id in forward:
+            # connection made a cycle, the order is rebuilt on demand.
+            self._topo_valid = False
+            return
+        backward = self._reachable(out_node_id, reverse=True, lower=lower)
+        backward = sorted(backward, key=order.__getitem__)
+        forward = sorted(forward, key=order.__getitem__)
+        indices = sorted(order[n] for n in backward + forward)
+        for node_id, index in zip(backward + forward, indices):
+            order[node_id] = index
+
+    def _topo_rebuild(self):
+        """
+        Rebuild the topological order from scratch (Kahn's algorithm).
+
+        Returns:
+            bool: false if the graph contains a cycle.
+        """
+        in_degree = {n: len(self._predecessors.get(n, ())) for n in self.nodes}
+        queue = deque(n for n, d in in_degree.items() if not d)
+        order = {}
+        while queue:
+            node_id = queue.popleft()
+            order[node_id] = len(order)
+            for succ_id in self._successors.get(node_id, ()):
+                in_degree[succ_id] -= 1
+                if not in_degree[succ_id]:
+                    queue.append(succ_id)
+        if len(order) != len(self.nodes):
+            return False
+        self._topo_ord = order
+        self._topo_next = len(order)
+        self._topo_valid = True
+        return True
+
 if __name__ == '__main__':
     p = PortModel(None)
     # print(p.to_dict)
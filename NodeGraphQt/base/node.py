@@ -24,8 +24,12 @@ class NodeObject(object):
     """
     base skeleton class for all node objects.
 
+    The graphic item is only created when the node view is first accessed
+    so nodes in a headless node graph never build any Qt items.
+
     Args:
-        node (AbstractNodeItem): graphic item used for drawing.
+        node (AbstractNodeItem): graphic item class (or instance) used
+            for drawing.
     """
 
     #: unique node identifier domain.
@@ -40,10 +44,15 @@ class NodeObject(object):
         self._model = NodeModel()
         self._model.type_ = self.type_
         self._model.name = self.NODE_NAME
-        self._view = node
-        self._view.type_ = self.type_
-        self._view.name = self.model.name
-        self._view.id = self._model.id
+        self._view = None
+        if isinstance(node, type):
+            self._view_cls = node
+        else:
+            self._view_cls = node.__class__
+            self._view = node
+            self._view.type_ = self.type_
+            self._view.name = self.model.name
+            self._view.id = self._model.id
 
     def __repr__(self):
         return '{}(\'{}\')'.format(self.type_, self.NODE_NAME)
@@ -95,6 +104,8 @@ class NodeObject(object):
         Returns:
             AbstractNodeItem: node item.
         """
+        if self._view is None:
+            self._build_view()
         return self._view
 
     def set_view(self, item):
@@ -118,25 +129,52 @@ class NodeObject(object):
         """
         return self._model
 
+    def _build_view(self):
+        """
+        Create the graphic item from the node view class and update it
+        from the node model.
+        """
+        self._view = self._view_cls()
+        self._view.type_ = self.type_
+        self._view.name = self.model.name
+        self._view.id = self.model.id
+        self._setup_view()
+        self.update()
+
+    def _setup_view(self):
+        """
+        Called after the graphic item has been created.
+        (re-implemented by sub classes to build the port and widget items)
+        """
+        pass
+
     def set_model(self, model):
         self._model = model
         self._model.type_ = self.type_
-        self._model.id = self.view.id
+        if self._view is not None:
+            self._model.id = self._view.id
 
     def update_model(self):
         """
         Update the node model from view.
         """
+        if self._view is None:
+            return
+        model = self.model
+        properties = model.properties
+        custom_properties = model.custom_properties
         for name, val in self.view.properties.items():
-            if name in self.model.properties.keys():
-                setattr(self.model, name, val)
-            if name in self.model.custom_properties.keys():
-                self.model.custom_properties[name] = val
+            if name in properties:
+                setattr(model, name, val)
+            if name in custom_properties:
+                custom_properties[name] = val
 
     def update(self):
         """
         Update the node view from model.
         """
+        if self._view is None:
+            return
         settings = self.model.to_dict[self.model.id]
         settings['id'] = self.model.id
         if settings.get('custom'):
@@ -208,17 +246,31 @@ class NodeObject(object):
         Returns:
             bool: True if the node is selected.
         """
-        self.model.selected = self.view.isSelected()
+        if self.graph:
+            return self.graph.selection().is_selected(self)
+        if self._view is not None:
+            self.model.selected = self._view.isSelected()
         return self.model.selected
 
     def set_selected(self, selected=True):
         """
         Set the node to be selected or not selected.
 
+        (selection changes are not undoable by default see
+        :meth:`NodeGraphQt.base.selection.SelectionModel.set_undoable`)
+
         Args:
             selected (bool): True to select the node.
         """
-        self.set_property('selected', selected)
+        if self.graph:
+            if selected:
+                self.graph.selection().select([self])
+            else:
+                self.graph.selection().deselect([self])
+            return
+        self.model.selected = selected
+        if self._view is not None:
+            self._view.selected = selected
 
     def create_property(self, name, value, items=None, range=None, widget_type=NODE_PROP):
         """
@@ -253,8 +305,8 @@ class NodeObject(object):
             object: property data.
         """
         if name in self.model.custom_properties.keys():
-            if name == 'selected':
-                self.model.custom_properties[name] = self.view.selected
+            if name == 'selected' and self._view is not None:
+                self.model.custom_properties[name] = self._view.selected
             return self.model.custom_properties[name]
         return self.model.properties.get(name)
 
@@ -275,11 +327,16 @@ class NodeObject(object):
         if not exists:
             raise KeyError('No property "{}"'.format(name))
 
+        if name == 'selected':
+            self.set_selected(value)
+            return
+
         if self.graph:
             undo_stack = self.graph.undo_stack()
             undo_stack.push(PropertyChangedCmd(self, name, value))
         else:
-            setattr(self.view, name, value)
+            if self._view is not None:
+                setattr(self._view, name, value)
             if name in self.model.properties.keys():
                 setattr(self.model, name, value)
             elif name in self.model.custom_properties.keys():
@@ -353,8 +410,9 @@ class NodeObject(object):
         Returns:
             list[float, float]: x, y position.
         """
-        if self.view.xy_pos and self.view.xy_pos != self.model.pos:
-            self.model.pos = self.view.xy_pos
+        if self._view is not None:
+            if self._view.xy_pos and self._view.xy_pos != self.model.pos:
+                self.model.pos = self._view.xy_pos
 
         return self.model.pos
 
@@ -367,27 +425,75 @@ class Node(NodeObject):
     NODE_NAME = 'Base Node'
 
     def __init__(self):
-        super(Node, self).__init__(NodeItem())
+        super(Node, self).__init__(NodeItem)
         self._inputs = []
         self._outputs = []
+        # embedded widgets rebuilt on the view [(<add method>, <args>)]
+        self._widget_items = []
 
     def _on_widget_changed(self, name, value):
         self.model.custom_properties[name] = value
+        # widget edits aren't undo commands, record them in the autosave
+        # journal directly.
+        journal = self.graph.journal() if self.graph else None
+        if journal:
+            journal.property_changed(self, name, value)
+
+    def _setup_view(self):
+        """
+        Build the port and widget items on the node view.
+        """
+        for port in self._inputs:
+            port.set_view(self._view.add_input(
+                port.name(), port.multi_connection(), port.model.display_name))
+        for port in self._outputs:
+            port.set_view(self._view.add_output(
+                port.name(), port.multi_connection(), port.model.display_name))
+        for port in self._inputs + self._outputs:
+            if not port.visible():
+                port.view.setVisible(False)
+                if port.type_() == IN_PORT:
+                    text_item = self._view.get_input_text_item(port.view)
+                else:
+                    text_item = self._view.get_output_text_item(port.view)
+                text_item.setVisible(False)
+        for add_method, args in self._widget_items:
+            widget = getattr(self._view, add_method)(*args)
+            widget.value_changed.connect(self._on_widget_changed)
+
+    def _add_widget_item(self, add_method, *args):
+        """
+        Record the embedded widget and add it to the node view if the view
+        has been built.
+
+        Args:
+            add_method (str): node item method used to create the widget.
+            args (tuple): arguments for the node item method.
+        """
+        self._widget_items.append((add_method, args))
+        if self._view is not None:
+            widget = getattr(self._view, add_method)(*args)
+            widget.value_changed.connect(self._on_widget_changed)
 
     def update_model(self):
         """
         update the node model from view.
         """
+        if self._view is None:
+            return
+        model = self.model
+        properties = model.properties
+        custom_properties = model.custom_properties
         for name, val in self.view.properties.items():
             if name in ['inputs', 'outputs']:
                 continue
-            if name in self.model.properties.keys():
-                setattr(self.model, name, val)
-            if name in self.model.custom_properties.keys():
-                self.model.custom_properties[name] = val
+            if name in properties:
+                setattr(model, name, val)
+            if name in custom_properties:
+                custom_properties[name] = val
         for name, widget in self.view.widgets.items():
-            if name in self.model.custom_properties.keys():
-                self.model.custom_properties[name] = widget.value
+            if name in custom_properties:
+                custom_properties[name] = widget.value
 
     def set_property(self, name, value, update_widget=True):
         """
@@ -400,7 +506,9 @@ class Node(NodeObject):
             value: the new property value.
             update_widget (bool): update the node widget (default=True).
         """
-        node_widget = self.view.widgets.get(name)
+        node_widget = None
+        if self._view is not None:
+            node_widget = self._view.widgets.get(name)
         if node_widget and update_widget:
             node_widget.value = value
         super(Node, self).set_property(name, value)
@@ -437,7 +545,9 @@ class Node(NodeObject):
         """
         if name in self.inputs().keys():
             raise AssertionError('port name "{}" already taken.'.format(name))
-        view = self.view.add_input(name, multi_input, display_name)
+        view = None
+        if self._view is not None:
+            view = self._view.add_input(name, multi_input, display_name)
         port = Port(self, view)
         port.model.type_ = IN_PORT
         port.model.name = name
@@ -461,7 +571,9 @@ class Node(NodeObject):
         """
         if name in self.outputs().keys():
             raise AssertionError('port name "{}" already taken.'.format(name))
-        view = self.view.add_output(name, multi_output, display_name)
+        view = None
+        if self._view is not None:
+            view = self._view.add_output(name, multi_output, display_name)
         port = Port(self, view)
         port.model.type_ = OUT_PORT
         port.model.name = name
@@ -483,8 +595,7 @@ class Node(NodeObject):
         items = items or []
         self.create_property(
             name, items[0], items=items, widget_type=NODE_PROP_QCOMBO)
-        widget = self.view.add_combo_menu(name, label, items)
-        widget.value_changed.connect(lambda k, v: self._on_widget_changed(k, v))
+        self._add_widget_item('add_combo_menu', name, label, items)
 
     def add_text_input(self, name='', label='', text=''):
         """
@@ -496,8 +607,7 @@ class Node(NodeObject):
             text (str): pre filled text.
         """
         self.create_property(name, text, widget_type=NODE_PROP_QLINEEDIT)
-        widget = self.view.add_text_input(name, label, text)
-        widget.value_changed.connect(lambda k, v: self._on_widget_changed(k, v))
+        self._add_widget_item('add_text_input', name, label, text)
 
     def add_checkbox(self, name='', label='', text='', state=False):
         """
@@ -510,8 +620,7 @@ class Node(NodeObject):
             state (bool): pre-check.
         """
         self.create_property(name, state, widget_type=NODE_PROP_QCHECKBOX)
-        widget = self.view.add_checkbox(name, label, text, state)
-        widget.value_changed.connect(lambda k, v: self._on_widget_changed(k, v))
+        self._add_widget_item('add_checkbox', name, label, text, state)
 
     def inputs(self):
         """
@@ -586,7 +695,7 @@ class Backdrop(NodeObject):
     NODE_NAME = 'Backdrop'
 
     def __init__(self):
-        super(Backdrop, self).__init__(BackdropNodeItem())
+        super(Backdrop, self).__init__(BackdropNodeItem)
         # override base default color.
         self.model.color = (5, 129, 138, 255)
         self.create_property('bg_text', '')
@@ -595,7 +704,8 @@ class Backdrop(NodeObject):
         """
         Auto resize the backdrop node to fit around the intersecting nodes.
         """
-        self.view.auto_resize()
+        if self._view is not None:
+            self._view.auto_resize()
 
     def nodes(self):
         """
@@ -604,7 +714,9 @@ class Backdrop(NodeObject):
         Returns:
             list[NodeGraphQt.Node]: list of node under the backdrop.
         """
-        node_ids = [n.id for n in self.view.get_nodes()]
+        if self._view is None:
+            return []
+        node_ids = [n.id for n in self._view.get_nodes()]
         return [self.graph.get_node_by_id(nid) for nid in node_ids]
 
     def set_text(self, text=''):
@@ -639,7 +751,8 @@ class Backdrop(NodeObject):
                 self.set_property('height', size[1])
                 self.graph.end_undo()
                 return
-            self.view.width, self.view.height = size
+            if self._view is not None:
+                self._view.width, self._view.height = size
             self.model.width, self.model.height = size
 
     def size(self):
@@ -649,6 +762,7 @@ class Backdrop(NodeObject):
         Returns:
             tuple: node width, height
         """
-        self.model.width = self.view.width
-        self.model.height = self.view.height
+        if self._view is not None:
+            self.model.width = self._view.width
+            self.model.height = self._view.height
         return self.model.width, self.model.height
@@ -3,6 +3,7 @@ from NodeGraphQt.base.commands import (PortConnectedCmd,
                                        PortDisconnectedCmd,
                                        PortVisibleCmd)
 from NodeGraphQt.base.model import PortModel
+from NodeGraphQt.constants import OUT_PORT
 
 
 class Port(object):
@@ -11,7 +12,8 @@ class Port(object):
 
     Args:
         node (NodeGraphQt.NodeObject): parent node.
-        port (PortItem): graphic item used for drawing.
+        port (PortItem): graphic item used for drawing
+            (None until the node view is built).
     """
 
     def __init__(self, node, port):
@@ -38,8 +40,21 @@ class Port(object):
         Returns:
             PortItem: port item.
         """
+        if self.__view is None:
+            # the port items are created with the node view.
+            self.node().view
         return self.__view
 
+    def set_view(self, item):
+        """
+        Sets the graphic item used for the port.
+        (called when the parent node view is built)
+
+        Args:
+            item (PortItem): port view item.
+        """
+        self.__view = item
+
     @property
     def model(self):
         """
@@ -121,16 +136,7 @@ class Port(object):
         Returns:
             list[NodeGraphQt.Port]: list of connected ports.
         """
-        ports = []
-        graph = self.node().graph
-        for node_id, port_names in self.model.connected_ports.items():
-            for port_name in port_names:
-                node = graph.get_node_by_id(node_id)
-                if self.type_() == 'in':
-                    ports.append(node.outputs()[port_name])
-                elif self.type_() == 'out':
-                    ports.append(node.inputs()[port_name])
-        return ports
+        return self.node().graph.model.connected_ports(self)
 
     def connect_to(self, port=None):
         """
@@ -143,9 +149,20 @@ class Port(object):
             return
 
         graph = self.node().graph
-        viewer = graph.viewer()
         undo_stack = graph.undo_stack()
 
+        if self.type_() == OUT_PORT:
+            out_port, in_port = self, port
+        else:
+            out_port, in_port = port, self
+        if graph.model.has_connection(out_port, in_port):
+            return
+
+        if graph.acyclic():
+            out_id, in_id = out_port.node().id, in_port.node().id
+            if not graph.model.acyclic_check(out_id, in_id):
+                return
+
         undo_stack.beginMacro('connected port')
 
         pre_conn_port = None
@@ -158,11 +175,6 @@ class Port(object):
                 undo_stack.push(PortDisconnectedCmd(self, port))
             return
 
-        if graph.acyclic() and viewer.acyclic_check(self.view, port.view):
-            if pre_conn_port:
-                undo_stack.push(PortDisconnectedCmd(self, pre_conn_port))
-                return
-
         trg_conn_ports = port.connected_ports()
         if not port.multi_connection() and trg_conn_ports:
             dettached_port = trg_conn_ports[0]
@@ -174,7 +186,7 @@ class Port(object):
         undo_stack.endMacro()
 
         # emit "port_connected" signal from the parent graph.
-        graph.port_connected.emit(self, port)
+        graph._emit_signal(graph.port_connected, self, port)
 
     def disconnect_from(self, port=None):
         """
@@ -0,0 +1,255 @@
+#!/usr/bin/python
+from ..vendor.Qt import QtCore
+
+from NodeGraphQt.base.commands import NodesSelectedCmd
+
+
+class SelectionModel(QtCore.QObject):
+    """
+    Set of the selected nodes in a node graph, selection changes are
+    applied to the node models and the viewer in one batch and emitted
+    with a single signal.
+
+    Selection changes are not recorded on the undo stack unless enabled
+    with :meth:`SelectionModel.set_undoable`.
+
+    Args:
+        graph (NodeGraphQt.NodeGraph): node graph.
+    """
+
+    #: signal emitted once per selection change with the
+    #: (selected node ids, deselected node ids).
+    selection_changed = QtCore.Signal(list, list)
+
+    def __init__(self, graph):
+        super(SelectionModel, self).__init__(graph)
+        self._graph = graph
+        self._ids = set()
+        self._undoable = False
+
+    def __repr__(self):
+        return '{}.{}({})'.format(
+            self.__module__, self.__class__.__name__, len(self))
+
+    def __len__(self):
+        self._sync()
+        return len(self._ids)
+
+    def __contains__(self, node):
+        self._sync()
+        return self._node_id(node) in self._ids
+
+    def __iter__(self):
+        return iter(self.nodes())
+
+    @staticmethod
+    def _node_id(node):
+        return node if isinstance(node, str) else node.id
+
+    def _sync(self):
+        """
+        Apply the pending selection changes from the viewer.
+        """
+        viewer = self._graph.viewer()
+        if viewer:
+            viewer.flush_selection_changed()
+
+    def undoable(self):
+        """
+        Returns True if selection changes are recorded on the undo stack.
+
+        Returns:
+            bool: undoable selection.
+        """
+        return self._undoable
+
+    def set_undoable(self, mode=False):
+        """
+        Record selection changes on the undo stack (default: False).
+
+        Args:
+            mode (bool): True to make selection changes undoable.
+        """
+        self._undoable = mode
+
+    def ids(self):
+        """
+        Returns the ids of the selected nodes.
+
+        Returns:
+            list[str]: node ids.
+        """
+        self._sync()
+        return list(self._ids)
+
+    def nodes(self):
+        """
+        Returns the selected nodes.
+
+        Returns:
+            list[NodeGraphQt.NodeObject]: selected nodes.
+        """
+        self._sync()
+        nodes = self._graph.model.nodes
+        return [nodes[i] for i in self._ids if i in nodes]
+
+    def is_selected(self, node):
+        """
+        Returns True if the node is selected.
+
+        Args:
+            node (NodeGraphQt.NodeObject or str): node or node id.
+
+        Returns:
+            bool: True if selected.
+        """
+        return node in self
+
+    def select(self, nodes):
+        """
+        Add nodes to the selection.
+
+        Args:
+            nodes (list[NodeGraphQt.NodeObject]): nodes or node ids.
+        """
+        self.change([self._node_id(n) for n in nodes], [], 'selected nodes')
+
+    def deselect(self, nodes):
+        """
+        Remove nodes from the selection.
+
+        Args:
+            nodes (list[NodeGraphQt.NodeObject]): nodes or node ids.
+        """
+        self.change([], [self._node_id(n) for n in nodes],
+                     'deselected nodes')
+
+    def toggle(self, nodes):
+        """
+        Toggle the selected state of the nodes.
+
+        Args:
+            nodes (list[NodeGraphQt.NodeObject]): nodes or node ids.
+        """
+        self._sync()
+        node_ids = set(self._node_id(n) for n in nodes)
+        self.change(node_ids - self._ids, node_ids & self._ids,
+                     'toggled selection')
+
+    def set_selection(self, nodes):
+        """
+        Replace the selection with the nodes.
+
+        Args:
+            nodes (list[NodeGraphQt.NodeObject]): nodes or node ids.
+        """
+        self._sync()
+        node_ids = set(self._node_id(n) for n in nodes)
+        self.change(node_ids, self._ids - node_ids, 'selected nodes')
+
+    def select_all(self):
+        """
+        Select all the nodes in the node graph.
+        """
+        self.change(list(self._graph.model.nodes.keys()), [], 'select all')
+
+    def clear(self):
+        """
+        Deselect all the nodes in the node graph.
+        """
+        self._sync()
+        self.change([], list(self._ids), 'deselected nodes')
+
+    def reset(self):
+        """
+        Drop the selection without updating the nodes (used when all the
+        nodes are removed from the node graph).
+        """
+        node_ids, self._ids = list(self._ids), set()
+        if node_ids:
+            self.selection_changed.emit([], node_ids)
+
+    def sync_nodes(self, nodes):
+        """
+        Update the selection from the node models after the nodes have
+        been added to or removed from the node graph.
+
+        Args:
+            nodes (list[NodeGraphQt.NodeObject]): added or removed nodes.
+        """
+        graph_nodes = self._graph.model.nodes
+        selected = set()
+        deselected = set()
+        for node in nodes:
+            if node.id in graph_nodes and node.model.selected:
+                if node.id not in self._ids:
+                    selected.add(node.id)
+            elif node.id in self._ids:
+                deselected.add(node.id)
+        if selected or deselected:
+            self._ids.update(selected)
+            self._ids.difference_update(deselected)
+            self.selection_changed.emit(list(selected), list(deselected))
+
+    def change(self, selected, deselected, label='selected nodes'):
+        """
+        Apply the changes to the selection (recorded on the undo stack if
+        the selection is undoable).
+
+        Args:
+            selected (list[str]): node ids to select.
+            deselected (list[str]): node ids to deselect.
+            label (str): undo command label.
+        """
+        self._sync()
+        nodes = self._graph.model.nodes
+        selected = set(i for i in selected
+                       if i not in self._ids and i in nodes)
+        deselected = set(deselected) & self._ids
+        if not (selected or deselected):
+            return
+        if self._undoable:
+            undo_cmd = NodesSelectedCmd(self, selected, deselected)
+            undo_cmd.setText(label)
+            self._graph.undo_stack().push(undo_cmd)
+        else:
+            self.apply_changes(selected, deselected)
+
+    def apply_changes(self, selected, deselected):
+        """
+        Set the selected state on the node models and the viewer items
+        in one batch and emit the selection changed signal.
+
+        Args:
+            selected (set[str]): node ids to select.
+            deselected (set[str]): node ids to deselect.
+        """
+        nodes = self._graph.model.nodes
+        selected = [nodes[i] for i in selected if i in nodes]
+        deselected = [nodes[i] for i in deselected if i in nodes]
+        for node in deselected:
+            node.model.selected = False
+        for node in selected:
+            node.model.selected = True
+        deselected_ids = [n.id for n in deselected]
+        if len(deselected_ids) > len(self._ids) // 2:
+            # rebuild the set, sets don't shrink when items are removed.
+            self._ids = self._ids.difference(deselected_ids)
+        else:
+            self._ids.difference_update(deselected_ids)
+        self._ids.update(n.id for n in selected)
+
+        viewer = self._graph.viewer()
+        if viewer:
+            viewer.select_nodes([n.view for n in selected],
+                                [n.view for n in deselected])
+            # the viewer changes are already applied.
+            viewer.flush_selection_changed()
+
+        journal = self._graph.journal()
+        if journal:
+            journal.selection_changed([n.id for n in selected],
+                                      [n.id for n in deselected])
+
+        self.selection_changed.emit([n.id for n in selected],
+                                    [n.id for n in deselected])
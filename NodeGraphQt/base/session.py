@@ -0,0 +1,1226 @@
+#!/usr/bin/python
+"""
+Session file formats.
+
+Sessions are read and written as a stream of ``(kind, key, value)``
+records by the session readers and writers, ``("node", node id, node data)``,
+``("connection", None, connection data)`` and ``("extra", key, value)``
+for any other top level session key.
+
+Besides JSON a session can be saved in a compact binary format, strings
+(ids, node types, names, property and port names) are stored once and
+referenced by index from fixed width node and edge records.
+
+Binary layout (little endian)::
+
+    header      magic "NGQB", uint16 version, uint16 reserved,
+                uint32 string count, uint32 node count, uint32 edge count,
+                uint64 offset of the extra data
+    blocks      uint8 block type followed by the block data, the strings
+                are added to the string table before the blocks using them
+      strings   uint32 count, uint32 byte length per string, utf-8 data
+      nodes     uint32 count, fixed width node record per node each
+                followed by its extra property records
+      edges     uint32 count, (out node id, out port, in node id,
+                in port) uint32 string index records
+      end       end of the blocks
+    extra       uint32 length, JSON data for any other session keys
+
+The blocks are written as the records come in and the header counts and
+extra offset are filled in when the writer is closed, they're left at 0
+if the file can't seek back (compressed files).
+
+Version 1 files have no blocks, the string table, nodes and edges
+(indexed by node record) are written once in that order after the magic,
+version and reserved fields.
+
+Either format can be compressed with gzip, xz or bz2 by adding the
+compression extension to the file name (e.g. "session.json.gz"), the
+compression is detected from the file signature when reading.
+"""
+import bz2
+import codecs
+import gzip
+import io
+import json
+import os
+import shutil
+import struct
+import sys
+import uuid
+import zlib
+from array import array
+
+#: binary session file signature.
+BINARY_MAGIC = b'NGQB'
+#: binary session format version.
+BINARY_VERSION = 2
+#: node or edge records written per binary session block.
+BINARY_BLOCK_SIZE = 512
+
+#: session formats by file extension.
+SESSION_EXTENSIONS = {
+    '.json': 'json',
+    '.ngb': 'binary',
+}
+
+#: session file compressions by file extension.
+COMPRESSION_EXTENSIONS = {
+    '.gz': 'gzip',
+    '.xz': 'xz',
+    '.bz2': 'bz2',
+}
+#: default compression levels (gzip and bz2 1-9, xz preset 0-9).
+COMPRESSION_LEVELS = {
+    'gzip': 6,
+    'xz': 6,
+    'bz2': 9,
+}
+
+#: bytes read per chunk by the JSON session reader.
+JSON_CHUNK_SIZE = 64 * 1024
+
+_COMPRESSION_MAGIC = (
+    (b'\x1f\x8b', 'gzip'),
+    (b'\xfd7zXZ\x00', 'xz'),
+    (b'BZh', 'bz2'),
+)
+
+_HEADER = struct.Struct('<4sHH')
+# string count, node count, edge count, extra data offset.
+_COUNTS = struct.Struct('<IIIQ')
+_UINT = struct.Struct('<I')
+_BLOCK = struct.Struct('<BI')
+# id, type, name, x, y, color, border color, text color, width, height,
+# flags, extra property count.
+_NODE = struct.Struct('<IIIdd4B4B4BddBH')
+# property name, kind.
+_EXTRA = struct.Struct('<IB')
+
+_NODE_FIELDS = ('type_', 'name', 'pos', 'color', 'border_color',
+                'text_color', 'width', 'height', 'disabled', 'selected')
+_FLAG_DISABLED = 1
+_FLAG_SELECTED = 2
+
+# binary session block types.
+_BLOCK_END, _BLOCK_STRINGS, _BLOCK_NODES, _BLOCK_EDGES = range(4)
+
+# extra property kinds.
+_EXTRA_PROPERTY, _EXTRA_CUSTOM, _EXTRA_MISSING = range(3)
+
+# extra property value tags.
+_NONE, _FALSE, _TRUE, _INT, _FLOAT, _STR, _JSON = range(7)
+_TAG = struct.Struct('<B')
+_INT_VALUE = struct.Struct('<q')
+_FLOAT_VALUE = struct.Struct('<d')
+# bytes after the tag by value tag.
+_VALUE_SIZES = {_INT: 8, _FLOAT: 8, _STR: 4, _JSON: 4}
+
+
+def session_format(file_path, format=None):
+    """
+    Returns the session format for the file.
+
+    Args:
+        file_path (str): session file path.
+        format (str): "json" or "binary" to override the file extension.
+
+    Returns:
+        str: session format.
+    """
+    if format:
+        assert format in SESSION_EXTENSIONS.values(), \
+            'unknown session format "{}".'.format(format)
+        return format
+    file_path, ext = os.path.splitext(file_path)
+    if ext.lower() in COMPRESSION_EXTENSIONS:
+        ext = os.path.splitext(file_path)[-1]
+    return SESSION_EXTENSIONS.get(ext.lower(), 'json')
+
+
+def session_compression(file_path):
+    """
+    Returns the compression for the session file from its extension.
+
+    Args:
+        file_path (str): session file path.
+
+    Returns:
+        str: "gzip", "xz", "bz2" or None if the file isn't compressed.
+    """
+    ext = os.path.splitext(file_path)[-1].lower()
+    return COMPRESSION_EXTENSIONS.get(ext)
+
+
+def detect_compression(data):
+    """
+    Returns the compression from the session file signature.
+
+    Args:
+        data (bytes): start of the session file.
+
+    Returns:
+        str: "gzip", "xz", "bz2" or None if the data isn't compressed.
+    """
+    for magic, compression in _COMPRESSION_MAGIC:
+        if data[:len(magic)] == magic:
+            return compression
+
+
+def _lzma():
+    """
+    Returns the lzma module, it's only imported when an xz compressed
+    session is read or written as python builds without liblzma (and
+    python 2) don't have it.
+    """
+    try:
+        import lzma
+    except ImportError:
+        raise IOError('xz compressed sessions need the python lzma module.')
+    return lzma
+
+
+def compression_errors():
+    """
+    Returns the exceptions raised for truncated or corrupt compressed
+    session files.
+
+    Returns:
+        tuple: exception classes.
+    """
+    errors = (EOFError, zlib.error)
+    if 'lzma' in sys.modules:
+        errors += (sys.modules['lzma'].LZMAError,)
+    return errors
+
+
+def compressed_stream(file_obj, compression, mode='rb', level=None):
+    """
+    Returns a stream that compresses the data written to the file or
+    decompresses the data read from the file, closing the stream doesn't
+    close the file.
+
+    Args:
+        file_obj (file): file opened in binary mode.
+        compression (str): "gzip", "xz" or "bz2".
+        mode (str): "rb" or "wb".
+        level (int): compression level (default: see COMPRESSION_LEVELS).
+
+    Returns:
+        file: compressed stream.
+    """
+    assert compression in COMPRESSION_LEVELS, \
+        'unknown session compression "{}".'.format(compression)
+    if mode == 'rb':
+        if compression == 'gzip':
+            return gzip.GzipFile(fileobj=file_obj, mode=mode)
+        if compression == 'xz':
+            return _lzma().LZMAFile(file_obj, mode)
+        return bz2.BZ2File(file_obj, mode)
+
+    if level is None:
+        level = COMPRESSION_LEVELS[compression]
+    if compression == 'gzip':
+        stream = gzip.GzipFile(fileobj=file_obj, mode=mode,
+                               compresslevel=level, mtime=0)
+    elif compression == 'xz':
+        stream = _lzma().LZMAFile(file_obj, mode, preset=level)
+    else:
+        stream = bz2.BZ2File(file_obj, mode, compresslevel=level)
+    # the session writers write each record in small pieces, the
+    # compressors are much faster with larger blocks.
+    return io.BufferedWriter(stream, JSON_CHUNK_SIZE)
+
+
+def open_session_stream(file_obj):
+    """
+    Returns the stream the session data is read from, compressed session
+    files are decompressed as they're read.
+
+    Args:
+        file_obj (file): session file opened in binary mode.
+
+    Returns:
+        tuple(file, str): session data stream and compression (None if
+            the file isn't compressed).
+    """
+    compression = detect_compression(file_obj.peek(8)[:8])
+    if compression is None:
+        return file_obj, None
+    return compressed_stream(file_obj, compression), compression
+
+
+def is_binary(data):
+    """
+    Returns True if the data starts with the binary session signature.
+
+    Args:
+        data (bytes): start of the session file.
+
+    Returns:
+        bool: binary session.
+    """
+    return data[:len(BINARY_MAGIC)] == BINARY_MAGIC
+
+
+class _StringTable(object):
+
+    def __init__(self):
+        self.index = {}
+        # strings added since the last encode.
+        self.strings = []
+
+    def add(self, string):
+        idx = self.index.get(string)
+        if idx is None:
+            idx = self.index[string] = len(self.index)
+            self.strings.append(string)
+        return idx
+
+    def encode(self):
+        """
+        Returns the strings added since the last encode.
+        """
+        data = [s.encode('utf-8') for s in self.strings]
+        self.strings = []
+        lengths = array('I', [len(s) for s in data])
+        return b''.join(
+            [_UINT.pack(len(data)), _pack_array(lengths)] + data)
+
+
+def _pack_array(values):
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _unpack_array(buf, offset, count):
+    values = array('I')
+    values.frombytes(buf[offset:offset + count * 4])
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values, offset + count * 4
+
+
+def _color(value):
+    """
+    Returns the color as a 4 byte tuple or None if it doesn't fit.
+    """
+    if not isinstance(value, (list, tuple)) or len(value) != 4:
+        return None
+    if not all(isinstance(c, int) and 0 <= c <= 255 for c in value):
+        return None
+    return value
+
+
+def _encode_value(value, strings):
+    if value is None:
+        return _TAG.pack(_NONE)
+    if value is True:
+        return _TAG.pack(_TRUE)
+    if value is False:
+        return _TAG.pack(_FALSE)
+    if isinstance(value, int) and -2 ** 63 <= value < 2 ** 63:
+        return _TAG.pack(_INT) + _INT_VALUE.pack(value)
+    if isinstance(value, float):
+        return _TAG.pack(_FLOAT) + _FLOAT_VALUE.pack(value)
+    if isinstance(value, str):
+        return _TAG.pack(_STR) + _UINT.pack(strings.add(value))
+    return _TAG.pack(_JSON) + _UINT.pack(
+        strings.add(json.dumps(value)))
+
+
+def _decode_value(buf, offset, strings):
+    tag = buf[offset]
+    offset += 1
+    if tag == _NONE:
+        return None, offset
+    if tag == _TRUE:
+        return True, offset
+    if tag == _FALSE:
+        return False, offset
+    if tag == _INT:
+        return _INT_VALUE.unpack_from(buf, offset)[0], offset + 8
+    if tag == _FLOAT:
+        return _FLOAT_VALUE.unpack_from(buf, offset)[0], offset + 8
+    idx = _UINT.unpack_from(buf, offset)[0]
+    if tag == _STR:
+        return strings[idx], offset + 4
+    if tag == _JSON:
+        return json.loads(strings[idx]), offset + 4
+    raise ValueError('invalid session value tag {}.'.format(tag))
+
+
+def _encode_node(node_id, n_data, strings):
+    """
+    Returns the binary node record with its extra properties.
+    """
+    fixed = {}
+    extra = []
+    for key, value in n_data.items():
+        if key == 'custom':
+            for name, val in value.items():
+                extra.append((name, val, _EXTRA_CUSTOM))
+            continue
+        if key in ('inputs', 'outputs'):
+            # connections are stored in the edge table.
+            continue
+        if key in ('color', 'border_color', 'text_color'):
+            valid = _color(value) is not None
+        elif key == 'pos':
+            # int values are kept as extra properties to load back as int.
+            valid = (isinstance(value, (list, tuple)) and len(value) == 2 and
+                     all(isinstance(v, float) for v in value))
+        elif key in ('type_', 'name'):
+            valid = isinstance(value, str)
+        elif key in ('width', 'height'):
+            valid = isinstance(value, float)
+        elif key in ('disabled', 'selected'):
+            valid = isinstance(value, bool)
+        else:
+            valid = False
+        if valid:
+            fixed[key] = value
+        else:
+            extra.append((key, value, _EXTRA_PROPERTY))
+
+    # fields missing from the node dict are removed again on load.
+    extra_keys = set(e[0] for e in extra if e[2] == _EXTRA_PROPERTY)
+    for key in _NODE_FIELDS:
+        if key not in fixed and key not in extra_keys:
+            extra.append((key, None, _EXTRA_MISSING))
+
+    flags = 0
+    if fixed.get('disabled'):
+        flags |= _FLAG_DISABLED
+    if fixed.get('selected'):
+        flags |= _FLAG_SELECTED
+    x, y = fixed.get('pos', (0.0, 0.0))
+    values = (
+        (strings.add(node_id),
+         strings.add(fixed.get('type_', '')),
+         strings.add(fixed.get('name', '')),
+         float(x), float(y)) +
+        tuple(fixed.get('color', (0, 0, 0, 0))) +
+        tuple(fixed.get('border_color', (0, 0, 0, 0))) +
+        tuple(fixed.get('text_color', (0, 0, 0, 0))) +
+        (float(fixed.get('width', 0.0)),
+         float(fixed.get('height', 0.0)),
+         flags,
+         len(extra))
+    )
+    record = [_NODE.pack(*values)]
+    for name, value, kind in extra:
+        record.append(_EXTRA.pack(strings.add(name), kind))
+        if kind != _EXTRA_MISSING:
+            record.append(_encode_value(value, strings))
+    return b''.join(record)
+
+
+def _write_record(writer, kind, key, value):
+    """
+    Write a session record with the node, connection or extra key write
+    of the session writer.
+
+    Args:
+        writer (JsonSessionWriter or BinarySessionWriter): session writer.
+        kind (str): "node", "connection" or "extra".
+        key (str): node id or session key.
+        value (object): node data, connection data or session value.
+    """
+    if kind == 'node':
+        writer.write_node(key, value)
+    elif kind == 'connection':
+        out_id, out_port = value['out']
+        in_id, in_port = value['in']
+        writer.write_connection(out_id, out_port, in_id, in_port)
+    else:
+        writer.write_extra(key, value)
+
+
+class JsonSessionWriter(object):
+    """
+    Writes session records straight to a JSON session file, only the
+    record being written is held in memory.
+
+    Each top level key ("nodes", "connections" and any extra keys) can
+    only be written as one block, e.g. all the nodes then all the
+    connections.
+
+    Args:
+        file_obj (file): session file opened for writing.
+        indent (int): JSON indent (None for compact output).
+    """
+
+    def __init__(self, file_obj, indent=2):
+        self._file = file_obj
+        self._text = isinstance(file_obj, io.TextIOBase)
+        self._indent = indent
+        self._encoder = json.JSONEncoder(indent=indent,
+                                         separators=(',', ':'))
+        self._keys = set()
+        self._section = None
+        self._count = 0
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+
+    def write(self, kind, key, value):
+        """
+        Write a session record as yielded by the session readers.
+
+        Args:
+            kind (str): "node", "connection" or "extra".
+            key (str): node id or session key.
+            value (object): node data, connection data or session value.
+        """
+        _write_record(self, kind, key, value)
+
+    def _newline(self, level):
+        if self._indent is None:
+            return ''
+        return '\n' + ' ' * (self._indent * level)
+
+    def _encode(self, value, level):
+        data = self._encoder.encode(value)
+        if self._indent is not None:
+            # strings in JSON can't contain line breaks.
+            data = data.replace('\n', self._newline(level))
+        return data
+
+    def _write(self, data):
+        if not self._text:
+            data = data.encode('utf-8')
+        self._file.write(data)
+
+    def _close_section(self):
+        if self._section is None:
+            return ''
+        data = self._newline(1) if self._count else ''
+        data += '}' if self._section == 'nodes' else ']'
+        self._section = None
+        return data
+
+    def _key(self, key):
+        """
+        Returns the data to start the top level key.
+        """
+        assert not self._closed, 'session writer is closed.'
+        assert key not in self._keys, \
+            'session key "{}" has already been written.'.format(key)
+        data = self._close_section()
+        data += ',' if self._keys else '{'
+        self._keys.add(key)
+        return data + self._newline(1) + self._encode(key, 1) + ':'
+
+    def _item(self, section):
+        """
+        Returns the data to start the next item in the section.
+        """
+        if self._section != section:
+            data = self._key(section) + ('{' if section == 'nodes' else '[')
+            self._section = section
+            self._count = 0
+        else:
+            data = ','
+        self._count += 1
+        return data + self._newline(2)
+
+    def write_node(self, node_id, n_data):
+        """
+        Write a node.
+
+        Args:
+            node_id (str): node id.
+            n_data (dict): serialized node data.
+        """
+        self._write(self._item('nodes') + self._encode(node_id, 2) + ':' +
+                    self._encode(n_data, 2))
+
+    def write_connection(self, out_id, out_port, in_id, in_port):
+        """
+        Write a connection.
+
+        Args:
+            out_id (str): output node id.
+            out_port (str): output port name.
+            in_id (str): input node id.
+            in_port (str): input port name.
+        """
+        conn = {'out': [out_id, out_port], 'in': [in_id, in_port]}
+        self._write(self._item('connections') + self._encode(conn, 2))
+
+    def write_extra(self, key, value):
+        """
+        Write a top level session key.
+
+        Args:
+            key (str): session key.
+            value (object): JSON serializable value.
+        """
+        assert key not in ('nodes', 'connections'), \
+            '"{}" is written by the node and connection writes.'.format(key)
+        self._write(self._key(key) + self._encode(value, 1))
+
+    def close(self):
+        """
+        Finish the session data, the file object isn't closed.
+        """
+        if self._closed:
+            return
+        data = ''
+        if 'nodes' not in self._keys:
+            data = self._key('nodes') + '{}'
+        self._write(data + self._close_section() + self._newline(0) + '}')
+        self._closed = True
+
+
+class BinarySessionWriter(object):
+    """
+    Writes session records to a binary session file, the records are
+    encoded in blocks of BINARY_BLOCK_SIZE records so only the current
+    block is held in memory.
+
+    Args:
+        file_obj (file): session file opened for binary writing.
+    """
+
+    def __init__(self, file_obj):
+        self._file = file_obj
+        self._strings = _StringTable()
+        # string indexes of the node ids written.
+        self._node_ids = set()
+        self._nodes = []
+        # string indexes of the (out node, out port, in node, in port).
+        self._edges = array('I')
+        self._edge_count = 0
+        self._extra = {}
+        self._closed = False
+        try:
+            self._start = file_obj.tell()
+        except (IOError, ValueError):
+            self._start = None
+        self._size = 0
+        self._write(_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, 0) +
+                    _COUNTS.pack(0, 0, 0, 0))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+
+    def _write(self, data):
+        self._file.write(data)
+        self._size += len(data)
+
+    def _write_block(self, block_type, count, data):
+        """
+        Write the strings added since the last block and the block.
+        """
+        if self._strings.strings:
+            strings = self._strings.encode()
+            self._write(_TAG.pack(_BLOCK_STRINGS) + strings)
+        self._write(_BLOCK.pack(block_type, count))
+        self._write(data)
+
+    def _flush_nodes(self):
+        if self._nodes:
+            self._write_block(_BLOCK_NODES, len(self._nodes),
+                              b''.join(self._nodes))
+            self._nodes = []
+
+    def _flush_edges(self):
+        if self._edges:
+            count = len(self._edges) // 4
+            self._write_block(_BLOCK_EDGES, count, _pack_array(self._edges))
+            self._edge_count += count
+            self._edges = array('I')
+
+    def write(self, kind, key, value):
+        """
+        Write a session record as yielded by the session readers.
+
+        Args:
+            kind (str): "node", "connection" or "extra".
+            key (str): node id or session key.
+            value (object): node data, connection data or session value.
+        """
+        _write_record(self, kind, key, value)
+
+    def write_node(self, node_id, n_data):
+        """
+        Write a node.
+
+        Args:
+            node_id (str): node id.
+            n_data (dict): serialized node data.
+        """
+        assert not self._closed, 'session writer is closed.'
+        idx = self._strings.add(node_id)
+        assert idx not in self._node_ids, \
+            'node "{}" has already been written.'.format(node_id)
+        self._node_ids.add(idx)
+        self._flush_edges()
+        self._nodes.append(_encode_node(node_id, n_data, self._strings))
+        if len(self._nodes) >= BINARY_BLOCK_SIZE:
+            self._flush_nodes()
+
+    def write_connection(self, out_id, out_port, in_id, in_port):
+        """
+        Write a connection.
+
+        Args:
+            out_id (str): output node id.
+            out_port (str): output port name.
+            in_id (str): input node id.
+            in_port (str): input port name.
+        """
+        assert not self._closed, 'session writer is closed.'
+        self._flush_nodes()
+        add = self._strings.add
+        self._edges.extend((add(out_id), add(out_port),
+                            add(in_id), add(in_port)))
+        if len(self._edges) >= BINARY_BLOCK_SIZE * 4:
+            self._flush_edges()
+
+    def write_extra(self, key, value):
+        """
+        Write a top level session key.
+
+        Args:
+            key (str): session key.
+            value (object): JSON serializable value.
+        """
+        assert not self._closed, 'session writer is closed.'
+        assert key not in ('nodes', 'connections'), \
+            '"{}" is written by the node and connection writes.'.format(key)
+        self._extra[key] = value
+
+    def close(self):
+        """
+        Write the remaining session data and fill in the header, the file
+        object isn't closed.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._flush_nodes()
+        self._flush_edges()
+        if self._strings.strings:
+            self._write(_TAG.pack(_BLOCK_STRINGS) + self._strings.encode())
+        self._write(_TAG.pack(_BLOCK_END))
+
+        extra_offset = self._size
+        extra = b''
+        if self._extra:
+            extra = json.dumps(self._extra).encode('utf-8')
+        self._write(_UINT.pack(len(extra)) + extra)
+
+        if self._start is None:
+            return
+        counts = _COUNTS.pack(len(self._strings.index), len(self._node_ids),
+                              self._edge_count, extra_offset)
+        file_obj = self._file
+        try:
+            file_obj.seek(self._start + _HEADER.size)
+        except (IOError, ValueError):
+            # compressed streams can't seek back.
+            return
+        file_obj.write(counts)
+        file_obj.seek(self._start + self._size)
+
+
+def session_records(data):
+    """
+    Yields the session records from the serialized session dict.
+
+    Args:
+        data (dict): serialized session data.
+
+    Returns:
+        generator: (kind, key, value) session records.
+    """
+    for node_id, n_data in data.get('nodes', {}).items():
+        yield 'node', node_id, n_data
+    for conn in data.get('connections', []):
+        yield 'connection', None, conn
+    for key, value in data.items():
+        if key not in ('nodes', 'connections'):
+            yield 'extra', key, value
+
+
+def _copy_value(value):
+    containers = (list, dict)
+    if isinstance(value, list):
+        return [_copy_value(v) if isinstance(v, containers) else v
+                for v in value]
+    if isinstance(value, dict):
+        return {k: _copy_value(v) if isinstance(v, containers) else v
+                for k, v in value.items()}
+    return value
+
+
+def snapshot_records(records):
+    """
+    Yields copies of the session records that aren't changed by later
+    edits to the property values (lists and dicts are copied).
+
+    Args:
+        records (iterable): (kind, key, value) session records.
+
+    Returns:
+        generator: (kind, key, value) session records.
+    """
+    for kind, key, value in records:
+        yield kind, key, _copy_value(value)
+
+
+def write_session_file(file_path, records, format=None,
+                       compression_level=None):
+    """
+    Write the session records to a temporary file next to the session
+    file and replace the session file with it once it's fully written,
+    the session file is left untouched if writing fails.
+
+    The records are compressed as they're written if the file has a
+    compression extension (".gz", ".xz" or ".bz2").
+
+    Args:
+        file_path (str): session file path.
+        records (iterable): (kind, key, value) session records.
+        format (str): "json" or "binary" (default: from the extension).
+        compression_level (int): compression level (default: see
+            COMPRESSION_LEVELS).
+    """
+    binary = session_format(file_path, format) == 'binary'
+    compression = session_compression(file_path)
+    dir_path, file_name = os.path.split(os.path.abspath(file_path))
+    temp_path = os.path.join(
+        dir_path, '.{}.{}.tmp'.format(file_name, uuid.uuid4().hex[:8]))
+    try:
+        if binary or compression:
+            file_out = open(temp_path, 'xb')
+        else:
+            file_out = open(temp_path, 'x', encoding='utf-8')
+        with file_out:
+            stream = file_out
+            if compression:
+                stream = compressed_stream(
+                    file_out, compression, 'wb', compression_level)
+            if binary:
+                writer = BinarySessionWriter(stream)
+            else:
+                writer = JsonSessionWriter(stream)
+            for record in records:
+                writer.write(*record)
+            writer.close()
+            if compression:
+                stream.close()
+            file_out.flush()
+            os.fsync(file_out.fileno())
+        if os.path.exists(file_path):
+            shutil.copymode(file_path, temp_path)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def encode_binary(data):
+    """
+    Encode serialized session data to the binary session format.
+
+    Args:
+        data (dict): serialized session data.
+
+    Returns:
+        bytes: binary session data.
+    """
+    buf = io.BytesIO()
+    with BinarySessionWriter(buf) as writer:
+        for record in session_records(data):
+            writer.write(*record)
+    return buf.getvalue()
+
+
+class BinarySessionReader(object):
+    """
+    Reads the session records from a binary session file incrementally,
+    the file is read in chunks and the records are decoded as they're
+    read so only the string table is held in memory.
+
+    Args:
+        file_obj (file): session file opened for binary reading.
+        chunk_size (int): bytes read per chunk.
+        raw_file (file): file the read position is taken from when
+            file_obj decompresses it.
+    """
+
+    def __init__(self, file_obj, chunk_size=JSON_CHUNK_SIZE, raw_file=None):
+        self._file = file_obj
+        self._raw_file = raw_file
+        self._chunk_size = chunk_size
+        self._buf = b''
+        self._pos = 0
+        # bytes dropped from the start of the buffer.
+        self._offset = 0
+        #: bytes of the session file read so far.
+        self.position = 0
+
+    def _fill(self, size):
+        """
+        Read the file until the buffer holds size bytes from the read
+        position, the consumed part of the buffer is dropped.
+        """
+        available = len(self._buf) - self._pos
+        if available >= size:
+            return
+        chunks = [self._buf[self._pos:]]
+        while available < size:
+            data = self._file.read(max(self._chunk_size, size - available))
+            if not data:
+                raise ValueError('unexpected end of binary session data.')
+            chunks.append(data)
+            available += len(data)
+        self._offset += self._pos
+        self._buf = b''.join(chunks)
+        self._pos = 0
+
+    def _update_position(self):
+        if self._raw_file is None:
+            self.position = self._offset + self._pos
+        else:
+            self.position = self._raw_file.tell()
+
+    def _unpack(self, record):
+        self._fill(record.size)
+        values = record.unpack_from(self._buf, self._pos)
+        self._pos += record.size
+        return values
+
+    def _uints(self, count):
+        self._fill(count * 4)
+        values, self._pos = _unpack_array(self._buf, self._pos, count)
+        return values
+
+    def _strings(self, count, strings):
+        """
+        Read the string table lengths and data and add the strings to
+        the list.
+        """
+        lengths = self._uints(count)
+        self._fill(sum(lengths))
+        buf = self._buf
+        offset = self._pos
+        for length in lengths:
+            strings.append(buf[offset:offset + length].decode('utf-8'))
+            offset += length
+        self._pos = offset
+
+    def _nodes(self, count, strings):
+        """
+        Yields the node records.
+
+        Returns:
+            generator: (node id, node data) node records.
+        """
+        for _ in range(count):
+            rec = self._unpack(_NODE)
+            node_id = strings[rec[0]]
+            flags = rec[19]
+            n_data = {
+                'type_': strings[rec[1]],
+                'name': strings[rec[2]],
+                'color': list(rec[5:9]),
+                'border_color': list(rec[9:13]),
+                'text_color': list(rec[13:17]),
+                'disabled': bool(flags & _FLAG_DISABLED),
+                'selected': bool(flags & _FLAG_SELECTED),
+                'width': rec[17],
+                'height': rec[18],
+                'pos': [rec[3], rec[4]],
+            }
+            for _ in range(rec[20]):
+                name_idx, kind = self._unpack(_EXTRA)
+                name = strings[name_idx]
+                if kind == _EXTRA_MISSING:
+                    n_data.pop(name, None)
+                    continue
+                self._fill(1)
+                self._fill(1 + _VALUE_SIZES.get(self._buf[self._pos], 0))
+                value, self._pos = _decode_value(
+                    self._buf, self._pos, strings)
+                if kind == _EXTRA_CUSTOM:
+                    n_data.setdefault('custom', {})[name] = value
+                else:
+                    n_data[name] = value
+            self._update_position()
+            yield node_id, n_data
+
+    def _edges(self, count):
+        """
+        Yields the (out node, out port, in node, in port) index records,
+        the edges are read BINARY_BLOCK_SIZE records at a time.
+        """
+        while count:
+            size = min(count, BINARY_BLOCK_SIZE)
+            count -= size
+            edges = self._uints(size * 4)
+            self._update_position()
+            for i in range(0, len(edges), 4):
+                yield edges[i:i + 4]
+
+    def _blocks(self, strings):
+        """
+        Yields the node and connection records from the version 2
+        blocks.
+        """
+        while True:
+            block_type = self._unpack(_TAG)[0]
+            if block_type == _BLOCK_END:
+                return
+            count = self._unpack(_UINT)[0]
+            if block_type == _BLOCK_STRINGS:
+                self._strings(count, strings)
+            elif block_type == _BLOCK_NODES:
+                for node_id, n_data in self._nodes(count, strings):
+                    yield 'node', node_id, n_data
+            elif block_type == _BLOCK_EDGES:
+                for edge in self._edges(count):
+                    yield 'connection', None, {
+                        'out': [strings[edge[0]], strings[edge[1]]],
+                        'in': [strings[edge[2]], strings[edge[3]]],
+                    }
+            else:
+                raise ValueError(
+                    'invalid binary session block {}.'.format(block_type))
+
+    def _tables(self, strings):
+        """
+        Yields the node and connection records from the version 1 string,
+        node and edge tables.
+        """
+        self._strings(self._unpack(_UINT)[0], strings)
+        node_ids = []
+        count = self._unpack(_UINT)[0]
+        for node_id, n_data in self._nodes(count, strings):
+            node_ids.append(node_id)
+            yield 'node', node_id, n_data
+        count = self._unpack(_UINT)[0]
+        for edge in self._edges(count):
+            yield 'connection', None, {
+                'out': [node_ids[edge[0]], strings[edge[1]]],
+                'in': [node_ids[edge[2]], strings[edge[3]]],
+            }
+
+    def __iter__(self):
+        magic, version, _ = self._unpack(_HEADER)
+        if magic != BINARY_MAGIC:
+            raise ValueError('not a binary session file.')
+        if version > BINARY_VERSION:
+            raise ValueError(
+                'unsupported binary session version {}.'.format(version))
+        strings = []
+        if version == 1:
+            records = self._tables(strings)
+        else:
+            self._unpack(_COUNTS)
+            records = self._blocks(strings)
+        for record in records:
+            yield record
+
+        length = self._unpack(_UINT)[0]
+        extra = {}
+        if length:
+            self._fill(length)
+            data = self._buf[self._pos:self._pos + length]
+            self._pos += length
+            extra = json.loads(data.decode('utf-8'))
+        self._update_position()
+        for key, value in extra.items():
+            yield 'extra', key, value
+
+
+class JsonSessionReader(object):
+    """
+    Reads the session records from a JSON session file incrementally,
+    the file is read in chunks and each node and connection is decoded
+    on its own so the whole session is never held in memory.
+
+    Args:
+        file_obj (file): session file opened for reading.
+        chunk_size (int): bytes read per chunk.
+        raw_file (file): file the read position is taken from when
+            file_obj decompresses it.
+    """
+
+    def __init__(self, file_obj, chunk_size=JSON_CHUNK_SIZE, raw_file=None):
+        self._file = file_obj
+        self._raw_file = raw_file
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self._buf = ''
+        self._pos = 0
+        self._eof = False
+        #: bytes of the session file read so far.
+        self.position = 0
+
+    def _read(self, size):
+        """
+        Append the next chunk of the file to the buffer, the consumed
+        part of the buffer is dropped.
+
+        Returns:
+            bool: False at the end of the file.
+        """
+        if self._eof:
+            return False
+        data = self._file.read(size)
+        if self._raw_file is None:
+            self.position += len(data)
+        else:
+            self.position = self._raw_file.tell()
+        if isinstance(data, bytes):
+            text = self._utf8.decode(data, final=not data)
+        else:
+            text = data
+        if not data:
+            self._eof = True
+        self._buf = self._buf[self._pos:] + text
+        self._pos = 0
+        return True
+
+    def _peek(self):
+        """
+        Returns the next non whitespace character without consuming it.
+        """
+        while True:
+            buf = self._buf
+            pos = self._pos
+            length = len(buf)
+            while pos < length and buf[pos] in ' \t\n\r':
+                pos += 1
+            self._pos = pos
+            if pos < length:
+                return buf[pos]
+            if not self._read(self._chunk_size):
+                return ''
+
+    def _next(self, expected):
+        char = self._peek()
+        if not char or char not in expected:
+            raise ValueError(
+                'expecting "{}" at session file byte {} got "{}".'.format(
+                    '" or "'.join(expected), self.position, char))
+        self._pos += 1
+        return char
+
+    def _value(self):
+        """
+        Decode the next JSON value, more of the file is read until the
+        value is complete.
+        """
+        self._peek()
+        size = self._chunk_size
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except ValueError:
+                if not self._read(size):
+                    raise
+                size *= 2
+                continue
+            if end == len(self._buf) and not self._eof and \
+                    self._buf[self._pos] in '-0123456789':
+                # a number may continue in the next chunk.
+                self._read(size)
+                continue
+            self._pos = end
+            return value
+
+    def _members(self):
+        self._next('{')
+        if self._peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            key = self._value()
+            self._next(':')
+            yield key, self._value()
+            if self._next(',}') == '}':
+                return
+
+    def _items(self):
+        self._next('[')
+        if self._peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            yield self._value()
+            if self._next(',]') == ']':
+                return
+
+    def __iter__(self):
+        self._next('{')
+        if self._peek() == '}':
+            return
+        while True:
+            key = self._value()
+            self._next(':')
+            if key == 'nodes' and self._peek() == '{':
+                for node_id, n_data in self._members():
+                    yield 'node', node_id, n_data
+            elif key == 'connections' and self._peek() == '[':
+                for conn in self._items():
+                    yield 'connection', None, conn
+            else:
+                yield 'extra', key, self._value()
+            if self._next(',}') == '}':
+                return
+
+
+def read_session(reader):
+    """
+    Collect the session records into the serialized session dict.
+
+    Args:
+        reader (JsonSessionReader or BinarySessionReader): session reader.
+
+    Returns:
+        dict: serialized session data.
+    """
+    data = {'nodes': {}}
+    connections = []
+    for kind, key, value in reader:
+        if kind == 'node':
+            data['nodes'][key] = value
+        elif kind == 'connection':
+            connections.append(value)
+        else:
+            data[key] = value
+    if connections:
+        data['connections'] = connections
+    return data
+
+
+def decode_binary(buf):
+    """
+    Decode binary session data to the serialized session dict.
+
+    Args:
+        buf (bytes): binary session data.
+
+    Returns:
+        dict: serialized session data.
+    """
+    return read_session(BinarySessionReader(io.BytesIO(buf)))
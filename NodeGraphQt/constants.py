@@ -27,6 +27,8 @@ PORT_ACTIVE_COLOR = (29, 80, 84, 255)
 PORT_ACTIVE_BORDER_COLOR = (45, 215, 255, 255)
 PORT_HOVER_COLOR = (17, 96, 20, 255)
 PORT_HOVER_BORDER_COLOR = (136, 255, 35, 255)
+#: Distance in viewer pixels a live connection snaps to a port from.
+PORT_SNAP_RADIUS = 20
 
 # === NODE ===
 
@@ -64,6 +66,17 @@ VIEWER_GRID_OVERLAY = True
 
 SCENE_AREA = 8000.0
 
+#: Level of detail for drawing the node graph items with full detail.
+LOD_FULL = 0
+#: Level of detail for drawing flat nodes without text and widgets.
+LOD_SIMPLIFIED = 1
+#: Level of detail for drawing nodes as filled blocks and straight pipes.
+LOD_BLOCK = 2
+#: Zoom level below which the node graph items are drawn simplified.
+LOD_SIMPLIFIED_ZOOM = -0.6
+#: Zoom level below which the node graph items are drawn as blocks.
+LOD_BLOCK_ZOOM = -0.8
+
 # === PATHS ===
 
 BASE_PATH = os.path.dirname(os.path.abspath(__file__))
@@ -2,7 +2,8 @@
 from ..vendor.Qt.QtCore import QRectF
 from ..vendor.Qt.QtWidgets import QGraphicsItem
 
-from NodeGraphQt.constants import Z_VAL_NODE, NODE_WIDTH, NODE_HEIGHT
+from NodeGraphQt.constants import (Z_VAL_NODE, NODE_WIDTH, NODE_HEIGHT,
+                                   LOD_FULL)
 
 
 class AbstractNodeItem(QGraphicsItem):
@@ -13,6 +14,7 @@ class AbstractNodeItem(QGraphicsItem):
     def __init__(self, name='node', parent=None):
         super(AbstractNodeItem, self).__init__(parent)
         self.setFlags(self.ItemIsSelectable | self.ItemIsMovable)
+        self.setFlag(self.ItemSendsGeometryChanges, True)
         self.setZValue(Z_VAL_NODE)
         self._properties = {
             'id': None,
@@ -26,6 +28,7 @@ class AbstractNodeItem(QGraphicsItem):
         }
         self._width = NODE_WIDTH
         self._height = NODE_HEIGHT
+        self._lod = LOD_FULL
 
     def __str__(self):
         return '{}.{}(\'{}\')'.format(
@@ -42,6 +45,22 @@ class AbstractNodeItem(QGraphicsItem):
         self._properties['selected'] = True
         super(AbstractNodeItem, self).mousePressEvent(event)
 
+    def itemChange(self, change, value):
+        if change in (self.ItemPositionHasChanged,
+                      self.ItemSceneChange,
+                      self.ItemSceneHasChanged):
+            self.update_index()
+        return super(AbstractNodeItem, self).itemChange(change, value)
+
+    def update_index(self):
+        """
+        Mark the node to be updated in the viewer node index after its
+        scene rect has changed.
+        """
+        viewer = self.viewer()
+        if viewer:
+            viewer.schedule_node_update([self])
+
     def setSelected(self, selected):
         self._properties['selected'] = selected
         super(AbstractNodeItem, self).setSelected(selected)
@@ -66,6 +85,18 @@ class AbstractNodeItem(QGraphicsItem):
         """
         pass
 
+    def set_lod(self, lod):
+        """
+        Called by the viewer when the level of detail the node is drawn
+        with has changed.
+
+        Args:
+            lod (int): LOD_FULL, LOD_SIMPLIFIED or LOD_BLOCK.
+        """
+        if lod != self._lod:
+            self._lod = lod
+            self.update()
+
     @property
     def id(self):
         return self._properties['id']
@@ -92,7 +123,9 @@ class AbstractNodeItem(QGraphicsItem):
 
     @width.setter
     def width(self, width=0.0):
+        self.prepareGeometryChange()
         self._width = width
+        self.update_index()
 
     @property
     def height(self):
@@ -100,7 +133,9 @@ class AbstractNodeItem(QGraphicsItem):
 
     @height.setter
     def height(self, height=0.0):
+        self.prepareGeometryChange()
         self._height = height
+        self.update_index()
 
     @property
     def color(self):
@@ -109,6 +144,7 @@ class AbstractNodeItem(QGraphicsItem):
     @color.setter
     def color(self, color=(0, 0, 0, 255)):
         self._properties['color'] = color
+        self.update()
 
     @property
     def text_color(self):
@@ -117,6 +153,7 @@ class AbstractNodeItem(QGraphicsItem):
     @text_color.setter
     def text_color(self, color=(100, 100, 100, 255)):
         self._properties['text_color'] = color
+        self.update()
 
     @property
     def border_color(self):
@@ -125,6 +162,7 @@ class AbstractNodeItem(QGraphicsItem):
     @border_color.setter
     def border_color(self, color=(0, 0, 0, 255)):
         self._properties['border_color'] = color
+        self.update()
 
     @property
     def disabled(self):
@@ -133,6 +171,7 @@ class AbstractNodeItem(QGraphicsItem):
     @disabled.setter
     def disabled(self, state=False):
         self._properties['disabled'] = state
+        self.update()
 
     @property
     def selected(self):
@@ -159,6 +198,7 @@ class AbstractNodeItem(QGraphicsItem):
     def name(self, name=''):
         self._properties['name'] = name
         self.setToolTip('node: {}'.format(name))
+        self.update()
 
     @property
     def properties(self):
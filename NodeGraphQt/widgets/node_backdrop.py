@@ -2,7 +2,8 @@
 from ..vendor.Qt import QtGui, QtCore
 from ..vendor.Qt.QtWidgets import QGraphicsItem
 
-from NodeGraphQt.constants import (Z_VAL_PIPE,
+from NodeGraphQt.constants import (LOD_FULL, LOD_BLOCK,
+                                   Z_VAL_PIPE,
                                    NODE_SEL_COLOR,
                                    NODE_SEL_BORDER_COLOR)
 from NodeGraphQt.widgets.node_abstract import AbstractNodeItem
@@ -55,6 +56,11 @@ class BackdropSizer(QGraphicsItem):
         item = self.parentItem()
         item.on_sizer_double_clicked()
 
+    def mouseReleaseEvent(self, event):
+        super(BackdropSizer, self).mouseReleaseEvent(event)
+        item = self.parentItem()
+        item.on_sizer_released()
+
     def paint(self, painter, option, widget):
         """
         Draws the backdrop sizer on the bottom right corner.
@@ -135,12 +141,22 @@ class BackdropNodeItem(AbstractNodeItem):
         self._nodes = [self]
 
     def on_sizer_pos_changed(self, pos):
+        self.prepareGeometryChange()
         self._width = pos.x() + self._sizer.size
         self._height = pos.y() + self._sizer.size
+        self.update_index()
 
     def on_sizer_double_clicked(self):
         self.auto_resize()
 
+    def on_sizer_released(self):
+        self._emit_resized()
+
+    def _emit_resized(self):
+        viewer = self.viewer()
+        if viewer:
+            viewer.backdrop_resized.emit(self.id)
+
     def paint(self, painter, option, widget):
         """
         Draws the backdrop rect.
@@ -159,6 +175,10 @@ class BackdropNodeItem(AbstractNodeItem):
         painter.setPen(QtCore.Qt.NoPen)
         painter.drawRect(rect)
 
+        if self._lod == LOD_BLOCK:
+            painter.restore()
+            return
+
         top_rect = QtCore.QRectF(0.0, 0.0, rect.width(), 20.0)
         painter.setBrush(QtGui.QColor(*self.color))
         painter.setPen(QtCore.Qt.NoPen)
@@ -171,10 +191,11 @@ class BackdropNodeItem(AbstractNodeItem):
             painter.setPen(QtCore.Qt.NoPen)
             painter.drawRect(rect)
 
-        txt_rect = QtCore.QRectF(top_rect.x(), top_rect.y() + 1.5,
-                                 rect.width(), top_rect.height())
-        painter.setPen(QtGui.QColor(*self.text_color))
-        painter.drawText(txt_rect, QtCore.Qt.AlignCenter, self.name)
+        if self._lod == LOD_FULL:
+            txt_rect = QtCore.QRectF(top_rect.x(), top_rect.y() + 1.5,
+                                     rect.width(), top_rect.height())
+            painter.setPen(QtGui.QColor(*self.text_color))
+            painter.drawText(txt_rect, QtCore.Qt.AlignCenter, self.name)
 
         path = QtGui.QPainterPath()
         path.addRect(rect)
@@ -210,10 +231,10 @@ class BackdropNodeItem(AbstractNodeItem):
             self.xy_pos = [nodes_rect.x() - padding, nodes_rect.y() - padding]
             self._sizer.set_pos(nodes_rect.width() + (padding * 2),
                                 nodes_rect.height() + (padding * 2))
-            return
-
-        width, height = self._min_size
-        self._sizer.set_pos(width, height)
+        else:
+            width, height = self._min_size
+            self._sizer.set_pos(width, height)
+        self._emit_resized()
 
     def pre_init(self, viewer, pos=None):
         """
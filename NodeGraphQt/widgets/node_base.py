@@ -5,6 +5,7 @@ from ..vendor.Qt.QtWidgets import (QGraphicsItem,
                                    QGraphicsTextItem)
 
 from NodeGraphQt.constants import (IN_PORT, OUT_PORT,
+                                   LOD_FULL, LOD_BLOCK,
                                    NODE_WIDTH, NODE_HEIGHT,
                                    NODE_ICON_SIZE, ICON_NODE_BASE,
                                    NODE_SEL_COLOR, NODE_SEL_BORDER_COLOR,
@@ -148,6 +149,10 @@ class NodeItem(AbstractNodeItem):
                 used to describe the parameters needed to draw.
             widget (QtWidgets.QWidget): not used.
         """
+        if self._lod != LOD_FULL:
+            self._paint_lod(painter)
+            return
+
         painter.save()
         bg_border = 1.0
         rect = QtCore.QRectF(0.5 - (bg_border / 2),
@@ -191,7 +196,7 @@ class NodeItem(AbstractNodeItem):
                                     rect.height() + border_width)
 
         pen = QtGui.QPen(border_color, border_width)
-        pen.setCosmetic(self.viewer().get_zoom() < 0.0)
+        pen.setCosmetic(painter.worldTransform().m11() < 1.0)
         path = QtGui.QPainterPath()
         path.addRoundedRect(border_rect, radius, radius)
         painter.setBrush(QtCore.Qt.NoBrush)
@@ -200,6 +205,35 @@ class NodeItem(AbstractNodeItem):
 
         painter.restore()
 
+    def _paint_lod(self, painter):
+        """
+        Draws the node as a flat rect (simplified) or a filled rect (block)
+        when the viewer is zoomed out.
+
+        Args:
+            painter (QtGui.QPainter): painter used for drawing the item.
+        """
+        painter.save()
+        painter.setRenderHint(QtGui.QPainter.Antialiasing, False)
+        rect = self.boundingRect()
+        if self._lod == LOD_BLOCK:
+            color = self.color
+            if self.selected and NODE_SEL_BORDER_COLOR:
+                color = NODE_SEL_BORDER_COLOR
+            painter.fillRect(rect, QtGui.QColor(*color))
+            painter.restore()
+            return
+
+        border_color = self.border_color
+        if self.selected and NODE_SEL_BORDER_COLOR:
+            border_color = NODE_SEL_BORDER_COLOR
+        pen = QtGui.QPen(QtGui.QColor(*border_color), 1.0)
+        pen.setCosmetic(True)
+        painter.setPen(pen)
+        painter.setBrush(QtGui.QColor(*self.color))
+        painter.drawRect(rect)
+        painter.restore()
+
     def mousePressEvent(self, event):
         if event.button() == QtCore.Qt.LeftButton:
             start = PortItem().boundingRect().width()
@@ -220,9 +254,14 @@ class NodeItem(AbstractNodeItem):
             self.reset_pipes()
             if value:
                 self.hightlight_pipes()
-            self.setZValue(Z_VAL_NODE)
-            if not self.selected:
-                self.setZValue(Z_VAL_NODE + 1)
+            z_value = Z_VAL_NODE if self.selected else Z_VAL_NODE + 1
+            if self.zValue() != z_value:
+                self.setZValue(z_value)
+        elif change == self.ItemPositionHasChanged and self.scene():
+            ports = self.inputs + self.outputs
+            self.viewer().schedule_port_update(ports)
+            for port in ports:
+                port.redraw_connected_pipes()
 
         return super(NodeItem, self).itemChange(change, value)
 
@@ -286,6 +325,37 @@ class NodeItem(AbstractNodeItem):
             for pipe in port.connected_pipes:
                 pipe.reset()
 
+    def _port_text_visible(self, port):
+        """
+        Returns true if the port name is displayed at full detail.
+
+        Args:
+            port (PortItem): port item.
+
+        Returns:
+            bool: true if the port text is visible.
+        """
+        return port.display_name and port.isVisible()
+
+    def set_lod(self, lod):
+        """
+        Called by the viewer when the level of detail has changed, the
+        label, icon, port text and widgets are only shown at full detail.
+
+        Args:
+            lod (int): LOD_FULL, LOD_SIMPLIFIED or LOD_BLOCK.
+        """
+        super(NodeItem, self).set_lod(lod)
+        show = lod == LOD_FULL
+        self._text_item.setVisible(show)
+        self._icon_item.setVisible(show)
+        for items in (self._input_items, self._output_items):
+            for port, text in items.items():
+                port.set_lod(lod)
+                text.setVisible(show and self._port_text_visible(port))
+        for widget in self._widgets.values():
+            widget.setVisible(show)
+
     def calc_size(self):
         """
         calculate minimum node size.
@@ -303,7 +373,7 @@ class NodeItem(AbstractNodeItem):
             input_widths = []
             for port, text in self._input_items.items():
                 input_width = port.boundingRect().width() * 2
-                if text.isVisible():
+                if self._port_text_visible(port):
                     input_width += text.boundingRect().width()
                 input_widths.append(input_width)
             width += max(input_widths)
@@ -313,7 +383,7 @@ class NodeItem(AbstractNodeItem):
             output_widths = []
             for port, text in self._output_items.items():
                 output_width = port.boundingRect().width() * 2
-                if text.isVisible():
+                if self._port_text_visible(port):
                     output_width += text.boundingRect().width()
                 output_widths.append(output_width)
             width += max(output_widths)
@@ -509,6 +579,9 @@ class NodeItem(AbstractNodeItem):
         if pos:
             self.xy_pos = pos
 
+        # re-apply the level of detail to the updated items.
+        self.set_lod(self._lod)
+
     @property
     def icon(self):
         return self._properties['icon']
@@ -545,6 +618,10 @@ class NodeItem(AbstractNodeItem):
             w.widget.setDisabled(state)
         self._tooltip_disable(state)
         self._x_item.setVisible(state)
+        # connected pipes are drawn dotted when a node is disabled.
+        for port in self.inputs + self.outputs:
+            for pipe in port.connected_pipes:
+                pipe.update()
 
     @AbstractNodeItem.selected.setter
     def selected(self, selected=False):
@@ -4,11 +4,13 @@ import math
 from ..vendor.Qt import QtCore, QtGui, QtWidgets
 
 from NodeGraphQt.constants import (
+    LOD_FULL, LOD_BLOCK,
     PIPE_DEFAULT_COLOR, PIPE_ACTIVE_COLOR, PIPE_HIGHLIGHT_COLOR,
     PIPE_STYLE_DASHED, PIPE_STYLE_DEFAULT, PIPE_STYLE_DOTTED,
     PIPE_LAYOUT_STRAIGHT, PIPE_WIDTH, IN_PORT, OUT_PORT, Z_VAL_PIPE
 )
 from NodeGraphQt.widgets.port import PortItem
+from NodeGraphQt.widgets.spatial_hash import SpatialHash
 
 PIPE_STYLES = {
     PIPE_STYLE_DEFAULT: QtCore.Qt.SolidLine,
@@ -32,6 +34,11 @@ class Pipe(QtWidgets.QGraphicsPathItem):
         self._highlight = False
         self._input_port = input_port
         self._output_port = output_port
+        self._lod = LOD_FULL
+        # port scene positions the path was last drawn from.
+        self._routed_pos = None
+        # batched pipe layer drawing the pipe when it's not in the scene.
+        self._layer = None
 
     def __str__(self):
         in_name = self._input_port.name if self._input_port else ''
@@ -49,21 +56,19 @@ class Pipe(QtWidgets.QGraphicsPathItem):
         self.activate()
 
     def hoverLeaveEvent(self, event):
-        self.reset()
-        if self.input_port.node.selected:
-            self.highlight()
-        elif self.output_port.node.selected:
-            self.highlight()
+        self.reset_state()
 
-    def paint(self, painter, option, widget):
+    def update(self, *args):
+        super(Pipe, self).update(*args)
+        if self._layer and not self.scene():
+            self._layer.refresh_pipe(self)
+
+    def paint_pen(self):
         """
-        Draws the connection line between nodes.
+        Returns the pen used for drawing the pipe in its current state.
 
-        Args:
-            painter (QtGui.QPainter): painter used for drawing the item.
-            option (QtGui.QStyleOptionGraphicsItem):
-                used to describe the parameters needed to draw.
-            widget (QtWidgets.QWidget): not used.
+        Returns:
+            QtGui.QPen: pipe pen.
         """
         color = QtGui.QColor(*self._color)
         pen_style = PIPE_STYLES.get(self.style)
@@ -82,14 +87,42 @@ class Pipe(QtWidgets.QGraphicsPathItem):
                 pen_width += 0.2
                 pen_style = PIPE_STYLES.get(PIPE_STYLE_DOTTED)
 
+        if self._lod == LOD_BLOCK:
+            return QtGui.QPen(color, 0)
+
         pen = QtGui.QPen(color, pen_width)
         pen.setStyle(pen_style)
         pen.setCapStyle(QtCore.Qt.RoundCap)
+        return pen
+
+    def paint(self, painter, option, widget):
+        """
+        Draws the connection line between nodes.
 
+        Args:
+            painter (QtGui.QPainter): painter used for drawing the item.
+            option (QtGui.QStyleOptionGraphicsItem):
+                used to describe the parameters needed to draw.
+            widget (QtWidgets.QWidget): not used.
+        """
         painter.save()
+        painter.setPen(self.paint_pen())
+
+        if self._lod == LOD_BLOCK:
+            # straight unantialiased line between the path end points.
+            painter.setRenderHint(painter.Antialiasing, False)
+            path = self.path()
+            if path.elementCount():
+                start = path.elementAt(0)
+                painter.drawLine(QtCore.QPointF(start.x, start.y),
+                                 path.currentPosition())
+            painter.restore()
+            return
 
-        painter.setPen(pen)
-        painter.setRenderHint(painter.Antialiasing, True)
+        # antialiasing follows the viewer render hint at full detail.
+        antialias = painter.testRenderHint(painter.Antialiasing)
+        painter.setRenderHint(painter.Antialiasing,
+                              antialias and self._lod == LOD_FULL)
         painter.drawPath(self.path())
 
         painter.restore()  # QPaintDevice: Cannot destroy paint device that is being painted
@@ -124,9 +157,20 @@ class Pipe(QtWidgets.QGraphicsPathItem):
         path = QtGui.QPainterPath()
         path.moveTo(line.x1(), line.y1())
 
+        # the path is drawn in scene space so reset any translation.
+        if not self.pos().isNull():
+            self.setPos(0.0, 0.0)
+        if cursor_pos or not (self._input_port and self._output_port):
+            self._routed_pos = None
+        else:
+            self._routed_pos = (self._input_port.scenePos(),
+                                self._output_port.scenePos())
+
         if self.viewer_pipe_layout() == PIPE_LAYOUT_STRAIGHT:
             path.lineTo(pos2)
             self.setPath(path)
+            if self._layer:
+                self._layer.update_pipe(self)
             return
 
         ctr_offset_x1, ctr_offset_x2 = pos1.x(), pos2.x()
@@ -147,6 +191,26 @@ class Pipe(QtWidgets.QGraphicsPathItem):
         ctr_point2 = QtCore.QPointF(ctr_offset_x2, pos2.y())
         path.cubicTo(ctr_point1, ctr_point2, pos2)
         self.setPath(path)
+        if self._layer:
+            self._layer.update_pipe(self)
+
+    def update_path(self):
+        """
+        Update the path after the connected ports have moved, the path is
+        translated if both ports moved by the same offset and redrawn
+        otherwise.
+        """
+        if not (self._input_port and self._output_port):
+            return
+        if self._routed_pos:
+            in_pos = self._input_port.scenePos()
+            offset = in_pos - self._routed_pos[0]
+            if offset == self._output_port.scenePos() - self._routed_pos[1]:
+                self.setPos(offset)
+                if self._layer:
+                    self._layer.update_pipe(self)
+                return
+        self.draw_path(self._input_port, self._output_port)
 
     def calc_distance(self, p1, p2):
         x = math.pow((p2.x() - p1.x()), 2)
@@ -164,16 +228,40 @@ class Pipe(QtWidgets.QGraphicsPathItem):
             port = self.input_port if reverse else self.output_port
         return port
 
+    def set_lod(self, lod):
+        """
+        Set the level of detail the pipe is drawn with.
+
+        Args:
+            lod (int): LOD_FULL, LOD_SIMPLIFIED or LOD_BLOCK.
+        """
+        if lod != self._lod:
+            self._lod = lod
+            self.update()
+
     def viewer_pipe_layout(self):
-        if self.scene():
-            viewer = self.scene().viewer()
+        scene = self.scene() or (self._layer and self._layer.scene())
+        if scene:
+            viewer = scene.viewer()
             return viewer.get_pipe_layout()
 
+    @property
+    def layer(self):
+        """
+        Returns the batched pipe layer that owns the pipe.
+
+        Returns:
+            PipeLayer: pipe layer or None.
+        """
+        return self._layer
+
     def activate(self):
         self._active = True
         pen = QtGui.QPen(QtGui.QColor(*PIPE_ACTIVE_COLOR), 2)
         pen.setStyle(PIPE_STYLES.get(PIPE_STYLE_DEFAULT))
         self.setPen(pen)
+        if self._layer:
+            self._layer.promote(self)
 
     def active(self):
         return self._active
@@ -183,6 +271,8 @@ class Pipe(QtWidgets.QGraphicsPathItem):
         pen = QtGui.QPen(QtGui.QColor(*PIPE_HIGHLIGHT_COLOR), 2)
         pen.setStyle(PIPE_STYLES.get(PIPE_STYLE_DEFAULT))
         self.setPen(pen)
+        if self._layer:
+            self._layer.promote(self)
 
     def highlighted(self):
         return self._highlight
@@ -193,6 +283,19 @@ class Pipe(QtWidgets.QGraphicsPathItem):
         pen = QtGui.QPen(QtGui.QColor(*self.color), 2)
         pen.setStyle(PIPE_STYLES.get(self.style))
         self.setPen(pen)
+        if self._layer:
+            self._layer.demote(self)
+
+    def reset_state(self):
+        """
+        Reset the pipe color and keep it highlighted if one of the
+        connected nodes is selected.
+        """
+        self.reset()
+        if self.input_port and self.input_port.node.selected:
+            self.highlight()
+        elif self.output_port and self.output_port.node.selected:
+            self.highlight()
 
     def set_connections(self, port1, port2):
         ports = {
@@ -233,6 +336,7 @@ class Pipe(QtWidgets.QGraphicsPathItem):
     @color.setter
     def color(self, color):
         self._color = color
+        self.update()
 
     @property
     def style(self):
@@ -241,14 +345,426 @@ class Pipe(QtWidgets.QGraphicsPathItem):
     @style.setter
     def style(self, style):
         self._style = style
+        self.update()
 
     def delete(self):
         if self.input_port and self.input_port.connected_pipes:
             self.input_port.remove_pipe(self)
         if self.output_port and self.output_port.connected_pipes:
             self.output_port.remove_pipe(self)
+        if self._layer:
+            self._layer.remove_pipe(self)
         if self.scene():
             self.scene().removeItem(self)
         # TODO: not sure if we need this...?
         del self
 
+
+
+class _PipeChunk(object):
+    """
+    Pipes drawn by the pipe layer from the same region of the scene, the
+    pipe geometry is merged into one path per pen and rebuilt on demand.
+    """
+
+    __slots__ = ('pipes', 'paths', 'items', 'rect', 'dirty')
+
+    def __init__(self):
+        self.pipes = set()
+        # [(pen, merged path)]
+        self.paths = []
+        # [(pen, scene rect, path)] for drawing partially exposed chunks.
+        self.items = []
+        self.rect = QtCore.QRectF()
+        self.dirty = True
+
+
+class PipeLayer(QtWidgets.QGraphicsItem):
+    """
+    Single scene item that draws all the non interactive pipes, the pipe
+    geometry is grouped by pen into a few paths per scene region and hit
+    testing is done through a grid index.
+
+    Pipes are promoted to individual scene items while they're hovered,
+    highlighted or active and handed back to the layer when reset.
+
+    Args:
+        chunk_size (float): scene size of the regions the paths are
+            grouped and culled by.
+        cell_size (float): scene size of the hit test index cells.
+    """
+
+    def __init__(self, chunk_size=500.0, cell_size=250.0):
+        super(PipeLayer, self).__init__()
+        self.setZValue(Z_VAL_PIPE)
+        self.setFlag(self.ItemUsesExtendedStyleOption, True)
+        self.setAcceptedMouseButtons(QtCore.Qt.NoButton)
+        self._chunk_size = chunk_size
+        # {pipe: [chunk key, scene rect, (pen, scene path)]}
+        self._pipes = {}
+        self._chunks = {}
+        self._index = SpatialHash(cell_size)
+        self._promoted = set()
+        self._demoted = set()
+        self._hovered = None
+        self._rect = QtCore.QRectF()
+        self._lod = LOD_FULL
+
+    def __str__(self):
+        return '{}.PipeLayer({})'.format(self.__module__, len(self._pipes))
+
+    def __repr__(self):
+        return '{}.PipeLayer({})'.format(self.__module__, len(self._pipes))
+
+    def boundingRect(self):
+        margin = PIPE_WIDTH + 2.0
+        return self._rect.adjusted(-margin, -margin, margin, margin)
+
+    def shape(self):
+        # the layer is never picked up by the scene item queries.
+        return QtGui.QPainterPath()
+
+    def paint(self, painter, option, widget):
+        """
+        Draws the merged pipe paths of the exposed regions.
+
+        Args:
+            painter (QtGui.QPainter): painter used for drawing the item.
+            option (QtGui.QStyleOptionGraphicsItem):
+                used to describe the parameters needed to draw.
+            widget (QtWidgets.QWidget): not used.
+        """
+        painter.save()
+        antialias = painter.testRenderHint(painter.Antialiasing)
+        painter.setRenderHint(painter.Antialiasing,
+                              antialias and self._lod == LOD_FULL)
+        painter.setBrush(QtCore.Qt.NoBrush)
+        exposed = option.exposedRect
+        for chunk in self._chunks.values():
+            if not chunk.rect.intersects(exposed):
+                continue
+            if chunk.dirty:
+                self._build_chunk(chunk)
+            if exposed.contains(chunk.rect):
+                for pen, path in chunk.paths:
+                    painter.setPen(pen)
+                    painter.drawPath(path)
+                continue
+            # only stroke the pipes that are exposed.
+            current_pen = None
+            for pen, rect, path in chunk.items:
+                if not rect.intersects(exposed):
+                    continue
+                if pen is not current_pen:
+                    painter.setPen(pen)
+                    current_pen = pen
+                painter.drawPath(path)
+        painter.restore()
+
+    def _build_chunk(self, chunk):
+        """
+        Rebuild the merged paths of a chunk from its pipes.
+
+        Args:
+            chunk (_PipeChunk): pipe chunk.
+        """
+        paths = {}
+        items = []
+        rect = QtCore.QRectF()
+        for pipe in chunk.pipes:
+            record = self._pipes[pipe]
+            pipe_rect = record[1]
+            rect = rect.united(pipe_rect)
+            if pipe in self._promoted:
+                continue
+            if record[2] is None:
+                record[2] = self._pipe_drawing(pipe)
+            pen, pipe_path = record[2]
+            if pipe_path is None:
+                continue
+            key = (pen.color().rgba(), int(pen.style()), pen.widthF())
+            if key not in paths:
+                paths[key] = (pen, QtGui.QPainterPath())
+            pen, path = paths[key]
+            path.addPath(pipe_path)
+            items.append((pen, pipe_rect, pipe_path))
+        items.sort(key=lambda i: id(i[0]))
+        chunk.paths = list(paths.values())
+        chunk.items = items
+        chunk.rect = rect
+        chunk.dirty = False
+
+    def _pipe_drawing(self, pipe):
+        """
+        Returns the pen and the scene path the pipe is drawn with.
+
+        Args:
+            pipe (Pipe): connection pipe.
+
+        Returns:
+            tuple(QtGui.QPen, QtGui.QPainterPath): pen and path.
+        """
+        pen = pipe.paint_pen()
+        pipe_path = pipe.path()
+        if not pipe_path.elementCount():
+            return pen, None
+        offset = pipe.pos()
+        if self._lod == LOD_BLOCK:
+            start = pipe_path.elementAt(0)
+            path = QtGui.QPainterPath()
+            path.moveTo(start.x + offset.x(), start.y + offset.y())
+            path.lineTo(pipe_path.currentPosition() + offset)
+            return pen, path
+        return pen, pipe_path.translated(offset)
+
+    def _chunk_key(self, rect):
+        center = rect.center()
+        return (int(math.floor(center.x() / self._chunk_size)),
+                int(math.floor(center.y() / self._chunk_size)))
+
+    def _dirty_chunk(self, key, rect):
+        chunk = self._chunks.get(key)
+        if chunk:
+            chunk.dirty = True
+        self.update(rect)
+
+    def add_pipe(self, pipe):
+        """
+        Add a pipe to be drawn by the layer, the pipe is removed from the
+        scene if it's been added as an individual item.
+
+        Args:
+            pipe (Pipe): connection pipe.
+        """
+        if pipe in self._pipes:
+            return
+        if pipe.scene():
+            pipe.scene().removeItem(pipe)
+        pipe._layer = self
+        pipe.set_lod(self._lod)
+        self._pipes[pipe] = [None, QtCore.QRectF(), None]
+        self.update_pipe(pipe)
+
+    def remove_pipe(self, pipe):
+        """
+        Remove a pipe from the layer (a promoted pipe is left in the scene).
+
+        Args:
+            pipe (Pipe): connection pipe.
+        """
+        record = self._pipes.pop(pipe, None)
+        if record is None:
+            return
+        key, rect, _ = record
+        chunk = self._chunks.get(key)
+        if chunk:
+            chunk.pipes.discard(pipe)
+            if not chunk.pipes:
+                del self._chunks[key]
+        self._index.remove(pipe)
+        self._promoted.discard(pipe)
+        self._demoted.discard(pipe)
+        if self._hovered is pipe:
+            self._hovered = None
+        pipe._layer = None
+        self._dirty_chunk(key, rect)
+
+    def update_pipe(self, pipe):
+        """
+        Update the index and the merged paths after the pipe geometry
+        has changed.
+
+        Args:
+            pipe (Pipe): connection pipe.
+        """
+        record = self._pipes.get(pipe)
+        if record is None:
+            return
+        old_key, old_rect, _ = record
+        rect = pipe.sceneBoundingRect()
+        key = self._chunk_key(rect)
+        if key != old_key:
+            old_chunk = self._chunks.get(old_key)
+            if old_chunk:
+                old_chunk.pipes.discard(pipe)
+                old_chunk.dirty = True
+                if not old_chunk.pipes:
+                    del self._chunks[old_key]
+            chunk = self._chunks.get(key)
+            if chunk is None:
+                chunk = self._chunks[key] = _PipeChunk()
+            chunk.pipes.add(pipe)
+        else:
+            chunk = self._chunks[key]
+        chunk.dirty = True
+        chunk.rect = chunk.rect.united(rect)
+
+        self._index.insert(pipe, rect)
+        record[:] = [key, rect, None]
+
+        if not self._rect.contains(rect):
+            self.prepareGeometryChange()
+            self._rect = self._rect.united(rect)
+        self.update(old_rect.united(rect))
+
+    def refresh_pipe(self, pipe):
+        """
+        Redraw a pipe after its color or style has changed.
+
+        Args:
+            pipe (Pipe): connection pipe.
+        """
+        record = self._pipes.get(pipe)
+        if record:
+            record[2] = None
+            self._dirty_chunk(record[0], record[1])
+
+    def promote(self, pipe):
+        """
+        Add a pipe drawn by the layer to the scene as an individual item.
+
+        Args:
+            pipe (Pipe): connection pipe.
+        """
+        self._demoted.discard(pipe)
+        if pipe in self._promoted or pipe not in self._pipes:
+            return
+        if not self.scene():
+            return
+        self._promoted.add(pipe)
+        self.scene().addItem(pipe)
+        record = self._pipes[pipe]
+        self._dirty_chunk(record[0], record[1])
+
+    def demote(self, pipe):
+        """
+        Hand a promoted pipe back to the layer, this is deferred to the
+        next event loop cycle as pipes are often reset and highlighted
+        again straight away.
+
+        Args:
+            pipe (Pipe): connection pipe.
+        """
+        if pipe not in self._promoted:
+            return
+        if not self._demoted:
+            QtCore.QTimer.singleShot(0, self._demote_pipes)
+        self._demoted.add(pipe)
+
+    def _demote_pipes(self):
+        pipes, self._demoted = self._demoted, set()
+        for pipe in pipes:
+            if pipe.active() or pipe.highlighted():
+                continue
+            if pipe not in self._promoted:
+                continue
+            self._promoted.discard(pipe)
+            if pipe.scene():
+                pipe.scene().removeItem(pipe)
+            self.refresh_pipe(pipe)
+
+    def clear(self):
+        """
+        Remove all the pipes from the layer.
+        """
+        for pipe in self._pipes:
+            pipe._layer = None
+        self.prepareGeometryChange()
+        self._pipes = {}
+        self._chunks = {}
+        self._index.clear()
+        self._promoted = set()
+        self._demoted = set()
+        self._hovered = None
+        self._rect = QtCore.QRectF()
+
+    def pipes(self):
+        """
+        Returns all the pipes owned by the layer.
+
+        Returns:
+            list[Pipe]: connection pipes.
+        """
+        return list(self._pipes.keys())
+
+    def virtual_pipes(self):
+        """
+        Returns the pipes drawn by the layer that aren't in the scene.
+
+        Returns:
+            list[Pipe]: connection pipes.
+        """
+        return [p for p in self._pipes if p not in self._promoted]
+
+    def _hit(self, pipe, rect):
+        return pipe.shape().intersects(rect.translated(-pipe.pos()))
+
+    def pipes_in(self, rect):
+        """
+        Returns the pipes drawn by the layer that intersect the rect.
+
+        Args:
+            rect (QtCore.QRectF): scene rect.
+
+        Returns:
+            list[Pipe]: connection pipes.
+        """
+        return [p for p in self._index.query(rect)
+                if p not in self._promoted and self._hit(p, rect)]
+
+    def pipe_at(self, pos, radius=3.0):
+        """
+        Returns the pipe drawn by the layer at the scene position.
+
+        Args:
+            pos (QtCore.QPointF): scene position.
+            radius (float): hit test distance.
+
+        Returns:
+            Pipe: connection pipe or None.
+        """
+        rect = QtCore.QRectF(pos.x() - radius, pos.y() - radius,
+                             radius * 2, radius * 2)
+        pipes = self.pipes_in(rect)
+        if pipes:
+            return pipes[0]
+
+    def hover(self, pos):
+        """
+        Activate the pipe under the cursor, the pipe is promoted to the
+        scene so it receives hover and mouse events.
+
+        Args:
+            pos (QtCore.QPointF): scene position.
+        """
+        hovered = self._hovered
+        if hovered:
+            rect = QtCore.QRectF(pos.x() - 1.0, pos.y() - 1.0, 2.0, 2.0)
+            if hovered.layer is self and self._hit(hovered, rect):
+                return
+            self._hovered = None
+            if hovered.active():
+                hovered.reset_state()
+        pipe = self.pipe_at(pos, 1.0)
+        if pipe:
+            self._hovered = pipe
+            pipe.activate()
+
+    def set_lod(self, lod):
+        """
+        Set the level of detail the pipes are drawn with.
+
+        Args:
+            lod (int): LOD_FULL, LOD_SIMPLIFIED or LOD_BLOCK.
+        """
+        if lod == self._lod:
+            return
+        self._lod = lod
+        for pipe, record in self._pipes.items():
+            pipe._lod = lod
+            record[2] = None
+            if pipe.scene():
+                pipe.update()
+        for chunk in self._chunks.values():
+            chunk.dirty = True
+        self.update()
@@ -3,6 +3,7 @@ from ..vendor.Qt import QtGui, QtCore, QtWidgets
 
 from NodeGraphQt.constants import (
     IN_PORT, OUT_PORT,
+    LOD_FULL, LOD_BLOCK,
     PORT_HOVER_COLOR,
     PORT_HOVER_BORDER_COLOR,
     PORT_ACTIVE_COLOR,
@@ -19,7 +20,7 @@ class PortItem(QtWidgets.QGraphicsItem):
         super(PortItem, self).__init__(parent)
         self.setAcceptHoverEvents(True)
         self.setFlag(self.ItemIsSelectable, False)
-        self.setFlag(self.ItemSendsScenePositionChanges, True)
+        self.setFlag(self.ItemSendsGeometryChanges, True)
         self.setZValue(Z_VAL_PORT)
         self._pipes = []
         self._width = 10.0
@@ -32,6 +33,7 @@ class PortItem(QtWidgets.QGraphicsItem):
         self._border_size = 1
         self._port_type = None
         self._multi_connection = False
+        self._lod = LOD_FULL
 
     def __str__(self):
         return '{}.PortItem("{}")'.format(self.__module__, self.name)
@@ -52,14 +54,21 @@ class PortItem(QtWidgets.QGraphicsItem):
                 used to describe the parameters needed to draw.
             widget (QtWidgets.QWidget): not used.
         """
+        # ports are too small to be seen at block level of detail.
+        if self._lod == LOD_BLOCK:
+            return
+
         painter.save()
 
-        rect = QtCore.QRectF(0.0, 0.8, self._width, self._height)
-        painter.setBrush(QtGui.QColor(0, 0, 0, 200))
-        painter.setPen(QtGui.QPen(QtGui.QColor(0, 0, 0, 255), 1.8))
-        path = QtGui.QPainterPath()
-        path.addEllipse(rect)
-        painter.drawPath(path)
+        if self._lod == LOD_FULL:
+            rect = QtCore.QRectF(0.0, 0.8, self._width, self._height)
+            painter.setBrush(QtGui.QColor(0, 0, 0, 200))
+            painter.setPen(QtGui.QPen(QtGui.QColor(0, 0, 0, 255), 1.8))
+            path = QtGui.QPainterPath()
+            path.addEllipse(rect)
+            painter.drawPath(path)
+        else:
+            painter.setRenderHint(QtGui.QPainter.Antialiasing, False)
 
         if self._hovered:
             color = QtGui.QColor(*PORT_HOVER_COLOR)
@@ -72,15 +81,25 @@ class PortItem(QtWidgets.QGraphicsItem):
             border_color = QtGui.QColor(*self.border_color)
 
         painter.setBrush(color)
-        pen = QtGui.QPen(border_color, 1.5)
-        painter.setPen(pen)
-        painter.drawEllipse(self.boundingRect())
+        if self._lod == LOD_FULL:
+            painter.setPen(QtGui.QPen(border_color, 1.5))
+            painter.drawEllipse(self.boundingRect())
+        else:
+            painter.setPen(QtCore.Qt.NoPen)
+            painter.drawRect(self.boundingRect())
 
         painter.restore()
 
     def itemChange(self, change, value):
-        if change == self.ItemScenePositionHasChanged:
+        # (scene position changes are forwarded by the parent node item.)
+        if change == self.ItemPositionHasChanged:
+            self.update_index()
             self.redraw_connected_pipes()
+        elif change == self.ItemSceneChange:
+            # update the port index of the scene the port is leaving.
+            self.update_index()
+        elif change == self.ItemSceneHasChanged:
+            self.update_index()
         return super(PortItem, self).itemChange(change, value)
 
     def mousePressEvent(self, event):
@@ -92,13 +111,33 @@ class PortItem(QtWidgets.QGraphicsItem):
         super(PortItem, self).mouseReleaseEvent(event)
         
     def hoverEnterEvent(self, event):
-        self._hovered = True
+        self.hovered = True
         super(PortItem, self).hoverEnterEvent(event)
         
     def hoverLeaveEvent(self, event):
-        self._hovered = False
+        self.hovered = False
         super(PortItem, self).hoverLeaveEvent(event)
 
+    def set_lod(self, lod):
+        """
+        Set the level of detail the port is drawn with.
+
+        Args:
+            lod (int): LOD_FULL, LOD_SIMPLIFIED or LOD_BLOCK.
+        """
+        if lod != self._lod:
+            self._lod = lod
+            self.update()
+
+    def update_index(self):
+        """
+        Mark the port to be updated in the viewer port index after its
+        scene position has changed.
+        """
+        viewer = self.scene().viewer() if self.scene() else None
+        if viewer:
+            viewer.schedule_port_update([self])
+
     def viewer_start_connection(self):
         viewer = self.scene().viewer()
         viewer.start_live_connection(self)
@@ -106,6 +145,11 @@ class PortItem(QtWidgets.QGraphicsItem):
     def redraw_connected_pipes(self):
         if not self.connected_pipes:
             return
+        viewer = self.scene().viewer() if self.scene() else None
+        if viewer:
+            # pipes are updated by the viewer once all items have moved.
+            viewer.schedule_pipe_update(self.connected_pipes)
+            return
         for pipe in self.connected_pipes:
             if self.port_type == IN_PORT:
                 pipe.draw_path(self, pipe.output_port)
@@ -114,9 +158,11 @@ class PortItem(QtWidgets.QGraphicsItem):
 
     def add_pipe(self, pipe):
         self._pipes.append(pipe)
+        self.update()
 
     def remove_pipe(self, pipe):
         self._pipes.remove(pipe)
+        self.update()
 
     @property
     def connected_pipes(self):
@@ -134,6 +180,15 @@ class PortItem(QtWidgets.QGraphicsItem):
     def node(self):
         return self.parentItem()
 
+    @property
+    def hovered(self):
+        return self._hovered
+
+    @hovered.setter
+    def hovered(self, value=False):
+        self._hovered = value
+        self.update()
+
     @property
     def name(self):
         return self._name
@@ -157,6 +212,7 @@ class PortItem(QtWidgets.QGraphicsItem):
     @color.setter
     def color(self, color=(0, 0, 0, 255)):
         self._color = color
+        self.update()
 
     @property
     def border_color(self):
@@ -165,6 +221,7 @@ class PortItem(QtWidgets.QGraphicsItem):
     @border_color.setter
     def border_color(self, color=(0, 0, 0, 255)):
         self._border_color = color
+        self.update()
 
     @property
     def border_size(self):
@@ -1,3 +1,5 @@
+import math
+
 from ..vendor.Qt import QtGui, QtCore, QtWidgets
 
 from NodeGraphQt.constants import (VIEWER_BG_COLOR,
@@ -9,6 +11,7 @@ class NodeScene(QtWidgets.QGraphicsScene):
 
     def __init__(self, parent=None):
         super(NodeScene, self).__init__(parent)
+        self._grid_cache = None
         self.background_color = VIEWER_BG_COLOR
         self.grid = VIEWER_GRID_OVERLAY
         self.grid_color = VIEWER_GRID_COLOR
@@ -18,45 +21,97 @@ class NodeScene(QtWidgets.QGraphicsScene):
                                       self.__class__.__name__,
                                       self.viewer())
 
-    def _draw_grid(self, painter, rect, pen, grid_size):
+    def _draw_grid(self, painter, tile_size, pen, grid_size):
+        # the lines on the right and bottom edges of the tile belong to
+        # the neighbouring tiles.
         lines = []
-        left = int(rect.left()) - (int(rect.left()) % grid_size)
-        top = int(rect.top()) - (int(rect.top()) % grid_size)
-        x = left
-        while x < rect.right():
-            x += grid_size
-            lines.append(QtCore.QLineF(x, rect.top(), x, rect.bottom()))
-        y = top
-        while y < rect.bottom():
-            y += grid_size
-            lines.append(QtCore.QLineF(rect.left(), y, rect.right(), y))
+        end = tile_size + grid_size
+        for pos in range(0, tile_size, grid_size):
+            lines.append(QtCore.QLineF(pos, -grid_size, pos, end))
+            lines.append(QtCore.QLineF(-grid_size, pos, end, pos))
         painter.setPen(pen)
         painter.drawLines(lines)
 
-    def drawBackground(self, painter, rect):
-        painter.save()
+    def _grid_tile(self, zoom, scale):
+        """
+        Returns the grid rendered into a pixmap tile, the tile is cached
+        per zoom bucket and reused while panning.
 
-        bg_color = QtGui.QColor(*self._bg_color)
-        painter.setRenderHint(QtGui.QPainter.Antialiasing, False)
-        painter.setBrush(bg_color)
-        painter.drawRect(rect)
+        The tile covers a whole number of major grid squares and is at
+        least 128 pixels wide, its size in device pixels is rounded up so
+        the tiles drawn at their exact scene positions always overlap.
 
-        if not self._grid:
-            painter.restore()
-            return
+        Args:
+            zoom (float): viewer zoom level.
+            scale (float): view transform scale.
 
-        zoom = self.viewer().get_zoom()
+        Returns:
+            tuple(QtGui.QPixmap, int): pixmap tile and tile size in scene
+                units.
+        """
         grid_size = 20
+        major_size = grid_size * 8
+        tile_size = major_size * max(1, int(math.ceil(
+            128.0 / (major_size * scale))))
+        tile_px = max(1, int(math.ceil(tile_size * scale)))
+
+        key = (zoom, tile_px, tile_size)
+        if self._grid_cache and self._grid_cache[0] == key:
+            return self._grid_cache[1], tile_size
+
+        bg_color = QtGui.QColor(*self._bg_color)
+        pixmap = QtGui.QPixmap(tile_px, tile_px)
+        pixmap.fill(bg_color)
+
+        painter = QtGui.QPainter(pixmap)
+        painter.setRenderHint(QtGui.QPainter.Antialiasing, False)
+        painter.scale(scale, scale)
 
         if zoom > -0.5:
             pen = QtGui.QPen(QtGui.QColor(*self.grid_color), 0.65)
-            self._draw_grid(painter, rect, pen, grid_size)
+            self._draw_grid(painter, tile_size, pen, grid_size)
 
         color = bg_color.darker(150)
         if zoom < -0.0:
             color = color.darker(100 - int(zoom * 110))
         pen = QtGui.QPen(color, 0.65)
-        self._draw_grid(painter, rect, pen, grid_size * 8)
+        self._draw_grid(painter, tile_size, pen, major_size)
+        painter.end()
+
+        self._grid_cache = (key, pixmap)
+        return pixmap, tile_size
+
+    def drawBackground(self, painter, rect):
+        painter.save()
+
+        bg_color = QtGui.QColor(*self._bg_color)
+        painter.setRenderHint(QtGui.QPainter.Antialiasing, False)
+
+        if not self._grid:
+            painter.fillRect(rect, bg_color)
+            painter.restore()
+            return
+
+        # the cached grid tile is drawn untransformed in device space, each
+        # tile is placed at its scene position rounded to the nearest
+        # pixel so the rounding error doesn't add up across the viewport.
+        transform = painter.worldTransform()
+        scale = transform.m11()
+        pixmap, tile_size = self._grid_tile(self.viewer().get_zoom(), scale)
+        step = tile_size * scale
+        origin = transform.map(QtCore.QPointF(0.0, 0.0))
+        device_rect = transform.mapRect(rect)
+        painter.resetTransform()
+        columns = range(int(math.floor((device_rect.left() - origin.x()) / step)),
+                        int(math.floor((device_rect.right() - origin.x()) / step)) + 1)
+        rows = range(int(math.floor((device_rect.top() - origin.y()) / step)),
+                     int(math.floor((device_rect.bottom() - origin.y()) / step)) + 1)
+        for row in rows:
+            y = int(round(origin.y() + row * step))
+            for column in columns:
+                painter.drawPixmap(
+                    int(round(origin.x() + column * step)), y, pixmap)
+        painter.setWorldTransform(transform)
 
         # fix border issue on the scene edge.        
         pen = QtGui.QPen(bg_color, 2)
@@ -103,6 +158,7 @@ class NodeScene(QtWidgets.QGraphicsScene):
     @grid.setter
     def grid(self, mode=True):
         self._grid = mode
+        self._grid_cache = None
 
     @property
     def grid_color(self):
@@ -111,6 +167,7 @@ class NodeScene(QtWidgets.QGraphicsScene):
     @grid_color.setter
     def grid_color(self, color=(0, 0, 0)):
         self._grid_color = color
+        self._grid_cache = None
 
     @property
     def background_color(self):
@@ -119,3 +176,4 @@ class NodeScene(QtWidgets.QGraphicsScene):
     @background_color.setter
     def background_color(self, color=(0, 0, 0)):
         self._bg_color = color
+        self._grid_cache = None
@@ -0,0 +1,161 @@
+#!/usr/bin/python
+import math
+
+from ..vendor.Qt import QtCore
+
+
+class SpatialHash(object):
+    """
+    Uniform grid index of items by their scene rect, used for hit testing
+    items without going through the scene item queries.
+
+    Args:
+        cell_size (float): scene size of the grid cells.
+    """
+
+    def __init__(self, cell_size=100.0):
+        self._cell_size = float(cell_size)
+        # {cell: set(items)}
+        self._cells = {}
+        # {item: (scene rect, cells)}
+        self._items = {}
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, item):
+        return item in self._items
+
+    def _rect_cells(self, rect):
+        size = self._cell_size
+        x1 = int(math.floor(rect.left() / size))
+        x2 = int(math.floor(rect.right() / size))
+        y1 = int(math.floor(rect.top() / size))
+        y2 = int(math.floor(rect.bottom() / size))
+        return [(x, y) for x in range(x1, x2 + 1) for y in range(y1, y2 + 1)]
+
+    def _candidates(self, rect):
+        found = set()
+        cells = self._cells
+        for cell in self._rect_cells(rect):
+            items = cells.get(cell)
+            if items:
+                found.update(items)
+        return found
+
+    def insert(self, item, rect):
+        """
+        Add an item to the index or update the rect of an indexed item.
+
+        Args:
+            item (object): hashable item.
+            rect (QtCore.QRectF): item scene rect.
+        """
+        cells = self._rect_cells(rect)
+        entry = self._items.get(item)
+        if entry:
+            if entry[1] == cells:
+                self._items[item] = (QtCore.QRectF(rect), cells)
+                return
+            self._discard_cells(item, entry[1])
+        for cell in cells:
+            items = self._cells.get(cell)
+            if items is None:
+                items = self._cells[cell] = set()
+            items.add(item)
+        self._items[item] = (QtCore.QRectF(rect), cells)
+
+    def remove(self, item):
+        """
+        Remove an item from the index.
+
+        Args:
+            item (object): indexed item.
+        """
+        entry = self._items.pop(item, None)
+        if entry:
+            self._discard_cells(item, entry[1])
+
+    def _discard_cells(self, item, cells):
+        for cell in cells:
+            items = self._cells.get(cell)
+            if items is None:
+                continue
+            items.discard(item)
+            if not items:
+                del self._cells[cell]
+
+    def clear(self):
+        """
+        Remove all the items from the index.
+        """
+        self._cells.clear()
+        self._items.clear()
+
+    def rect(self, item):
+        """
+        Returns the indexed scene rect of the item.
+
+        Args:
+            item (object): indexed item.
+
+        Returns:
+            QtCore.QRectF: scene rect or None if the item isn't indexed.
+        """
+        entry = self._items.get(item)
+        if entry:
+            return entry[0]
+
+    def items(self):
+        """
+        Returns all the indexed items.
+
+        Returns:
+            list: indexed items.
+        """
+        return list(self._items.keys())
+
+    def query(self, rect):
+        """
+        Returns the items with a rect intersecting the scene rect.
+
+        Args:
+            rect (QtCore.QRectF): scene rect.
+
+        Returns:
+            set: indexed items.
+        """
+        entries = self._items
+        return {i for i in self._candidates(rect)
+                if entries[i][0].intersects(rect)}
+
+    def nearest(self, pos, radius, accept=None):
+        """
+        Returns the item closest to the scene position with a rect
+        within the radius.
+
+        Args:
+            pos (QtCore.QPointF): scene position.
+            radius (float): search distance from the item rects.
+            accept (function): optional item filter callback.
+
+        Returns:
+            object: indexed item or None.
+        """
+        rect = QtCore.QRectF(pos.x() - radius, pos.y() - radius,
+                             radius * 2, radius * 2)
+        nearest = None
+        nearest_dist = None
+        for item in self._candidates(rect):
+            item_rect = self._items[item][0]
+            if not item_rect.adjusted(
+                    -radius, -radius, radius, radius).contains(pos):
+                continue
+            if accept and not accept(item):
+                continue
+            center = item_rect.center()
+            dist = ((center.x() - pos.x()) ** 2 +
+                    (center.y() - pos.y()) ** 2)
+            if nearest_dist is None or dist < nearest_dist:
+                nearest, nearest_dist = item, dist
+        return nearest
@@ -4,21 +4,108 @@ import os
 from ..vendor.Qt import QtGui, QtCore, QtWidgets
 
 from NodeGraphQt.constants import (IN_PORT, OUT_PORT,
+                                   LOD_FULL, LOD_SIMPLIFIED, LOD_BLOCK,
+                                   LOD_SIMPLIFIED_ZOOM, LOD_BLOCK_ZOOM,
                                    PIPE_LAYOUT_CURVED,
                                    PIPE_LAYOUT_STRAIGHT,
                                    PIPE_STYLE_DASHED,
+                                   PORT_SNAP_RADIUS,
                                    SCENE_AREA)
 from NodeGraphQt.widgets.node_abstract import AbstractNodeItem
 from NodeGraphQt.widgets.node_backdrop import BackdropNodeItem
-from NodeGraphQt.widgets.pipe import Pipe
+from NodeGraphQt.widgets.node_base import NodeItem
+from NodeGraphQt.widgets.pipe import Pipe, PipeLayer
 from NodeGraphQt.widgets.port import PortItem
 from NodeGraphQt.widgets.scene import NodeScene
+from NodeGraphQt.widgets.spatial_hash import SpatialHash
 from NodeGraphQt.widgets.stylesheet import STYLE_QMENU
 from NodeGraphQt.widgets.tab_search import TabSearchWidget
 
 ZOOM_MIN = -0.95
 ZOOM_MAX = 2.0
 
+#: viewport update modes for the viewer performance profile.
+VIEWPORT_UPDATE_MODES = {
+    'full': QtWidgets.QGraphicsView.FullViewportUpdate,
+    'minimal': QtWidgets.QGraphicsView.MinimalViewportUpdate,
+    'smart': QtWidgets.QGraphicsView.SmartViewportUpdate,
+    'bounding_rect': QtWidgets.QGraphicsView.BoundingRectViewportUpdate,
+}
+
+#: item cache modes for the viewer performance profile.
+ITEM_CACHE_MODES = {
+    'none': QtWidgets.QGraphicsItem.NoCache,
+    'item': QtWidgets.QGraphicsItem.ItemCoordinateCache,
+    'device': QtWidgets.QGraphicsItem.DeviceCoordinateCache,
+}
+
+
+def _rect_difference(rect, other):
+    """
+    Returns the parts of the rect outside the other rect as up to four
+    non overlapping strips.
+
+    Args:
+        rect (QtCore.QRectF): scene rect.
+        other (QtCore.QRectF): scene rect to subtract.
+
+    Returns:
+        list[QtCore.QRectF]: scene rects.
+    """
+    if not rect.intersects(other):
+        return [rect]
+    top = max(rect.top(), other.top())
+    bottom = min(rect.bottom(), other.bottom())
+    strips = [
+        QtCore.QRectF(QtCore.QPointF(rect.left(), rect.top()),
+                      QtCore.QPointF(rect.right(), top)),
+        QtCore.QRectF(QtCore.QPointF(rect.left(), bottom),
+                      QtCore.QPointF(rect.right(), rect.bottom())),
+        QtCore.QRectF(QtCore.QPointF(rect.left(), top),
+                      QtCore.QPointF(other.left(), bottom)),
+        QtCore.QRectF(QtCore.QPointF(other.right(), top),
+                      QtCore.QPointF(rect.right(), bottom)),
+    ]
+    return [r for r in strips if r.width() > 0 and r.height() > 0]
+
+#: viewer performance profile presets.
+VIEWER_PROFILES = {
+    # best quality, the whole viewport is repainted on every change.
+    'default': {
+        'update_mode': 'full',
+        'antialiasing': True,
+        'batched_pipes': False,
+        'cache_modes': {
+            'node': 'none', 'backdrop': 'none', 'port': 'none', 'pipe': 'none'
+        },
+    },
+    # only the changed regions are repainted and the node, port and
+    # label drawing is cached in device pixmaps (the global pixmap cache
+    # limit is raised in KB so the visible items stay cached).
+    'large_graph': {
+        'update_mode': 'smart',
+        'antialiasing': True,
+        'batched_pipes': False,
+        'pixmap_cache_limit': 65536,
+        'cache_modes': {
+            'node': 'device', 'backdrop': 'none', 'port': 'device',
+            'pipe': 'none'
+        },
+    },
+    # as above with a single bounding rect update, no antialiasing and
+    # the pipes drawn in batches by a single pipe layer item.
+    'huge_graph': {
+        'update_mode': 'bounding_rect',
+        'antialiasing': False,
+        'batched_pipes': True,
+        'pixmap_cache_limit': 131072,
+        'cache_modes': {
+            'node': 'device', 'backdrop': 'device', 'port': 'device',
+            'pipe': 'none'
+        },
+    },
+}
+
 
 class NodeViewer(QtWidgets.QGraphicsView):
     """
@@ -31,6 +118,8 @@ class NodeViewer(QtWidgets.QGraphicsView):
     moved_nodes = QtCore.Signal(dict)
     search_triggered = QtCore.Signal(str, tuple)
     connection_changed = QtCore.Signal(list, list)
+    selection_changed = QtCore.Signal(list, list)
+    backdrop_resized = QtCore.Signal(str)
 
     # pass through signals
     node_selected = QtCore.Signal(str)
@@ -43,6 +132,7 @@ class NodeViewer(QtWidgets.QGraphicsView):
 
         scene_pos = (SCENE_AREA / 2) * -1
         self.setScene(NodeScene(self))
+        self.scene().selectionChanged.connect(self._on_selection_changed)
         self.setSceneRect(scene_pos, scene_pos, SCENE_AREA, SCENE_AREA)
         self.setRenderHint(QtGui.QPainter.Antialiasing, True)
         self.setHorizontalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOff)
@@ -52,6 +142,35 @@ class NodeViewer(QtWidgets.QGraphicsView):
         self.resize(1000, 800)
 
         self._pipe_layout = PIPE_LAYOUT_CURVED
+        self._zoom = 0.0
+        self._lod = LOD_FULL
+        self._lod_simplified_zoom = LOD_SIMPLIFIED_ZOOM
+        self._lod_block_zoom = LOD_BLOCK_ZOOM
+        self._update_mode = 'full'
+        self._update_depth = 0
+        self._update_index_method = None
+        self._dirty_pipes = set()
+        self._pipe_timer = QtCore.QTimer(self)
+        self._pipe_timer.setSingleShot(True)
+        self._pipe_timer.setInterval(0)
+        self._pipe_timer.timeout.connect(self.update_dirty_pipes)
+        self._cache_modes = dict(VIEWER_PROFILES['default']['cache_modes'])
+        self._pipe_layer = None
+        self._port_index = SpatialHash(100.0)
+        self._dirty_ports = set()
+        self._snap_radius = PORT_SNAP_RADIUS
+        self._snap_port = None
+        self._snap_checked = {}
+        self._node_index = SpatialHash(200.0)
+        self._dirty_nodes = set()
+        self._rubber_band_nodes = set()
+        self._rubber_band_base = set()
+        self._rubber_band_rect = None
+        self._selected_ids = set()
+        self._selection_timer = QtCore.QTimer(self)
+        self._selection_timer.setSingleShot(True)
+        self._selection_timer.setInterval(0)
+        self._selection_timer.timeout.connect(self._emit_selection_changed)
         self._live_pipe = None
         self._detached_port = None
         self._start_port = None
@@ -77,6 +196,9 @@ class NodeViewer(QtWidgets.QGraphicsView):
         menu_bar.addMenu(self._context_menu)
 
         self.acyclic = True
+        # graph model the connections are validated against (set by the
+        # node graph).
+        self.graph_model = None
         self.LMB_state = False
         self.RMB_state = False
         self.MMB_state = False
@@ -103,6 +225,29 @@ class NodeViewer(QtWidgets.QGraphicsView):
             if scale == 1.1:
                 return
         self.scale(scale, scale)
+        self._update_zoom()
+
+    def _update_zoom(self, force_lod=False):
+        """
+        Cache the zoom level from the view transform and update the level
+        of detail of the items if the zoom crossed a threshold.
+
+        Args:
+            force_lod (bool): re-apply the level of detail to all items.
+        """
+        self._zoom = float('{:0.2f}'.format(self.transform().m11() - 1.0))
+        if self._zoom < self._lod_block_zoom:
+            lod = LOD_BLOCK
+        elif self._zoom < self._lod_simplified_zoom:
+            lod = LOD_SIMPLIFIED
+        else:
+            lod = LOD_FULL
+        if lod == self._lod and not force_lod:
+            return
+        self._lod = lod
+        for item in self.scene().items():
+            if isinstance(item, (AbstractNodeItem, Pipe, PipeLayer)):
+                item.set_lod(lod)
 
     def _set_viewer_pan(self, pos_x, pos_y):
         scroll_x = self.horizontalScrollBar()
@@ -116,6 +261,41 @@ class NodeViewer(QtWidgets.QGraphicsView):
         self.scene().destroyItemGroup(group)
         return rect
 
+    def _item_cache_mode(self, item):
+        """
+        Returns the cache mode for the item from the performance profile.
+
+        Args:
+            item (QtWidgets.QGraphicsItem): scene item.
+
+        Returns:
+            str: cache mode name or None if the item type isn't cached.
+        """
+        if isinstance(item, Pipe):
+            return self._cache_modes['pipe']
+        elif isinstance(item, PortItem):
+            return self._cache_modes['port']
+        elif isinstance(item, BackdropNodeItem):
+            return self._cache_modes['backdrop']
+        elif isinstance(item, AbstractNodeItem):
+            return self._cache_modes['node']
+        elif isinstance(item, QtWidgets.QGraphicsTextItem):
+            # node label and port text items are cached with the node.
+            if isinstance(item.parentItem(), NodeItem):
+                return self._cache_modes['node']
+
+    def _apply_cache_modes(self, items):
+        """
+        Set the item cache modes from the performance profile.
+
+        Args:
+            items (list[QtWidgets.QGraphicsItem]): scene items.
+        """
+        for item in items:
+            mode = self._item_cache_mode(item)
+            if mode is not None:
+                item.setCacheMode(ITEM_CACHE_MODES[mode])
+
     def _items_near(self, pos, item_type=None, width=20, height=20):
         x, y = pos.x() - width, pos.y() - height
         rect = QtCore.QRectF(x, y, width, height)
@@ -123,8 +303,88 @@ class NodeViewer(QtWidgets.QGraphicsView):
         for item in self.scene().items(rect):
             if not item_type or isinstance(item, item_type):
                 items.append(item)
+        # pipes drawn by the pipe layer aren't scene items.
+        if self._pipe_layer and (not item_type or item_type is Pipe):
+            items += self._pipe_layer.pipes_in(rect)
         return items
 
+    def _update_rubber_band_selection(self, rect):
+        """
+        Select the nodes in the rubber band rect, only the nodes in the
+        strips between the previous and the current rect are checked and
+        the ones that entered or left the rect are toggled.
+
+        Args:
+            rect (QtCore.QRectF): rubber band scene rect.
+        """
+        prev_rect = self._rubber_band_rect
+        self._rubber_band_rect = rect
+        if prev_rect is None:
+            strips = [rect]
+        else:
+            strips = (_rect_difference(rect, prev_rect) +
+                      _rect_difference(prev_rect, rect))
+        nodes = set()
+        for strip in strips:
+            nodes.update(self.nodes_in(strip))
+
+        entered = []
+        left = []
+        for node in nodes:
+            inside = node.isVisible() and self._node_in_rect(node, rect)
+            if inside and node not in self._rubber_band_nodes:
+                self._rubber_band_nodes.add(node)
+                entered.append(node)
+            elif not inside and node in self._rubber_band_nodes:
+                self._rubber_band_nodes.remove(node)
+                if node not in self._rubber_band_base:
+                    left.append(node)
+        for node in left:
+            node.setSelected(False)
+        for node in entered:
+            node.setSelected(True)
+
+    @staticmethod
+    def _node_in_rect(node, rect):
+        """
+        Returns True if the node shape intersects the scene rect, same as
+        the scene selection area with QtCore.Qt.IntersectsItemShape.
+
+        Args:
+            node (AbstractNodeItem): node item.
+            rect (QtCore.QRectF): scene rect.
+
+        Returns:
+            bool: node in the rect.
+        """
+        if rect.contains(node.sceneBoundingRect()):
+            return True
+        path = QtGui.QPainterPath()
+        path.addRect(rect)
+        return node.collidesWithPath(node.mapFromScene(path),
+                                     QtCore.Qt.IntersectsItemShape)
+
+    def _on_selection_changed(self):
+        # selection changes are emitted once per event loop cycle.
+        if not self._selection_timer.isActive():
+            self._selection_timer.start()
+
+    def flush_selection_changed(self):
+        """
+        Emit the pending selection changed signal immediately.
+        """
+        if self._selection_timer.isActive():
+            self._selection_timer.stop()
+            self._emit_selection_changed()
+
+    def _emit_selection_changed(self):
+        selected_ids = set(n.id for n in self.selected_nodes())
+        selected = selected_ids - self._selected_ids
+        deselected = self._selected_ids - selected_ids
+        self._selected_ids = selected_ids
+        if selected or deselected:
+            self.selection_changed.emit(list(selected), list(deselected))
+
     def _on_search_submitted(self, node_type):
         pos = self.mapToScene(self._previous_pos)
         self.search_triggered.emit(node_type, (pos.x(), pos.y()))
@@ -179,6 +439,12 @@ class NodeViewer(QtWidgets.QGraphicsView):
             self.scene().update(map_rect)
             self._rubber_band.setGeometry(rect)
             self._rubber_band.show()
+            # nodes selected before a shift drag stay selected.
+            self._rubber_band_nodes = set()
+            self._rubber_band_base = set()
+            self._rubber_band_rect = None
+            if shift_modifier:
+                self._rubber_band_base = set(self._prev_selection)
 
         if not shift_modifier:
             super(NodeViewer, self).mousePressEvent(event)
@@ -213,7 +479,6 @@ class NodeViewer(QtWidgets.QGraphicsView):
 
     def mouseMoveEvent(self, event):
         alt_modifier = event.modifiers() == QtCore.Qt.AltModifier
-        shift_modifier = event.modifiers() == QtCore.Qt.ShiftModifier
         if self.MMB_state and alt_modifier:
             pos_x = (event.x() - self._previous_pos.x())
             zoom = 0.1 if pos_x > 0 else -0.1
@@ -226,20 +491,17 @@ class NodeViewer(QtWidgets.QGraphicsView):
         if self.LMB_state and self._rubber_band.isVisible():
             rect = QtCore.QRect(self._origin_pos, event.pos()).normalized()
             map_rect = self.mapToScene(rect).boundingRect()
-            path = QtGui.QPainterPath()
-            path.addRect(map_rect)
             self._rubber_band.setGeometry(rect)
-            self.scene().setSelectionArea(path, QtCore.Qt.IntersectsItemShape)
+            self._update_rubber_band_selection(map_rect)
             self.scene().update(map_rect)
 
-            if shift_modifier and self._prev_selection:
-                for node in self._prev_selection:
-                    if node not in self.selected_nodes():
-                        node.selected = True
-
         self._previous_pos = event.pos()
         super(NodeViewer, self).mouseMoveEvent(event)
 
+        # update the pipes of the dragged nodes once per mouse move.
+        if self._dirty_pipes:
+            self.update_dirty_pipes()
+
     def wheelEvent(self, event):
         try:
             delta = event.delta()
@@ -283,10 +545,28 @@ class NodeViewer(QtWidgets.QGraphicsView):
                 The event handler from the QtWidgets.QGraphicsScene
         """
         if not self._live_pipe:
+            # hovered pipes are promoted out of the pipe layer.
+            if self._pipe_layer and event.buttons() == QtCore.Qt.NoButton:
+                self._pipe_layer.hover(event.scenePos())
             return
         if not self._start_port:
             return
         pos = event.scenePos()
+
+        # snap the live connection to the nearest compatible port.
+        snap_port = None
+        if self._snap_radius:
+            radius = self._snap_radius / self.transform().m11()
+            snap_port = self.port_at(pos, radius, self._start_port)
+        if snap_port is not self._snap_port:
+            if self._snap_port:
+                self._snap_port.hovered = False
+            if snap_port:
+                snap_port.hovered = True
+            self._snap_port = snap_port
+        if snap_port:
+            pos = snap_port.sceneBoundingRect().center()
+
         self._live_pipe.draw_path(self._start_port, None, pos)
 
     def sceneMousePressEvent(self, event):
@@ -319,9 +599,8 @@ class NodeViewer(QtWidgets.QGraphicsView):
 
         if not alt_modifier:
             pos = event.scenePos()
-            port_items = self._items_near(pos, PortItem, 5, 5)
-            if port_items:
-                port = port_items[0]
+            port = self.port_at(pos, 2.5)
+            if port:
                 if not port.multi_connection and port.connected_ports:
                     self._detached_port = port.connected_ports[0]
                 self.start_live_connection(port)
@@ -378,11 +657,7 @@ class NodeViewer(QtWidgets.QGraphicsView):
             return
 
         # find the end port.
-        end_port = None
-        for item in self.scene().items(event.scenePos()):
-            if isinstance(item, PortItem):
-                end_port = item
-                break
+        end_port = self._snap_port or self.port_at(event.scenePos())
 
         connected = []
         disconnected = []
@@ -469,6 +744,10 @@ class NodeViewer(QtWidgets.QGraphicsView):
         if self._live_pipe:
             self._live_pipe.delete()
             self._live_pipe = None
+        if self._snap_port:
+            self._snap_port.hovered = False
+            self._snap_port = None
+        self._snap_checked = {}
         self._start_port = None
 
     def establish_connection(self, start_port, end_port):
@@ -477,30 +756,192 @@ class NodeViewer(QtWidgets.QGraphicsView):
         (adds a new pipe item to draw between 2 ports)
         """
         pipe = Pipe()
-        self.scene().addItem(pipe)
+        pipe.set_lod(self._lod)
+        if self._cache_modes['pipe'] != 'none':
+            pipe.setCacheMode(ITEM_CACHE_MODES[self._cache_modes['pipe']])
+        if self._pipe_layer:
+            self._pipe_layer.add_pipe(pipe)
+        else:
+            self.scene().addItem(pipe)
         pipe.set_connections(start_port, end_port)
         pipe.draw_path(pipe.input_port, pipe.output_port)
 
+    def begin_update(self):
+        """
+        Suspend the viewport repaints and the scene item index until the
+        matching :meth:`NodeViewer.end_update` call (calls can be nested).
+        """
+        self._update_depth += 1
+        if self._update_depth > 1:
+            return
+        scene = self.scene()
+        self._update_index_method = scene.itemIndexMethod()
+        scene.setItemIndexMethod(QtWidgets.QGraphicsScene.NoIndex)
+        self.viewport().setUpdatesEnabled(False)
+
+    def end_update(self):
+        """
+        Resume the viewport repaints and the scene item index suspended
+        by :meth:`NodeViewer.begin_update` and redraw the viewer once.
+        """
+        if self._update_depth == 0:
+            return
+        self._update_depth -= 1
+        if self._update_depth:
+            return
+        self.scene().setItemIndexMethod(self._update_index_method)
+        self.update_dirty_pipes()
+        self.viewport().setUpdatesEnabled(True)
+        self.viewport().update()
+
+    def schedule_pipe_update(self, pipes):
+        """
+        Mark pipes to be updated after their ports have moved, the dirty
+        pipes are updated once at the end of the mouse move event or on
+        the next event loop cycle.
+
+        Args:
+            pipes (list[Pipe]): pipes connected to the moved ports.
+        """
+        self._dirty_pipes.update(pipes)
+        if not self._pipe_timer.isActive():
+            self._pipe_timer.start()
+
+    def update_dirty_pipes(self):
+        """
+        Update the paths of all the pipes marked dirty, pipes between
+        nodes that moved together are translated instead of redrawn.
+        """
+        self._pipe_timer.stop()
+        pipes, self._dirty_pipes = self._dirty_pipes, set()
+        for pipe in pipes:
+            if pipe.scene() or pipe.layer:
+                pipe.update_path()
+
+    def schedule_node_update(self, nodes):
+        """
+        Mark nodes to be updated in the node index after their scene
+        rect has changed, the index is updated on the next query.
+
+        Args:
+            nodes (list[AbstractNodeItem]): moved or resized nodes.
+        """
+        self._dirty_nodes.update(nodes)
+
+    def _update_node_index(self):
+        if not self._dirty_nodes:
+            return
+        nodes, self._dirty_nodes = self._dirty_nodes, set()
+        scene = self.scene()
+        for node in nodes:
+            if node.scene() is scene:
+                self._node_index.insert(node, node.sceneBoundingRect())
+            else:
+                self._node_index.remove(node)
+
+    def nodes_in(self, rect):
+        """
+        Returns the nodes intersecting the scene rect from the node index.
+
+        Args:
+            rect (QtCore.QRectF): scene rect.
+
+        Returns:
+            list[AbstractNodeItem]: node items.
+        """
+        self._update_node_index()
+        scene = self.scene()
+        return [n for n in self._node_index.query(rect)
+                if n.scene() is scene]
+
+    def schedule_port_update(self, ports):
+        """
+        Mark ports to be updated in the port index after their scene
+        position has changed, the index is updated on the next query.
+
+        Args:
+            ports (list[PortItem]): moved ports.
+        """
+        self._dirty_ports.update(ports)
+
+    def _update_port_index(self):
+        if not self._dirty_ports:
+            return
+        ports, self._dirty_ports = self._dirty_ports, set()
+        scene = self.scene()
+        for port in ports:
+            if port.scene() is scene:
+                self._port_index.insert(port, port.sceneBoundingRect())
+            else:
+                self._port_index.remove(port)
+
+    def _snap_compatible(self, start_port, port):
+        """
+        Returns True if the live connection from the start port can snap
+        to the port (the acyclic check is cached per connection).
+
+        Args:
+            start_port (PortItem): live connection start port.
+            port (PortItem): port to snap to.
+
+        Returns:
+            bool: True if the port is compatible.
+        """
+        if port.port_type == start_port.port_type:
+            return False
+        if port.node == start_port.node:
+            return False
+        valid = self._snap_checked.get(port)
+        if valid is None:
+            valid = not self.acyclic or self.acyclic_check(start_port, port)
+            self._snap_checked[port] = valid
+        return valid
+
+    def port_at(self, pos, radius=0.0, compatible_port=None):
+        """
+        Returns the port closest to the scene position from the port
+        index.
+
+        Args:
+            pos (QtCore.QPointF): scene position.
+            radius (float): search distance from the port rects.
+            compatible_port (PortItem): only return ports a connection
+                from this port can be made to.
+
+        Returns:
+            PortItem: port item or None.
+        """
+        self._update_port_index()
+        scene = self.scene()
+
+        def accept(port):
+            if port.scene() is not scene or not port.isVisible():
+                return False
+            if compatible_port:
+                return self._snap_compatible(compatible_port, port)
+            return True
+
+        return self._port_index.nearest(pos, radius, accept)
+
     def acyclic_check(self, start_port, end_port):
         """
-        validate the connection so it doesn't loop itself.
+        validate the connection so it doesn't loop itself, the connection
+        is checked against the topological order of the graph model.
+
+        Args:
+            start_port (PortItem): live connection start port.
+            end_port (PortItem): port to connect to.
 
         Returns:
             bool: True if port connection is valid.
         """
-        start_node = start_port.node
-        check_nodes = [end_port.node]
-        io_types = {IN_PORT: 'outputs', OUT_PORT: 'inputs'}
-        while check_nodes:
-            check_node = check_nodes.pop(0)
-            for check_port in getattr(check_node, io_types[end_port.port_type]):
-                if check_port.connected_ports:
-                    for port in check_port.connected_ports:
-                        if port.node != start_node:
-                            check_nodes.append(port.node)
-                        else:
-                            return False
-        return True
+        if start_port.port_type == OUT_PORT:
+            out_node, in_node = start_port.node, end_port.node
+        else:
+            out_node, in_node = end_port.node, start_port.node
+        if self.graph_model is None:
+            return out_node != in_node
+        return self.graph_model.acyclic_check(out_node.id, in_node.id)
 
     # --- viewer ---
 
@@ -566,6 +1007,8 @@ class NodeViewer(QtWidgets.QGraphicsView):
         for item in self.scene().items():
             if isinstance(item, Pipe):
                 pipes.append(item)
+        if self._pipe_layer:
+            pipes += self._pipe_layer.virtual_pipes()
         return pipes
 
     def all_nodes(self):
@@ -582,11 +1025,78 @@ class NodeViewer(QtWidgets.QGraphicsView):
                 nodes.append(item)
         return nodes
 
+    def select_nodes(self, selected=None, deselected=None):
+        """
+        Set the selected state of a batch of node items, the selection
+        changed signal is emitted once for the batch.
+
+        Args:
+            selected (list[AbstractNodeItem]): node items to select.
+            deselected (list[AbstractNodeItem]): node items to deselect.
+        """
+        for node in deselected or []:
+            node.setSelected(False)
+        for node in selected or []:
+            node.setSelected(True)
+
     def add_node(self, node, pos=None):
         pos = pos or (self._previous_pos.x(), self._previous_pos.y())
         node.pre_init(self, pos)
         self.scene().addItem(node)
         node.post_init(self, pos)
+        node.set_lod(self._lod)
+        self._apply_cache_modes([node] + node.childItems())
+
+    def add_nodes(self, nodes):
+        """
+        Add a batch of node items into the scene, the scene item index is
+        suspended while the items are added and rebuilt once afterwards.
+
+        Args:
+            nodes (list[tuple(AbstractNodeItem, tuple)]):
+                node items with their x, y positions.
+        """
+        scene = self.scene()
+        index_method = scene.itemIndexMethod()
+        scene.setItemIndexMethod(QtWidgets.QGraphicsScene.NoIndex)
+        for node, pos in nodes:
+            pos = pos or (self._previous_pos.x(), self._previous_pos.y())
+            node.pre_init(self, pos)
+            scene.addItem(node)
+            node.post_init(self, pos)
+            node.set_lod(self._lod)
+            self._apply_cache_modes([node] + node.childItems())
+        scene.setItemIndexMethod(index_method)
+
+    def clear_nodes(self):
+        """
+        Remove all the node and pipe items from the scene in one pass and
+        reset the viewer indexes (used to clear the session).
+        """
+        self.end_live_connection()
+        scene = self.scene()
+        if self._pipe_layer:
+            self._pipe_layer.clear()
+        index_method = scene.itemIndexMethod()
+        scene.setItemIndexMethod(QtWidgets.QGraphicsScene.NoIndex)
+        for item in scene.items():
+            if item.parentItem() is None and \
+                    isinstance(item, (AbstractNodeItem, Pipe)):
+                scene.removeItem(item)
+        scene.setItemIndexMethod(index_method)
+
+        self._node_index.clear()
+        self._port_index.clear()
+        self._dirty_nodes = set()
+        self._dirty_ports = set()
+        self._dirty_pipes = set()
+        self._rubber_band_nodes = set()
+        self._rubber_band_base = set()
+        self._rubber_band_rect = None
+        self._selected_ids = set()
+        self._selection_timer.stop()
+        self._prev_selection = []
+        self._node_positions = {}
 
     def remove_node(self, node):
         if isinstance(node, AbstractNodeItem):
@@ -652,14 +1162,218 @@ class NodeViewer(QtWidgets.QGraphicsView):
         for pipe in self.all_pipes():
             pipe.draw_path(pipe.input_port, pipe.output_port)
 
+    def get_batched_pipes(self):
+        """
+        Returns True if the pipes are drawn in batches by the pipe layer.
+
+        Returns:
+            bool: batched pipes enabled.
+        """
+        return self._pipe_layer is not None
+
+    def set_batched_pipes(self, mode=True):
+        """
+        Draw the pipes in batches from a single pipe layer item instead
+        of a scene item per pipe (pipes are added back to the scene as
+        individual items while hovered or highlighted).
+
+        Args:
+            mode (bool): enable batched pipes.
+        """
+        if bool(mode) == self.get_batched_pipes():
+            return
+        scene = self.scene()
+        if mode:
+            self._pipe_layer = PipeLayer()
+            self._pipe_layer.set_lod(self._lod)
+            scene.addItem(self._pipe_layer)
+            index_method = scene.itemIndexMethod()
+            scene.setItemIndexMethod(QtWidgets.QGraphicsScene.NoIndex)
+            for pipe in self.all_pipes():
+                if pipe is self._live_pipe or not pipe.input_port:
+                    continue
+                highlighted = pipe.active() or pipe.highlighted()
+                self._pipe_layer.add_pipe(pipe)
+                if highlighted:
+                    self._pipe_layer.promote(pipe)
+            scene.setItemIndexMethod(index_method)
+            return
+        layer, self._pipe_layer = self._pipe_layer, None
+        for pipe in layer.pipes():
+            layer.remove_pipe(pipe)
+            if not pipe.scene():
+                scene.addItem(pipe)
+            pipe.set_lod(self._lod)
+        scene.removeItem(layer)
+
+    def get_port_snap_radius(self):
+        """
+        Returns the distance in viewer pixels a live connection snaps to
+        a port from.
+
+        Returns:
+            float: snap radius.
+        """
+        return self._snap_radius
+
+    def set_port_snap_radius(self, radius=PORT_SNAP_RADIUS):
+        """
+        Set the distance in viewer pixels a live connection snaps to a
+        compatible port from.
+
+        Args:
+            radius (float): snap radius (0 disables snapping).
+        """
+        if radius < 0:
+            raise AssertionError('snap radius must be positive.')
+        self._snap_radius = radius
+
+    def get_update_mode(self):
+        """
+        Returns the viewport update mode.
+
+        Returns:
+            str: "full", "minimal", "smart" or "bounding_rect".
+        """
+        return self._update_mode
+
+    def set_update_mode(self, mode='full'):
+        """
+        Set how the viewport is repainted when items change.
+
+        Args:
+            mode (str): "full", "minimal", "smart" or "bounding_rect".
+        """
+        if mode not in VIEWPORT_UPDATE_MODES:
+            raise AssertionError('invalid update mode "{}".'.format(mode))
+        self._update_mode = mode
+        self.setViewportUpdateMode(VIEWPORT_UPDATE_MODES[mode])
+        self.viewport().update()
+
+    def get_item_cache_modes(self):
+        """
+        Returns the cache modes for the item types.
+
+        Returns:
+            dict: {<item type>: <cache mode>}
+        """
+        return dict(self._cache_modes)
+
+    def set_item_cache_mode(self, item_type, mode='none'):
+        """
+        Set the cache mode for an item type and apply it to the items
+        already in the scene.
+
+        Args:
+            item_type (str): "node", "backdrop", "port" or "pipe".
+            mode (str): "none", "item" or "device".
+        """
+        if item_type not in self._cache_modes:
+            raise AssertionError('invalid item type "{}".'.format(item_type))
+        if mode not in ITEM_CACHE_MODES:
+            raise AssertionError('invalid cache mode "{}".'.format(mode))
+        if self._cache_modes[item_type] == mode:
+            return
+        self._cache_modes[item_type] = mode
+        self._apply_cache_modes(self.scene().items())
+
+    def get_performance_profile(self):
+        """
+        Returns the current viewer performance profile.
+
+        Returns:
+            dict: update mode, antialiasing, batched pipes and item cache
+                modes.
+        """
+        return {
+            'update_mode': self._update_mode,
+            'pixmap_cache_limit': QtGui.QPixmapCache.cacheLimit(),
+            'antialiasing': bool(
+                self.renderHints() & QtGui.QPainter.Antialiasing),
+            'batched_pipes': self.get_batched_pipes(),
+            'cache_modes': self.get_item_cache_modes(),
+        }
+
+    def set_performance_profile(self, profile='default'):
+        """
+        Set the viewport update mode, antialiasing, batched pipes and the
+        item cache modes from a preset in ``VIEWER_PROFILES`` or a profile dict.
+
+        Args:
+            profile (str or dict): "default", "large_graph", "huge_graph"
+                or a dict with the same keys as the presets.
+        """
+        if not isinstance(profile, dict):
+            if profile not in VIEWER_PROFILES:
+                raise AssertionError(
+                    'invalid performance profile "{}".'.format(profile))
+            profile = VIEWER_PROFILES[profile]
+        if 'antialiasing' in profile:
+            self.setRenderHint(QtGui.QPainter.Antialiasing,
+                               profile['antialiasing'])
+        cache_limit = profile.get('pixmap_cache_limit')
+        if cache_limit and cache_limit > QtGui.QPixmapCache.cacheLimit():
+            QtGui.QPixmapCache.setCacheLimit(cache_limit)
+        cache_modes = profile.get('cache_modes', {})
+        for item_type, mode in cache_modes.items():
+            if item_type not in self._cache_modes:
+                raise AssertionError(
+                    'invalid item type "{}".'.format(item_type))
+            if mode not in ITEM_CACHE_MODES:
+                raise AssertionError('invalid cache mode "{}".'.format(mode))
+        self._cache_modes.update(cache_modes)
+        self._apply_cache_modes(self.scene().items())
+        if 'batched_pipes' in profile:
+            self.set_batched_pipes(profile['batched_pipes'])
+        self.set_update_mode(profile.get('update_mode', self._update_mode))
+
     def reset_zoom(self):
         self.scale(1.0, 1.0)
         self.resetTransform()
+        self._update_zoom()
 
     def get_zoom(self):
-        transform = self.transform()
-        cur_scale = (transform.m11(), transform.m22())
-        return float('{:0.2f}'.format(cur_scale[0] - 1.0))
+        return self._zoom
+
+    def get_lod(self):
+        """
+        Returns the level of detail the items are drawn with at the
+        current zoom level.
+
+        Returns:
+            int: LOD_FULL, LOD_SIMPLIFIED or LOD_BLOCK.
+        """
+        return self._lod
+
+    def get_lod_thresholds(self):
+        """
+        Returns the zoom levels below which the items are drawn simplified
+        and as blocks.
+
+        Returns:
+            tuple(float, float): simplified and block zoom thresholds.
+        """
+        return self._lod_simplified_zoom, self._lod_block_zoom
+
+    def set_lod_thresholds(self, simplified=LOD_SIMPLIFIED_ZOOM,
+                           block=LOD_BLOCK_ZOOM):
+        """
+        Set the zoom levels below which the items are drawn with less
+        detail (zoom range -0.95 / 2.0).
+
+        Args:
+            simplified (float): zoom level for drawing flat nodes with no
+                text or widgets.
+            block (float): zoom level for drawing nodes as blocks and
+                pipes as straight lines.
+        """
+        if block > simplified:
+            raise AssertionError(
+                'block threshold must be lower than the simplified threshold.')
+        self._lod_simplified_zoom = simplified
+        self._lod_block_zoom = block
+        self._update_zoom(force_lod=True)
+        self.viewport().update()
 
     def set_zoom(self, value=0.0):
         if value == 0.0:
@@ -678,5 +1392,6 @@ class NodeViewer(QtWidgets.QGraphicsView):
     def zoom_to_nodes(self, nodes):
         rect = self._combined_rect(nodes)
         self.fitInView(rect, QtCore.Qt.KeepAspectRatio)
+        self._update_zoom()
         if self.get_zoom() > 0.1:
             self.reset_zoom()
@@ -0,0 +1,64 @@
+#!/usr/bin/python
+"""
+Node creation benchmark, compares the create_node() loop with
+create_nodes() and reports the throughput in nodes per second.
+
+    python benchmarks/bench_create_nodes.py [--sizes COUNT ...] [--viewer]
+"""
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import make_graph, timed
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+NODE_TYPE = 'benchmarks.nodes.BenchNode'
+
+
+def create_loop(graph, count, positions):
+    return [graph.create_node(NODE_TYPE, pos=pos, selected=False)
+            for pos in positions]
+
+
+def main(sizes=(1000, 10000, 50000), headless=True):
+    print('{:>8} {:>20} {:>20} {:>20}'.format(
+        'nodes', 'create_node loop', 'create_nodes', 'create_nodes numpy'))
+    for count in sizes:
+        positions = [(random.uniform(0, 5000), random.uniform(0, 5000))
+                     for _ in range(count)]
+        results = []
+
+        graph = make_graph(headless)
+        _, seconds = timed(create_loop, graph, count, positions)
+        results.append(count / seconds)
+
+        graph = make_graph(headless)
+        _, seconds = timed(graph.create_nodes, NODE_TYPE, count, positions)
+        results.append(count / seconds)
+
+        if numpy is not None:
+            array = numpy.array(positions)
+            graph = make_graph(headless)
+            _, seconds = timed(graph.create_nodes, NODE_TYPE, count, array)
+            results.append(count / seconds)
+
+        print('{:>8} '.format(count) + ' '.join(
+            '{:>12.0f} nodes/s'.format(r) for r in results))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[1000, 10000, 50000],
+                        help='number of nodes created per run.')
+    parser.add_argument('--viewer', action='store_true',
+                        help='create the nodes in a node graph with a viewer.')
+    args = parser.parse_args()
+    main(args.sizes, headless=not args.viewer)
@@ -0,0 +1,42 @@
+#!/usr/bin/python
+"""
+Background grid repaint benchmark, times the repaint of an empty viewport
+while panning at a few zoom levels.
+
+    python benchmarks/bench_grid.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from NodeGraphQt import NodeGraph
+from NodeGraphQt.vendor.Qt import QtWidgets
+
+
+def main(frames=30):
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+    graph = NodeGraph()
+    viewer = graph.viewer()
+    viewer.resize(1920, 1200)
+    viewer.show()
+    app.processEvents()
+    for steps in (0, -3, -6, 3):
+        viewer.reset_zoom()
+        for _ in range(abs(steps)):
+            viewer._set_viewer_zoom(0.1 if steps > 0 else -0.1)
+        viewer.centerOn(0, 0)
+        app.processEvents()
+        start = time.perf_counter()
+        for i in range(frames):
+            viewer.centerOn(i * 7.3, i * 3.1)
+            viewer.viewport().repaint()
+        elapsed = (time.perf_counter() - start) / frames * 1000
+        print('zoom {:5.2f}  pan repaint {:.2f}ms'.format(
+            viewer.get_zoom(), elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/python
+"""
+Session serializer benchmark, times NodeGraph._serialize() and
+save_session() against the previous serializer that checked every
+connection against the connection list.
+
+    python benchmarks/bench_serialize.py [--legacy-max EDGES]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import make_graph, build_graph, timed
+
+
+def legacy_serialize(nodes):
+    """
+    The serializer before the edge table, each connection is looked up in
+    the connection list so it's quadratic in the number of edges.
+    """
+    serial_data = {'nodes': {}, 'connections': []}
+    nodes_data = {}
+    for n in nodes:
+        n.update_model()
+        nodes_data.update(n.model.to_dict)
+
+    for n_id, n_data in nodes_data.items():
+        serial_data['nodes'][n_id] = n_data
+
+        inputs = n_data.pop('inputs') if n_data.get('inputs') else {}
+        outputs = n_data.pop('outputs') if n_data.get('outputs') else {}
+
+        for pname, conn_data in inputs.items():
+            for conn_id, prt_names in conn_data.items():
+                for conn_prt in prt_names:
+                    pipe = {'in': [n_id, pname], 'out': [conn_id, conn_prt]}
+                    if pipe not in serial_data['connections']:
+                        serial_data['connections'].append(pipe)
+
+        for pname, conn_data in outputs.items():
+            for conn_id, prt_names in conn_data.items():
+                for conn_prt in prt_names:
+                    pipe = {'out': [n_id, pname], 'in': [conn_id, conn_prt]}
+                    if pipe not in serial_data['connections']:
+                        serial_data['connections'].append(pipe)
+
+    if not serial_data['connections']:
+        serial_data.pop('connections')
+    return serial_data
+
+
+def main(sizes=(1000, 10000, 100000), legacy_max=10000):
+    dir_path = tempfile.mkdtemp()
+    try:
+        print('{:>8} {:>12} {:>12} {:>12}'.format(
+            'edges', 'serialize', 'legacy', 'save json'))
+        for edges in sizes:
+            graph = make_graph()
+            nodes = build_graph(graph, edges)
+            data, serialize = timed(graph._serialize, nodes)
+            assert len(data['connections']) == edges
+
+            legacy = '-'
+            if edges <= legacy_max:
+                legacy_data, seconds = timed(legacy_serialize, nodes)
+                assert len(legacy_data['connections']) == edges
+                legacy = '{:.3f}s'.format(seconds)
+
+            file_path = os.path.join(dir_path, 'session.json')
+            _, save = timed(graph.save_session, file_path)
+            print('{:>8} {:>11.3f}s {:>12} {:>11.3f}s'.format(
+                edges, serialize, legacy, save))
+    finally:
+        shutil.rmtree(dir_path)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--legacy-max', type=int, default=10000,
+                        help='largest edge count timed with the legacy '
+                             'serializer (it is quadratic).')
+    args = parser.parse_args()
+    main(legacy_max=args.legacy_max)
@@ -0,0 +1,84 @@
+#!/usr/bin/python
+"""
+Session benchmark, times clear_session() and the save, load and file
+size of every session format and compression.
+
+The transfer column is the time to copy the file over a network share
+at the --bandwidth (Mbit/s), added to the save or load of a session on
+network storage.
+
+    python benchmarks/bench_sessions.py [--nodes COUNT] [--viewer]
+                                        [--bandwidth MBIT]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import make_graph, build_graph, timed
+
+FILE_NAMES = (
+    'session.json',
+    'session.ngb',
+    'session.json.gz',
+    'session.json.xz',
+    'session.json.bz2',
+    'session.ngb.gz',
+    'session.ngb.xz',
+    'session.ngb.bz2',
+)
+
+
+def clear_nodes(graph):
+    """
+    Remove the nodes one by one like clear_session() used to.
+    """
+    for node in graph.all_nodes():
+        graph.delete_node(node)
+    graph.undo_stack().clear()
+
+
+def main(count=20000, headless=True, bandwidth=100.0):
+    dir_path = tempfile.mkdtemp()
+    try:
+        graph = make_graph(headless)
+        build_graph(graph, count, fan_out=1)
+        nodes = len(graph.all_nodes())
+
+        print('{:<18} {:>10} {:>8} {:>8} {:>9}'.format(
+            '{} nodes'.format(nodes), 'size', 'save', 'load', 'transfer'))
+        for file_name in FILE_NAMES:
+            file_path = os.path.join(dir_path, file_name)
+            _, save = timed(graph.save_session, file_path)
+            loaded = make_graph(headless)
+            _, load = timed(loaded.load_session, file_path)
+            assert len(loaded.all_nodes()) == nodes
+            size = os.path.getsize(file_path)
+            transfer = size * 8 / (bandwidth * 1000000)
+            print('{:<18} {:>8}KB {:>7.2f}s {:>7.2f}s {:>8.2f}s'.format(
+                file_name, size // 1024, save, load, transfer))
+
+        print('')
+        file_path = os.path.join(dir_path, 'session.ngb')
+        _, seconds = timed(graph.clear_session)
+        print('clear_session        {:.3f}s'.format(seconds))
+        graph.load_session(file_path)
+        _, seconds = timed(clear_nodes, graph)
+        print('delete_node loop     {:.3f}s'.format(seconds))
+    finally:
+        shutil.rmtree(dir_path)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--nodes', type=int, default=20000,
+                        help='number of nodes (and connections).')
+    parser.add_argument('--viewer', action='store_true',
+                        help='use node graphs with a viewer.')
+    parser.add_argument('--bandwidth', type=float, default=100.0,
+                        help='network storage bandwidth in Mbit/s.')
+    args = parser.parse_args()
+    main(args.nodes, headless=not args.viewer, bandwidth=args.bandwidth)
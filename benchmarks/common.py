@@ -0,0 +1,80 @@
+#!/usr/bin/python
+"""
+Shared helpers for the benchmark scripts.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from NodeGraphQt import NodeGraph, Node
+from NodeGraphQt.vendor.Qt import QtWidgets
+
+
+class BenchNode(Node):
+    """
+    Node with multi connection input and output ports.
+    """
+
+    __identifier__ = 'benchmarks.nodes'
+    NODE_NAME = 'bench node'
+
+    def __init__(self):
+        super(BenchNode, self).__init__()
+        self.add_input('in', multi_input=True)
+        self.add_output('out', multi_output=True)
+
+
+_app = None
+
+
+def application():
+    """
+    Returns the QApplication instance, it's kept alive for the benchmark.
+    """
+    global _app
+    _app = (QtWidgets.QApplication.instance() or
+            QtWidgets.QApplication(sys.argv))
+    return _app
+
+
+def make_graph(headless=True):
+    """
+    Returns a node graph with the benchmark node registered.
+    """
+    application()
+    graph = NodeGraph(headless=headless)
+    graph.register_node(BenchNode)
+    return graph
+
+
+def build_graph(graph, edges, fan_out=2):
+    """
+    Create the nodes and connect each node to the next fan_out nodes
+    until the graph has the number of edges.
+
+    Returns:
+        list[NodeGraphQt.Node]: created nodes.
+    """
+    count = edges // fan_out + fan_out
+    positions = [(i % 100 * 200.0, i // 100 * 120.0) for i in range(count)]
+    nodes = graph.create_nodes('benchmarks.nodes.BenchNode', count, positions)
+    pairs = []
+    for i, node in enumerate(nodes):
+        for j in range(i + 1, i + 1 + fan_out):
+            if len(pairs) == edges:
+                break
+            pairs.append((node.output(0), nodes[j].input(0)))
+    graph.connect_ports(pairs)
+    return nodes
+
+
+def timed(func, *args, **kwargs):
+    """
+    Returns the result of the call and the time it took in seconds.
+    """
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
@@ -0,0 +1,124 @@
+#!/usr/bin/python
+import os
+import sys
+import unittest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from NodeGraphQt import NodeGraph
+from NodeGraphQt.vendor.Qt import QtWidgets
+
+from tests.test_connections import MultiNode
+
+app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+
+
+class BulkCommandsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = NodeGraph(headless=True)
+        self.graph.register_node(MultiNode)
+        self.undo_stack = self.graph.undo_stack()
+
+    def create_nodes(self, count, **kwargs):
+        return self.graph.create_nodes('tests.nodes.MultiNode', count,
+                                       **kwargs)
+
+    @staticmethod
+    def connections(nodes):
+        return sorted((n.name(), p.node().name())
+                      for n in nodes for p in n.output(0).connected_ports())
+
+    def test_create_nodes(self):
+        self.graph.create_node('tests.nodes.MultiNode', name='node',
+                               selected=False)
+        created = []
+        self.graph.nodes_created.connect(created.append)
+        nodes = self.create_nodes(
+            3, positions=((0, 10), (20, 30), (40.5, 50)), names='node',
+            properties={'color': (10, 20, 30, 255)}, selected=True)
+
+        self.assertEqual(created, [nodes])
+        self.assertEqual([n.name() for n in nodes],
+                         ['node 1', 'node 2', 'node 3'])
+        self.assertEqual([n.pos() for n in nodes],
+                         [[0.0, 10.0], [20.0, 30.0], [40.5, 50.0]])
+        self.assertTrue(all(n.color() == (10, 20, 30) for n in nodes))
+        self.assertEqual(len(self.graph.selected_nodes()), 3)
+
+        # created as a single undo step.
+        self.assertEqual(self.undo_stack.count(), 2)
+        self.undo_stack.undo()
+        self.assertEqual(len(self.graph.all_nodes()), 1)
+        self.undo_stack.redo()
+        self.assertEqual(len(self.graph.all_nodes()), 4)
+        self.assertIs(self.graph.get_node_by_name('node 2'), nodes[1])
+
+    def test_create_nodes_per_node_values(self):
+        nodes = self.create_nodes(
+            2, names=['a', 'a'],
+            properties=[{'disabled': True}, {'disabled': False}])
+        self.assertEqual([n.name() for n in nodes], ['a', 'a 1'])
+        self.assertEqual([n.disabled() for n in nodes], [True, False])
+
+    def test_create_nodes_invalid(self):
+        with self.assertRaises(AssertionError):
+            self.create_nodes(2, positions=[(0, 0)])
+        with self.assertRaises(KeyError):
+            self.create_nodes(1, properties={'missing': 1})
+        self.assertEqual(self.create_nodes(0), [])
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed.')
+    def test_create_nodes_numpy_positions(self):
+        positions = numpy.arange(6, dtype=float).reshape(3, 2)
+        nodes = self.create_nodes(3, positions=positions)
+        self.assertEqual([n.pos() for n in nodes],
+                         [[0.0, 1.0], [2.0, 3.0], [4.0, 5.0]])
+
+    def test_connect_ports(self):
+        nodes = self.create_nodes(3, names=['a', 'b', 'c'])
+        connected = []
+        self.graph.ports_connected.connect(connected.append)
+        pairs = self.graph.connect_ports([
+            (nodes[0].output(0), nodes[1].input(0)),
+            # input and output in any order.
+            (nodes[2].input(0), nodes[1].output(0)),
+            # would create a cycle.
+            (nodes[2].output(0), nodes[0].input(0)),
+        ])
+        self.assertEqual(len(pairs), 2)
+        self.assertEqual(len(connected), 1)
+        self.assertEqual(self.connections(nodes), [('a', 'b'), ('b', 'c')])
+
+        self.undo_stack.undo()
+        self.assertEqual(self.connections(nodes), [])
+        self.undo_stack.redo()
+        self.assertEqual(self.connections(nodes), [('a', 'b'), ('b', 'c')])
+
+        self.graph.disconnect_ports([(nodes[0].output(0), nodes[1].input(0))])
+        self.assertEqual(self.connections(nodes), [('b', 'c')])
+        self.undo_stack.undo()
+        self.assertEqual(self.connections(nodes), [('a', 'b'), ('b', 'c')])
+
+    def test_delete_nodes(self):
+        nodes = self.create_nodes(3, names=['a', 'b', 'c'])
+        self.graph.connect_ports([(nodes[0].output(0), nodes[1].input(0)),
+                                  (nodes[1].output(0), nodes[2].input(0))])
+        count = self.undo_stack.count()
+        self.graph.delete_nodes(nodes[:2])
+        self.assertEqual(self.graph.all_nodes(), [nodes[2]])
+        self.assertEqual(nodes[2].input(0).connected_ports(), [])
+
+        self.assertEqual(self.undo_stack.count(), count + 1)
+        self.undo_stack.undo()
+        self.assertEqual(len(self.graph.all_nodes()), 3)
+        self.assertEqual(self.connections(nodes), [('a', 'b'), ('b', 'c')])
+
+
+if __name__ == '__main__':
+    unittest.main()
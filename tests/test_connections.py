@@ -0,0 +1,63 @@
+#!/usr/bin/python
+import os
+import sys
+import unittest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from NodeGraphQt import NodeGraph, Node
+from NodeGraphQt.vendor.Qt import QtWidgets
+
+app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+
+
+class MultiNode(Node):
+    """
+    Node with multi connection input and output ports.
+    """
+
+    __identifier__ = 'tests.nodes'
+    NODE_NAME = 'multi node'
+
+    def __init__(self):
+        super(MultiNode, self).__init__()
+        self.add_input('in', multi_input=True)
+        self.add_output('out', multi_output=True)
+
+
+class ConnectionsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = NodeGraph(headless=True)
+        self.graph.register_node(MultiNode)
+        self.node_a = self.graph.create_node('tests.nodes.MultiNode')
+        self.node_b = self.graph.create_node('tests.nodes.MultiNode')
+
+    def test_connect_twice_disconnect_once(self):
+        out_port = self.node_a.output(0)
+        in_port = self.node_b.input(0)
+        out_port.connect_to(in_port)
+        out_port.connect_to(in_port)
+        in_port.connect_to(out_port)
+        self.assertEqual(out_port.connected_ports(), [in_port])
+
+        out_port.disconnect_from(in_port)
+        self.assertEqual(out_port.connected_ports(), [])
+        self.assertEqual(list(self.graph.downstream_nodes(self.node_a)), [])
+        self.assertTrue(self.graph.model.acyclic_check(
+            self.node_b.id, self.node_a.id))
+
+    def test_add_connection_twice(self):
+        model = self.graph.model
+        out_port = self.node_a.output(0)
+        in_port = self.node_b.input(0)
+        model.add_connection(out_port, in_port)
+        model.add_connection(out_port, in_port)
+        model.remove_connection(out_port, in_port)
+        self.assertFalse(model.has_connection(out_port, in_port))
+        self.assertEqual(list(self.graph.downstream_nodes(self.node_a)), [])
+        self.assertTrue(model.acyclic_check(self.node_b.id, self.node_a.id))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+#!/usr/bin/python
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from NodeGraphQt import NodeGraph, Node, Backdrop
+from NodeGraphQt.vendor.Qt import QtWidgets
+
+app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+
+
+class WidgetNode(Node):
+    """
+    Node with embedded widgets.
+    """
+
+    __identifier__ = 'tests.nodes'
+    NODE_NAME = 'widget node'
+
+    def __init__(self):
+        super(WidgetNode, self).__init__()
+        self.add_text_input('text', 'text')
+        self.add_checkbox('check', 'check')
+        self.add_combo_menu('menu', 'menu', items=['a', 'b', 'c'])
+
+
+class JournalTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir_path = tempfile.mkdtemp()
+        self.session = os.path.join(self.dir_path, 'session.json')
+        graph = self.make_graph()
+        graph.create_node('tests.nodes.WidgetNode', name='widgets')
+        graph.create_node('nodeGraphQt.nodes.Backdrop', name='backdrop')
+        graph.save_session(self.session)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir_path)
+
+    @staticmethod
+    def make_graph():
+        graph = NodeGraph()
+        graph.register_node(WidgetNode)
+        graph.register_node(Backdrop)
+        return graph
+
+    def open_session(self, journal=False):
+        graph = self.make_graph()
+        graph.set_journal_enabled(journal)
+        graph.load_session(self.session)
+        return graph
+
+    def test_recover_widget_changes(self):
+        graph = self.open_session(journal=True)
+        node = graph.get_node_by_name('widgets')
+        node.view.get_widget('text').value = 'typed'
+        node.view.get_widget('check').value = True
+        node.view.get_widget('menu').widget.setCurrentIndex(2)
+        node.view.get_widget('menu').widget.activated.emit(2)
+
+        recovered = self.open_session().get_node_by_name('widgets')
+        self.assertEqual(recovered.get_property('text'), 'typed')
+        self.assertEqual(recovered.get_property('check'), True)
+        self.assertEqual(recovered.get_property('menu'), 'c')
+
+    def test_recover_backdrop_resize(self):
+        graph = self.open_session(journal=True)
+        backdrop = graph.get_node_by_name('backdrop')
+        backdrop.view._sizer.set_pos(420.0, 310.0)
+        backdrop.view.on_sizer_released()
+        size = backdrop.size()
+
+        recovered = self.open_session().get_node_by_name('backdrop')
+        self.assertEqual(recovered.size(), size)
+
+    def test_session_changed(self):
+        graph = self.open_session(journal=True)
+        graph.get_node_by_name('widgets').set_name('renamed')
+        # the session file is saved by another node graph.
+        other = self.make_graph()
+        other.create_node('tests.nodes.WidgetNode', name='other')
+        other.save_session(self.session)
+
+        failed = []
+        graph = self.make_graph()
+        graph.session_recovery_failed.connect(
+            lambda *args: failed.append(args))
+        graph.load_session(self.session)
+        self.assertEqual(len(failed), 1)
+        self.assertEqual(failed[0][0], self.session + '.journal')
+        self.assertEqual([n.name() for n in graph.all_nodes()], ['other'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+#!/usr/bin/python
+import os
+import sys
+import unittest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from NodeGraphQt import NodeGraph
+from NodeGraphQt.base.commands import PropertyChangedCmd
+from NodeGraphQt.vendor.Qt import QtWidgets
+
+from tests.test_connections import MultiNode
+
+app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+
+
+class NameIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = NodeGraph(headless=True)
+        self.graph.register_node(MultiNode)
+
+    def create(self, name):
+        return self.graph.create_node('tests.nodes.MultiNode', name=name)
+
+    def test_unique_names(self):
+        node_a = self.create('node')
+        node_b = self.create('node')
+        node_c = self.create('node 1')
+        self.assertEqual(
+            [node_a.name(), node_b.name(), node_c.name()],
+            ['node', 'node 1', 'node 2'])
+        self.assertEqual(self.graph.get_unique_name('node  2'), 'node 3')
+
+    def test_lookup_after_rename_and_delete(self):
+        node_a = self.create('a')
+        node_b = self.create('b')
+        node_a.set_name('renamed')
+        self.assertIs(self.graph.get_node_by_name('renamed'), node_a)
+        self.assertIsNone(self.graph.get_node_by_name('a'))
+
+        self.graph.delete_nodes([node_b])
+        self.assertIsNone(self.graph.get_node_by_name('b'))
+        self.graph.undo_stack().undo()
+        self.assertIs(self.graph.get_node_by_name('b'), node_b)
+        self.graph.undo_stack().undo()
+        self.assertIs(self.graph.get_node_by_name('a'), node_a)
+
+    def test_rename_command_to_taken_name(self):
+        node_a = self.create('a')
+        node_b = self.create('b')
+        self.graph.undo_stack().push(PropertyChangedCmd(node_b, 'name', 'a'))
+        self.assertNotEqual(node_b.name(), 'a')
+        self.assertIs(self.graph.get_node_by_name('a'), node_a)
+        self.assertIs(self.graph.get_node_by_name(node_b.name()), node_b)
+
+        self.graph.undo_stack().undo()
+        self.assertEqual(node_b.name(), 'b')
+        self.assertIs(self.graph.get_node_by_name('a'), node_a)
+        self.assertIs(self.graph.get_node_by_name('b'), node_b)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+#!/usr/bin/python
+import os
+import sys
+import unittest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from NodeGraphQt import NodeGraph
+from NodeGraphQt.vendor.Qt import QtCore, QtGui, QtWidgets
+
+app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+
+
+class GridTest(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = NodeGraph()
+        self.scene = self.graph.viewer().scene()
+
+    def major_lines(self, scale, offset, width=800):
+        """
+        Returns the device x positions of the major grid lines drawn by
+        the background at the view scale and scene x offset.
+        """
+        image = QtGui.QImage(width, 40, QtGui.QImage.Format_RGB32)
+        painter = QtGui.QPainter(image)
+        transform = QtGui.QTransform()
+        transform.translate(-offset * scale, 0)
+        transform.scale(scale, scale)
+        painter.setWorldTransform(transform)
+        rect = transform.inverted()[0].mapRect(QtCore.QRectF(0, 0, width, 40))
+        self.scene.drawBackground(painter, rect)
+        painter.end()
+        # sample a row between the horizontal grid lines and skip the
+        # scene edge border.
+        y = int(round(10 * scale))
+        row = [QtGui.QColor(image.pixel(x, y)).lightness()
+               for x in range(width)]
+        # minor lines are lighter and major lines darker than the
+        # background.
+        background = max(set(row), key=row.count)
+        return [x for x, value in enumerate(row)
+                if 1 < x < width - 2 and value < background]
+
+    def test_grid_matches_scene_units(self):
+        for scale in (0.41, 0.737, 1.0, 1.33):
+            for offset in (0, 20000, 200000):
+                lines = self.major_lines(scale, offset)
+                first = int(offset / 160) + 1
+                expected = []
+                for i in range(first, first + int(800 / scale / 160) + 1):
+                    x = round((i * 160 - offset) * scale)
+                    if 1 < x < 798:
+                        expected.append(x)
+                # the lines are within a pixel of their scene position
+                # however far they are from the scene origin.
+                self.assertEqual(len(lines), len(expected),
+                                 (scale, offset, lines, expected))
+                for x, expected_x in zip(lines, expected):
+                    self.assertLessEqual(abs(x - expected_x), 1,
+                                         (scale, offset, lines, expected))
+
+
+if __name__ == '__main__':
+    unittest.main()
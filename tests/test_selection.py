@@ -0,0 +1,68 @@
+#!/usr/bin/python
+import os
+import sys
+import unittest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from NodeGraphQt import NodeGraph
+from NodeGraphQt.vendor.Qt import QtCore, QtWidgets
+from NodeGraphQt.widgets.node_abstract import AbstractNodeItem
+
+from tests.test_connections import MultiNode
+
+app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+
+
+class RubberBandTest(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = NodeGraph()
+        self.graph.register_node(MultiNode)
+        self.viewer = self.graph.viewer()
+        for row in range(10):
+            for column in range(10):
+                self.graph.create_node('tests.nodes.MultiNode',
+                                       pos=[column * 150.0, row * 110.0],
+                                       selected=False)
+
+    def selected(self):
+        return set(n for n in self.viewer.selected_nodes())
+
+    def nodes_in(self, rect):
+        items = self.viewer.scene().items(rect, QtCore.Qt.IntersectsItemShape)
+        return set(i for i in items
+                   if isinstance(i, AbstractNodeItem) and i.isVisible())
+
+    def test_drag(self):
+        # grow, shrink, move and flip the rubber band around the origin.
+        rects = [
+            QtCore.QRectF(10, 10, 0, 0),
+            QtCore.QRectF(10, 10, 200, 120),
+            QtCore.QRectF(10, 10, 640, 500),
+            QtCore.QRectF(10, 10, 300, 600),
+            QtCore.QRectF(-200, -100, 210, 110),
+            QtCore.QRectF(-200, 10, 210, 900),
+            QtCore.QRectF(10, 10, 1400, 1000),
+            QtCore.QRectF(700, 10, 0.5, 0.5),
+        ]
+        self.viewer._rubber_band_rect = None
+        for rect in rects:
+            self.viewer._update_rubber_band_selection(rect)
+            self.assertEqual(self.selected(), self.nodes_in(rect), rect)
+
+    def test_shift_drag(self):
+        base = set(self.nodes_in(QtCore.QRectF(900, 500, 400, 400)))
+        for node in base:
+            node.setSelected(True)
+        self.viewer._rubber_band_base = set(base)
+        self.viewer._rubber_band_rect = None
+        for rect in (QtCore.QRectF(800, 400, 300, 300),
+                     QtCore.QRectF(800, 400, 100, 100),
+                     QtCore.QRectF(0, 0, 50, 50)):
+            self.viewer._update_rubber_band_selection(rect)
+            self.assertEqual(self.selected(), base | self.nodes_in(rect))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,253 @@
+#!/usr/bin/python
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from NodeGraphQt import NodeGraph
+from NodeGraphQt.base import session
+from NodeGraphQt.vendor.Qt import QtCore, QtWidgets
+
+from tests.test_connections import MultiNode
+
+app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), 'data')
+
+
+class SessionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir_path = tempfile.mkdtemp()
+        self.graph = self.make_graph()
+        nodes = [self.graph.create_node('tests.nodes.MultiNode',
+                                        name='node {}'.format(i),
+                                        pos=[i * 100.0, 10.0])
+                 for i in range(3)]
+        nodes[1].set_color(10, 20, 30)
+        nodes[2].set_disabled(True)
+        nodes[0].set_output(0, nodes[1].input(0))
+        nodes[0].set_output(0, nodes[2].input(0))
+        nodes[1].set_output(0, nodes[2].input(0))
+
+    def tearDown(self):
+        shutil.rmtree(self.dir_path)
+
+    @staticmethod
+    def make_graph():
+        graph = NodeGraph(headless=True)
+        graph.register_node(MultiNode)
+        return graph
+
+    def path(self, file_name):
+        return os.path.join(self.dir_path, file_name)
+
+    @staticmethod
+    def layout(graph):
+        """
+        Returns the node positions, colors, disabled states and the
+        connections by node name.
+        """
+        nodes = {}
+        connections = set()
+        for node in graph.all_nodes():
+            nodes[node.name()] = (node.pos(), node.color(),
+                                  node.disabled())
+            for port in node.outputs().values():
+                for in_port in port.connected_ports():
+                    connections.add((node.name(), port.name(),
+                                     in_port.node().name(), in_port.name()))
+        return nodes, connections
+
+    def assertLoads(self, file_path, expected=None):
+        graph = self.make_graph()
+        graph.load_session(file_path)
+        self.assertEqual(self.layout(graph),
+                         self.layout(expected or self.graph))
+
+    def test_serialize_connections_once(self):
+        data = self.graph.serialize_session()
+        connections = [(c['out'][0], c['out'][1], c['in'][0], c['in'][1])
+                       for c in data['connections']]
+        self.assertEqual(len(connections), 3)
+        self.assertEqual(len(set(connections)), 3)
+
+        # the connections to nodes outside the serialized nodes are kept.
+        nodes = [self.graph.get_node_by_name('node 0'),
+                 self.graph.get_node_by_name('node 1')]
+        self.assertEqual(len(self.graph._serialize(nodes)['connections']), 3)
+
+    def test_duplicate_nodes(self):
+        nodes = [self.graph.get_node_by_name('node 0'),
+                 self.graph.get_node_by_name('node 1')]
+        copies = self.graph.duplicate_nodes(nodes)
+        self.assertEqual(sorted(c.name() for c in copies),
+                         ['node 3', 'node 4'])
+        # only the connection between the duplicated nodes is copied.
+        nodes, connections = self.layout(self.graph)
+        self.assertEqual(len(nodes), 5)
+        self.assertEqual(len(connections), 4)
+        self.assertIn(('node 3', 'out', 'node 4', 'in'), connections)
+
+    def test_json_round_trip(self):
+        file_path = self.path('session.json')
+        self.graph.save_session(file_path)
+        self.assertLoads(file_path)
+
+    def test_binary_round_trip(self):
+        file_path = self.path('session.ngb')
+        self.graph.save_session(file_path)
+        self.assertLoads(file_path)
+
+    def test_binary_writer_streams_blocks(self):
+        records = list(self.graph._session_records())
+        buf = io.BytesIO()
+        block_size = session.BINARY_BLOCK_SIZE
+        session.BINARY_BLOCK_SIZE = 1
+        try:
+            writer = session.BinarySessionWriter(buf)
+            sizes = []
+            for record in records:
+                writer.write(*record)
+                sizes.append(buf.tell())
+            writer.close()
+        finally:
+            session.BINARY_BLOCK_SIZE = block_size
+
+        # each record is written as it comes in.
+        self.assertEqual(sizes, sorted(set(sizes)))
+        header = session._HEADER.size
+        strings, nodes, edges, extra = session._COUNTS.unpack_from(
+            buf.getvalue(), header)
+        self.assertEqual((nodes, edges), (3, 3))
+        self.assertEqual(extra, len(buf.getvalue()) - 4)
+        records = json.loads(json.dumps(records))
+        self.assertEqual(
+            [list(r) for r in session.BinarySessionReader(
+                io.BytesIO(buf.getvalue()))],
+            records)
+
+    def test_binary_reader_streams(self):
+        file_path = self.path('session.ngb')
+        self.graph.save_session(file_path)
+        with open(file_path, 'rb') as file_obj:
+            data = file_obj.read()
+        reads = []
+
+        class File(io.BytesIO):
+
+            def read(self, size=-1):
+                reads.append(size)
+                return io.BytesIO.read(self, size)
+
+        reader = session.BinarySessionReader(File(data), chunk_size=64)
+        positions = [reader.position for _ in reader]
+        # the file is read in chunks as the records are decoded.
+        self.assertTrue(all(0 < size < len(data) for size in reads), reads)
+        self.assertEqual(positions, sorted(positions))
+        self.assertEqual(reader.position, len(data))
+        self.assertLoads(file_path)
+
+        reader = session.BinarySessionReader(io.BytesIO(data[:-10]))
+        with self.assertRaises(ValueError):
+            list(reader)
+
+    def test_binary_version_1(self):
+        # written by the version 1 binary session writer.
+        self.assertLoads(os.path.join(DATA_PATH, 'session_v1.ngb'))
+
+    def test_compressed_round_trip(self):
+        for file_name in ('session.json.gz', 'session.json.xz',
+                          'session.json.bz2', 'session.ngb.gz',
+                          'session.ngb.xz', 'session.ngb.bz2'):
+            file_path = self.path(file_name)
+            self.graph.save_session(file_path)
+            with open(file_path, 'rb') as file_obj:
+                compression = session.detect_compression(file_obj.read(8))
+            self.assertEqual(compression, session.session_compression(
+                file_name), file_name)
+            self.assertLoads(file_path)
+
+            # the compression is detected from the file signature.
+            renamed = self.path('session')
+            os.rename(file_path, renamed)
+            self.assertLoads(renamed)
+
+    def test_corrupt_compressed(self):
+        file_path = self.path('session.json.xz')
+        self.graph.save_session(file_path)
+        with open(file_path, 'rb') as file_obj:
+            data = file_obj.read()
+        with open(file_path, 'wb') as file_obj:
+            file_obj.write(data[:len(data) // 2])
+        graph = self.make_graph()
+        self.assertFalse(graph.load_session(file_path))
+        self.assertEqual(graph.all_nodes(), [])
+
+    def test_xz_without_lzma(self):
+        lzma = sys.modules.pop('lzma', None)
+        # an import of a None module raises ImportError.
+        sys.modules['lzma'] = None
+        try:
+            file_path = self.path('session.json.gz')
+            self.graph.save_session(file_path)
+            self.assertLoads(file_path)
+            with self.assertRaises(IOError) as context:
+                self.graph.save_session(self.path('session.json.xz'))
+            self.assertIn('lzma', str(context.exception))
+            self.assertFalse(os.path.exists(self.path('session.json.xz')))
+        finally:
+            if lzma is None:
+                del sys.modules['lzma']
+            else:
+                sys.modules['lzma'] = lzma
+
+    def test_clear_session(self):
+        graph = NodeGraph()
+        graph.register_node(MultiNode)
+        graph.create_nodes('tests.nodes.MultiNode', 3, names='node')
+        nodes = graph.all_nodes()
+        graph.connect_ports([(nodes[0].output(0), nodes[1].input(0))])
+
+        graph.clear_session()
+        self.assertEqual(graph.all_nodes(), [])
+        self.assertEqual(graph.undo_stack().count(), 0)
+        self.assertEqual(graph.viewer().all_nodes(), [])
+        self.assertEqual(graph.viewer().all_pipes(), [])
+        self.assertIsNone(graph.get_node_by_name('node'))
+
+        # the name index and topological order start over.
+        node_a = graph.create_node('tests.nodes.MultiNode', name='node')
+        node_b = graph.create_node('tests.nodes.MultiNode', name='node')
+        self.assertEqual([node_a.name(), node_b.name()], ['node', 'node 1'])
+        node_b.set_output(0, node_a.input(0))
+        self.assertEqual(graph.model.topological_order(),
+                         [node_b.id, node_a.id])
+
+    def test_save_async(self):
+        saved = []
+
+        def on_saved(file_path):
+            saved.append((file_path, QtCore.QThread.currentThread()))
+
+        self.graph.session_saved.connect(on_saved)
+        file_paths = [self.path('session{}.json'.format(i))
+                      for i in range(3)]
+        for file_path in file_paths:
+            self.graph.save_session_async(file_path)
+        self.graph.wait_for_saves()
+
+        # the saved signals are emitted on the main thread in order.
+        self.assertEqual(saved, [(p, app.thread()) for p in file_paths])
+        graph = self.make_graph()
+        graph.load_session(file_paths[-1])
+        self.assertEqual(len(graph.all_nodes()), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
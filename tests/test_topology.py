@@ -0,0 +1,102 @@
+#!/usr/bin/python
+import os
+import sys
+import unittest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from NodeGraphQt import NodeGraph
+from NodeGraphQt.vendor.Qt import QtWidgets
+
+from tests.test_connections import MultiNode
+
+app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+
+
+class TopologicalOrderTest(unittest.TestCase):
+
+    headless = True
+
+    def setUp(self):
+        self.graph = NodeGraph(headless=self.headless)
+        self.graph.register_node(MultiNode)
+        self.nodes = self.graph.create_nodes('tests.nodes.MultiNode', 6)
+
+    def connect(self, out_node, in_node):
+        out_node.output(0).connect_to(in_node.input(0))
+
+    def assert_ordered(self):
+        order = {n.id: i for i, n in enumerate(self.graph.topological_order())}
+        for out_key, in_keys in self.graph.model._out_edges.items():
+            for in_key in in_keys:
+                self.assertLess(order[out_key[0]], order[in_key[0]])
+
+    def test_order_follows_connections(self):
+        a, b, c, d, e, f = self.nodes
+        # connect against the creation order so the order has to change.
+        self.connect(f, e)
+        self.connect(e, d)
+        self.connect(c, f)
+        self.connect(a, c)
+        self.connect(b, d)
+        self.assert_ordered()
+        self.graph.undo_stack().undo()
+        self.graph.undo_stack().undo()
+        self.assert_ordered()
+
+    def test_acyclic_check(self):
+        a, b, c, d, e, f = self.nodes
+        # diamond a -> (b, c) -> d.
+        self.connect(a, b)
+        self.connect(a, c)
+        self.connect(b, d)
+        self.connect(c, d)
+        model = self.graph.model
+        self.assertFalse(model.acyclic_check(d.id, a.id))
+        self.assertFalse(model.acyclic_check(a.id, a.id))
+        self.assertTrue(model.acyclic_check(a.id, d.id))
+        self.assertTrue(model.acyclic_check(d.id, e.id))
+
+        # connections that would loop are rejected.
+        self.connect(d, a)
+        self.assertEqual(d.output(0).connected_ports(), [])
+        self.graph.connect_ports([(d.output(0), a.input(0))])
+        self.assertEqual(d.output(0).connected_ports(), [])
+
+    def test_delete_nodes(self):
+        a, b, c, d, e, f = self.nodes
+        self.connect(a, b)
+        self.connect(b, c)
+        self.graph.delete_nodes([b])
+        self.assertTrue(self.graph.model.acyclic_check(c.id, a.id))
+        self.assert_ordered()
+        self.graph.undo_stack().undo()
+        self.assertFalse(self.graph.model.acyclic_check(c.id, a.id))
+        self.assert_ordered()
+
+
+class ViewerAcyclicCheckTest(TopologicalOrderTest):
+
+    headless = False
+
+    def test_viewer_check(self):
+        a, b, c, d, e, f = self.nodes
+        self.connect(a, b)
+        self.connect(b, c)
+        viewer = self.graph.viewer()
+        self.assertFalse(
+            viewer.acyclic_check(c.output(0).view, a.input(0).view))
+        self.assertFalse(
+            viewer.acyclic_check(a.input(0).view, c.output(0).view))
+        self.assertTrue(
+            viewer.acyclic_check(a.output(0).view, c.input(0).view))
+
+        viewer._snap_checked = {}
+        self.assertFalse(
+            viewer._snap_compatible(c.output(0).view, a.input(0).view))
+        self.assertTrue(
+            viewer._snap_compatible(c.output(0).view, d.input(0).view))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+#!/usr/bin/python
+import gc
+import os
+import sys
+import unittest
+import weakref
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from NodeGraphQt import NodeGraph
+from NodeGraphQt.vendor.Qt import QtWidgets
+from NodeGraphQt.vendor.Qt.QtWidgets import QUndoStack
+
+from tests.test_connections import MultiNode
+
+app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+
+
+class TransactionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = NodeGraph(headless=True)
+        self.graph.register_node(MultiNode)
+
+    def node_names(self):
+        return sorted(n.name() for n in self.graph.all_nodes())
+
+    def test_rollback(self):
+        node = self.graph.create_node('tests.nodes.MultiNode', name='a')
+        with self.assertRaises(RuntimeError):
+            with self.graph.transaction():
+                self.graph.create_node('tests.nodes.MultiNode', name='b')
+                node.set_name('renamed')
+                raise RuntimeError('rollback')
+        self.assertEqual(self.node_names(), ['a'])
+        self.assertEqual(self.graph.undo_stack().count(), 1)
+
+    def test_rollback_in_undo_macro(self):
+        undo_stack = self.graph.undo_stack()
+        self.graph.begin_undo('outer')
+        node_a = self.graph.create_node('tests.nodes.MultiNode', name='a')
+        with self.assertRaises(RuntimeError):
+            with self.graph.transaction():
+                node_b = self.graph.create_node(
+                    'tests.nodes.MultiNode', name='b')
+                node_a.set_output(0, node_b.input(0))
+                node_a.set_name('renamed')
+                raise RuntimeError('rollback')
+        self.assertEqual(self.node_names(), ['a'])
+        self.assertEqual(node_a.output(0).connected_ports(), [])
+        self.graph.end_undo()
+
+        self.assertEqual(undo_stack.count(), 1)
+        undo_stack.undo()
+        self.assertEqual(self.node_names(), [])
+        undo_stack.redo()
+        self.assertEqual(self.node_names(), ['a'])
+
+    def test_commit_in_undo_macro(self):
+        undo_stack = self.graph.undo_stack()
+        self.graph.begin_undo('outer')
+        node_a = self.graph.create_node('tests.nodes.MultiNode', name='a')
+        with self.graph.transaction():
+            node_b = self.graph.create_node('tests.nodes.MultiNode', name='b')
+            node_a.set_output(0, node_b.input(0))
+        self.graph.end_undo()
+
+        self.assertEqual(undo_stack.count(), 1)
+        undo_stack.undo()
+        self.assertEqual(self.node_names(), [])
+        undo_stack.redo()
+        self.assertEqual(self.node_names(), ['a', 'b'])
+        self.assertEqual(len(node_a.output(0).connected_ports()), 1)
+
+    def test_undo_macro_stacks_released(self):
+        children = len(self.graph.findChildren(QUndoStack))
+        stacks = []
+        self.graph.begin_undo('outer')
+        for i in range(5):
+            with self.graph.transaction():
+                stacks.append(weakref.ref(self.graph.undo_stack()))
+                self.graph.create_node('tests.nodes.MultiNode')
+            with self.assertRaises(RuntimeError):
+                with self.graph.transaction():
+                    stacks.append(weakref.ref(self.graph.undo_stack()))
+                    self.graph.create_node('tests.nodes.MultiNode')
+                    raise RuntimeError('rollback')
+            with self.graph.transaction():
+                stacks.append(weakref.ref(self.graph.undo_stack()))
+        self.graph.end_undo()
+        self.assertEqual(len(self.graph.findChildren(QUndoStack)), children)
+        self.assertEqual(len(self.graph.all_nodes()), 5)
+
+        self.graph.clear_undo_stack()
+        gc.collect()
+        self.assertEqual([ref for ref in stacks if ref()], [])
+
+
+if __name__ == '__main__':
+    unittest.main()